@@ -17,7 +17,10 @@ class GroupStatsEndpoint(GroupEndpoint, EnvironmentMixin, StatsMixin):
             raise ResourceDoesNotExist
 
         data = tsdb.get_range(
-            model=tsdb.models.group, keys=[group.id], **self._parse_args(request, environment_id)
+            model=tsdb.models.group,
+            keys=[group.id],
+            use_cache=True,
+            **self._parse_args(request, environment_id),
         )[group.id]
 
         return Response(data)
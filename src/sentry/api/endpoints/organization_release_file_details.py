@@ -8,6 +8,7 @@ from sentry.api.bases.organization import OrganizationReleasesBaseEndpoint
 from sentry.api.exceptions import ResourceDoesNotExist
 from sentry.api.serializers import serialize
 from sentry.models import Release, ReleaseFile
+from sentry.models.releasefile import delete_artifact_index
 
 
 class ReleaseFileSerializer(serializers.Serializer):
@@ -100,6 +101,7 @@ class OrganizationReleaseFileDetailsEndpoint(OrganizationReleasesBaseEndpoint):
         result = serializer.validated_data
 
         releasefile.update(name=result["name"])
+        delete_artifact_index(release, releasefile.dist)
 
         return Response(serialize(releasefile, request.user))
 
@@ -137,5 +139,6 @@ class OrganizationReleaseFileDetailsEndpoint(OrganizationReleasesBaseEndpoint):
         # the actual deletion of the db row
         releasefile.delete()
         file.delete()
+        delete_artifact_index(release, releasefile.dist)
 
         return Response(status=204)
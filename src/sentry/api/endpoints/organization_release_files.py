@@ -9,6 +9,7 @@ from sentry.api.paginator import OffsetPaginator
 from sentry.api.serializers import serialize
 from sentry.constants import MAX_RELEASE_FILES_OFFSET
 from sentry.models import File, Release, ReleaseFile, Distribution
+from sentry.models.releasefile import delete_artifact_index
 
 ERR_FILE_EXISTS = "A file matching this name already exists for the given release"
 _filename_re = re.compile(r"[\n\t\r\f\v\\]")
@@ -167,4 +168,6 @@ class OrganizationReleaseFilesEndpoint(OrganizationReleasesBaseEndpoint):
             file.delete()
             return Response({"detail": ERR_FILE_EXISTS}, status=409)
 
+        delete_artifact_index(release, dist)
+
         return Response(serialize(releasefile, request.user), status=201)
@@ -8,6 +8,7 @@ from sentry.api.bases.project import ProjectEndpoint, ProjectReleasePermission
 from sentry.api.exceptions import ResourceDoesNotExist
 from sentry.api.serializers import serialize
 from sentry.models import Release, ReleaseFile
+from sentry.models.releasefile import delete_artifact_index
 from sentry.api.endpoints.debug_files import has_download_permission
 
 
@@ -104,6 +105,7 @@ class ProjectReleaseFileDetailsEndpoint(ProjectEndpoint):
         result = serializer.validated_data
 
         releasefile.update(name=result["name"])
+        delete_artifact_index(release, releasefile.dist)
 
         return Response(serialize(releasefile, request.user))
 
@@ -142,5 +144,6 @@ class ProjectReleaseFileDetailsEndpoint(ProjectEndpoint):
         # the actual deletion of the db row
         releasefile.delete()
         file.delete()
+        delete_artifact_index(release, releasefile.dist)
 
         return Response(status=204)
@@ -60,7 +60,10 @@ class ProjectStatsEndpoint(ProjectEndpoint, EnvironmentMixin, StatsMixin):
                 raise ValueError("Invalid stat: %s" % stat)
 
         data = tsdb.get_range(
-            model=stat_model, keys=[project.id], **self._parse_args(request, **query_kwargs)
+            model=stat_model,
+            keys=[project.id],
+            use_cache=True,
+            **self._parse_args(request, **query_kwargs),
         )[project.id]
 
         return Response(data)
@@ -476,19 +476,24 @@ def rate_limit_endpoint(limit=1, window=1):
     def inner(function):
         def wrapper(self, request, *args, **kwargs):
             ip = request.META["REMOTE_ADDR"]
-            if ratelimiter.is_limited(
+            rate_limit = ratelimiter.check_limit(
                 f"rate_limit_endpoint:{md5_text(function).hexdigest()}:{ip}",
                 limit=limit,
                 window=window,
-            ):
-                return Response(
+            )
+            if rate_limit.is_limited:
+                response = Response(
                     {
                         "detail": f"You are attempting to use this endpoint too quickly. Limit is {limit}/{window}s"
                     },
                     status=429,
                 )
             else:
-                return function(self, request, *args, **kwargs)
+                response = function(self, request, *args, **kwargs)
+
+            for header, value in rate_limit.get_headers().items():
+                response[header] = value
+            return response
 
         return wrapper
 
@@ -733,6 +733,7 @@ class StreamGroupSerializer(GroupSerializer, GroupStatsMixin):
                 model=tsdb.models.group,
                 keys=group_ids,
                 environment_ids=environment and [environment.id],
+                use_cache=True,
                 **query_params,
             )
 
@@ -989,6 +990,7 @@ class StreamGroupSerializerSnuba(GroupSerializerSnuba, GroupStatsMixin):
             keys=group_ids,
             environment_ids=environment_ids,
             conditions=conditions,
+            use_cache=True,
             **query_params,
         )
 
@@ -1,9 +1,16 @@
+import functools
 import logging
+from collections import defaultdict
 
-from django.db.models import F
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, router
+from django.db.models import F, Model
+from django.db.models.expressions import BaseExpression
 
 from sentry.signals import buffer_incr_complete
 from sentry.tasks.process_buffer import process_incr
+from sentry.utils import metrics
+from sentry.utils.dates import to_timestamp
 from sentry.utils.services import Service
 
 
@@ -28,7 +35,7 @@ class Buffer(Service, metaclass=BufferMount):
     keep up with the updates.
     """
 
-    __all__ = ("incr", "process", "process_pending", "validate")
+    __all__ = ("incr", "flush", "process", "process_pending", "validate")
 
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
@@ -48,6 +55,12 @@ class Buffer(Service, metaclass=BufferMount):
             }
         )
 
+    def flush(self):
+        """
+        Writes out any increments held in memory by this process. This is a
+        no-op for buffers that don't hold any state in process.
+        """
+
     def process_pending(self, partition=None):
         return []
 
@@ -82,3 +95,193 @@ class Buffer(Service, metaclass=BufferMount):
             created=created,
             sender=model,
         )
+
+    def process_batch(self, batch):
+        """
+        Processes many increments at once. ``batch`` is a sequence of
+        ``(model, columns, filters, extra, signal_only)`` tuples.
+
+        Increments to existing rows that touch the same model and columns are
+        written with a single ``UPDATE ... FROM (VALUES ...)`` statement, all
+        others (including rows that need to be created) go through ``process``.
+
+        Like increments processed one by one, an increment that fails is
+        logged and dropped without affecting the rest of the batch.
+        """
+        from sentry.models import Group
+
+        # Subclasses such as ``RedisBuffer`` change the signature of
+        # ``process``, so always use the database implementation from here.
+        process = functools.partial(Buffer.process, self)
+
+        bulk_groups = defaultdict(list)
+        for model, columns, filters, extra, signal_only in batch:
+            bulk_extra = dict(extra or ())
+            # The score is recomputed from ``times_seen`` and ``last_seen`` in
+            # ``process``, the bulk update mirrors that in SQL.
+            with_score = model is Group and "last_seen" in bulk_extra and "times_seen" in columns
+            if with_score:
+                bulk_extra.pop("score", None)
+
+            if signal_only or any(isinstance(v, BaseExpression) for v in bulk_extra.values()):
+                self._process_or_log(process, model, columns, filters, extra, signal_only)
+                continue
+
+            group_key = (
+                model,
+                tuple(sorted(filters)),
+                tuple(sorted(columns)),
+                tuple(sorted(bulk_extra)),
+                with_score,
+            )
+            bulk_groups[group_key].append((columns, filters, extra, bulk_extra))
+
+        for (
+            model,
+            filter_names,
+            column_names,
+            extra_names,
+            with_score,
+        ), items in bulk_groups.items():
+            # Rows matched more than once by a single UPDATE ... FROM are only
+            # updated once, so duplicate filters are processed separately.
+            unique_items = {}
+            remaining = []
+            for item in items:
+                filter_values = tuple(_coerce_filter_value(item[1][name]) for name in filter_names)
+                if filter_values in unique_items:
+                    remaining.append(item)
+                else:
+                    unique_items[filter_values] = item
+            items = list(unique_items.values())
+
+            updated = set()
+            if len(items) > 1:
+                try:
+                    updated = _bulk_update(
+                        model, filter_names, column_names, extra_names, with_score, items
+                    )
+                except FieldDoesNotExist:
+                    pass
+                except Exception:
+                    # The statement was rolled back, so all of its items can
+                    # still be processed one by one.
+                    self.logger.exception(
+                        "buffer.bulk-update-failed", extra={"model": model.__name__}
+                    )
+                else:
+                    metrics.timing(
+                        "buffer.process-batch.bulk-size",
+                        len(items),
+                        tags={"model": model.__name__},
+                    )
+
+            for idx, (columns, filters, extra, _) in enumerate(items):
+                if idx in updated:
+                    buffer_incr_complete.send_robust(
+                        model=model,
+                        columns=columns,
+                        filters=filters,
+                        extra=extra,
+                        created=False,
+                        sender=model,
+                    )
+                else:
+                    remaining.append((columns, filters, extra, None))
+
+            for columns, filters, extra, _ in remaining:
+                self._process_or_log(process, model, columns, filters, extra)
+
+    def _process_or_log(self, process, model, *args):
+        try:
+            process(model, *args)
+        except Exception:
+            self.logger.exception("buffer.process-failed", extra={"model": model.__name__})
+
+
+def _coerce_filter_value(value):
+    if isinstance(value, Model):
+        return value.pk
+    return value
+
+
+def _get_cast_type(field, connection):
+    # Primary keys are serial columns, which is not a type values can be cast
+    # to. Use the type of the foreign keys referencing them instead.
+    if hasattr(field, "get_related_db_type"):
+        return field.get_related_db_type(connection)
+    return field.rel_db_type(connection)
+
+
+def _bulk_update(model, filter_names, column_names, extra_names, with_score, items):
+    """
+    Applies ``items`` to existing rows of ``model`` in one statement and
+    returns the indexes of the items that matched a row.
+    """
+    connection = connections[router.db_for_write(model)]
+    quote_name = connection.ops.quote_name
+    meta = model._meta
+
+    def get_field(name):
+        return meta.pk if name == "pk" else meta.get_field(name)
+
+    filter_fields = [get_field(name) for name in filter_names]
+    column_fields = [get_field(name) for name in column_names]
+    extra_fields = [get_field(name) for name in extra_names]
+
+    aliases = ["idx"]
+    casts = ["integer"]
+    for prefix, fields in (("f", filter_fields), ("i", column_fields), ("e", extra_fields)):
+        for i, field in enumerate(fields):
+            aliases.append(f"{prefix}{i}")
+            casts.append(_get_cast_type(field, connection))
+    if with_score:
+        aliases.append("score_ts")
+        casts.append("integer")
+
+    rows = []
+    params = []
+    row_sql = "(%s)" % ", ".join(f"CAST(%s AS {cast})" for cast in casts)
+    for idx, (columns, filters, _, extra) in enumerate(items):
+        params.append(idx)
+        for name, field in zip(filter_names, filter_fields):
+            params.append(field.get_db_prep_value(_coerce_filter_value(filters[name]), connection))
+        for name, field in zip(column_names, column_fields):
+            params.append(columns[name])
+        for name, field in zip(extra_names, extra_fields):
+            params.append(field.get_db_prep_save(extra[name], connection))
+        if with_score:
+            params.append(int(to_timestamp(extra["last_seen"])))
+        rows.append(row_sql)
+
+    assignments = []
+    for i, field in enumerate(column_fields):
+        column = quote_name(field.column)
+        assignments.append(f"{column} = t.{column} + v.i{i}")
+    for i, field in enumerate(extra_fields):
+        assignments.append(f"{quote_name(field.column)} = v.e{i}")
+    if with_score:
+        # Mirrors ``ScoreClause`` for the incremented ``times_seen`` and new
+        # ``last_seen``, evaluated against the row before the update.
+        times_seen = column_names.index("times_seen")
+        assignments.append(f"score = log(t.times_seen + v.i{times_seen}) * 600 + v.score_ts")
+
+    conditions = [f"t.{quote_name(field.column)} = v.f{i}" for i, field in enumerate(filter_fields)]
+
+    query = """
+        UPDATE %(table)s AS t
+        SET %(assignments)s
+        FROM (VALUES %(rows)s) AS v(%(aliases)s)
+        WHERE %(conditions)s
+        RETURNING v.idx
+    """ % dict(
+        table=quote_name(meta.db_table),
+        assignments=", ".join(assignments),
+        rows=", ".join(rows),
+        aliases=", ".join(aliases),
+        conditions=" AND ".join(conditions),
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(query, params)
+        return {row[0] for row in cursor.fetchall()}
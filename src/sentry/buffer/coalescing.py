@@ -0,0 +1,158 @@
+import atexit
+import os
+import threading
+from time import time
+
+from celery.signals import task_postrun
+from django.core.signals import request_finished
+
+from sentry.buffer import Buffer
+from sentry.utils import metrics
+from sentry.utils.imports import import_string
+
+
+class PendingIncr:
+    __slots__ = ("model", "columns", "filters", "extra", "signal_only", "count")
+
+    def __init__(self, model, filters):
+        self.model = model
+        self.filters = filters
+        self.columns = {}
+        self.extra = None
+        self.signal_only = None
+        self.count = 0
+
+    def merge(self, columns, extra, signal_only):
+        for column, amount in columns.items():
+            self.columns[column] = self.columns.get(column, 0) + amount
+
+        if extra:
+            if self.extra is None:
+                self.extra = {}
+            self.extra.update(extra)
+
+        # Mirrors the Redis buffer, where a single signal only increment marks
+        # the whole buffered key as signal only.
+        if signal_only is True:
+            self.signal_only = True
+        elif self.signal_only is None:
+            self.signal_only = signal_only
+
+        self.count += 1
+
+
+class CoalescingBuffer(Buffer):
+    """
+    In-process buffer which coalesces increments before handing them to
+    another buffer backend.
+
+    Increments for the same model and filters are summed, and extra values
+    are merged with the last write winning. Pending increments are flushed to
+    the backend once ``max_keys`` distinct keys are pending, on the next write
+    once the oldest pending increment is ``max_age`` seconds old, at the end
+    of every request and task, or whenever ``flush`` is called explicitly
+    (i.e. at the end of every ingest consumer batch.)
+
+    >>> SENTRY_BUFFER = 'sentry.buffer.coalescing.CoalescingBuffer'
+    >>> SENTRY_BUFFER_OPTIONS = {
+    >>>     'backend': {
+    >>>         'path': 'sentry.buffer.redis.RedisBuffer',
+    >>>         'options': {},
+    >>>     },
+    >>> }
+    """
+
+    def __init__(self, backend=None, max_keys=1000, max_age=5):
+        if backend is None:
+            backend = {"path": "sentry.buffer.redis.RedisBuffer"}
+        self.backend = import_string(backend["path"])(**backend.get("options", {}))
+        self.max_keys = max_keys
+        self.max_age = max_age
+        assert self.max_keys > 0
+        assert self.max_age >= 0
+
+        self._lock = threading.Lock()
+        self._reset()
+        atexit.register(self.flush)
+        # Nothing may be held by a process which is idle after a request or
+        # task, as the next write could be far away.
+        task_postrun.connect(self._flush_on_signal)
+        request_finished.connect(self._flush_on_signal)
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._pending = {}
+        self._pending_since = None
+
+    def validate(self):
+        self.backend.validate()
+
+    def _make_key(self, model, filters):
+        return (model, frozenset(filters.items()))
+
+    def incr(self, model, columns, filters, extra=None, signal_only=None):
+        try:
+            key = self._make_key(model, filters)
+            hash(key)
+        except TypeError:
+            # Filters we can't key on are passed through untouched.
+            self.backend.incr(model, columns, filters, extra, signal_only)
+            return
+
+        with self._lock:
+            if self._pid != os.getpid():
+                # Increments pending in the parent process are flushed by
+                # the parent, a forked child must not write them again.
+                self._reset()
+
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = PendingIncr(model, filters)
+            pending.merge(columns, extra, signal_only)
+
+            if self._pending_since is None:
+                self._pending_since = time()
+
+            should_flush = (
+                len(self._pending) >= self.max_keys or time() - self._pending_since >= self.max_age
+            )
+
+        if should_flush:
+            self.flush()
+
+    def _flush_on_signal(self, **kwargs):
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            pending = self._pending
+            self._pending = {}
+            self._pending_since = None
+
+        if not pending:
+            return
+
+        incr_count = 0
+        for item in pending.values():
+            incr_count += item.count
+            try:
+                self.backend.incr(
+                    item.model, item.columns, item.filters, item.extra, item.signal_only
+                )
+            except Exception:
+                self.logger.exception(
+                    "buffer.coalescing.flush-failed",
+                    extra={"model": item.model.__name__, "count": item.count},
+                )
+
+        metrics.timing("buffer.coalescing.flushed-keys", len(pending))
+        metrics.timing("buffer.coalescing.ratio", incr_count / len(pending))
+        metrics.incr("buffer.coalescing.coalesced", amount=incr_count - len(pending))
+
+    def process_pending(self, partition=None):
+        return self.backend.process_pending(partition=partition)
+
+    def process(self, *args, **kwargs):
+        return self.backend.process(*args, **kwargs)
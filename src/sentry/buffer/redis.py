@@ -1,8 +1,12 @@
+import calendar
 import pickle
+import struct
 import threading
+from collections import defaultdict
 from time import time
 
-from datetime import datetime
+import msgpack
+from datetime import datetime, timedelta
 from django.db import models
 from django.utils import timezone
 from django.utils.encoding import force_bytes, force_text
@@ -14,11 +18,40 @@ from sentry.utils import json, metrics
 from sentry.utils.compat import crc32
 from sentry.utils.hashlib import md5_text
 from sentry.utils.imports import import_string
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
 
 _local_buffers = None
 _local_buffers_lock = threading.Lock()
 
+incr_script = load_script("buffer/incr.lua")
+
+# Values written with the compact encoding are prefixed with a version header.
+# Neither the JSON (``{``/``[``) nor the pickle (``\x80`` or a printable opcode)
+# payloads can start with it, so readers can tell all formats apart.
+MSGPACK_V1_HEADER = b"\x01"
+
+_DATETIME_EXT_TYPE = 1
+_DATETIME_EXT_STRUCT = struct.Struct(">qI")
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _msgpack_default(value):
+    # Naive datetimes can't be round tripped without guessing a timezone,
+    # so they are rejected here and end up pickled instead.
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return msgpack.ExtType(
+            _DATETIME_EXT_TYPE,
+            _DATETIME_EXT_STRUCT.pack(calendar.timegm(value.utctimetuple()), value.microsecond),
+        )
+    raise TypeError(type(value))
+
+
+def _msgpack_ext_hook(code, data):
+    if code == _DATETIME_EXT_TYPE:
+        seconds, microseconds = _DATETIME_EXT_STRUCT.unpack(data)
+        return _EPOCH + timedelta(seconds=seconds, microseconds=microseconds)
+    return msgpack.ExtType(code, data)
+
 
 class PendingBuffer:
     def __init__(self, size):
@@ -51,12 +84,32 @@ class RedisBuffer(Buffer):
     key_expire = 60 * 60  # 1 hour
     pending_key = "b:p"
 
-    def __init__(self, pending_partitions=1, incr_batch_size=2, **options):
+    def __init__(
+        self,
+        pending_partitions=1,
+        incr_batch_size=2,
+        incr_script=False,
+        bulk_process=False,
+        pending_chunk_size=None,
+        **options,
+    ):
         self.cluster, options = get_cluster_from_options("SENTRY_BUFFER_OPTIONS", options)
         self.pending_partitions = pending_partitions
         self.incr_batch_size = incr_batch_size
+        # When enabled, ``incr`` applies all writes in a single Lua script call
+        # and stores values in the compact msgpack encoding. This must only be
+        # turned on once every process running ``process`` can read it.
+        self.incr_script = incr_script
+        # When enabled, ``process`` handles a batch of keys at once, reading
+        # them with one pipeline per host and writing increments with one
+        # bulk update per model.
+        self.bulk_process = bulk_process
+        # When set, ``process_pending`` drains the pending sets in chunks of
+        # this many keys instead of reading them in full.
+        self.pending_chunk_size = pending_chunk_size
         assert self.pending_partitions > 0
         assert self.incr_batch_size > 0
+        assert self.pending_chunk_size is None or self.pending_chunk_size > 0
 
     def validate(self):
         try:
@@ -142,6 +195,33 @@ class RedisBuffer(Buffer):
         else:
             raise TypeError(f"invalid type: {type_}")
 
+    def _encode_value(self, value):
+        """
+        Encodes a filter or extra value for storage in the buffer hash.
+
+        Values are stored in the versioned msgpack encoding when possible,
+        falling back to pickle for types it can't represent losslessly.
+        """
+        try:
+            return MSGPACK_V1_HEADER + msgpack.packb(
+                value, default=_msgpack_default, strict_types=True, use_bin_type=True
+            )
+        except (TypeError, ValueError, OverflowError):
+            return pickle.dumps(value)
+
+    def _decode_value(self, payload):
+        """
+        Decodes a filter or extra value written by any version of ``incr``.
+        """
+        if payload.startswith(MSGPACK_V1_HEADER):
+            return msgpack.unpackb(payload[1:], raw=False, ext_hook=_msgpack_ext_hook)
+        elif payload.startswith(b"{"):
+            return self._load_values(json.loads(payload.decode("utf-8")))
+        elif payload.startswith(b"["):
+            return self._load_value(json.loads(payload.decode("utf-8")))
+        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
+        return pickle.loads(payload)
+
     def incr(self, model, columns, filters, extra=None, signal_only=None):
         """
         Increment the key by doing the following:
@@ -161,6 +241,18 @@ class RedisBuffer(Buffer):
         # keys (one per Redis partition)
         conn = self.cluster.get_local_client_for_key(key)
 
+        if self.incr_script:
+            self._incr_script(conn, key, pending_key, model, columns, filters, extra, signal_only)
+        else:
+            self._incr_pipeline(conn, key, pending_key, model, columns, filters, extra, signal_only)
+
+        metrics.incr(
+            "buffer.incr",
+            skip_internal=True,
+            tags={"module": model.__module__, "model": model.__name__},
+        )
+
+    def _incr_pipeline(self, conn, key, pending_key, model, columns, filters, extra, signal_only):
         pipe = conn.pipeline()
         pipe.hsetnx(key, "m", f"{model.__module__}.{model.__name__}")
         # TODO(dcramer): once this goes live in production, we can kill the pickle path
@@ -187,11 +279,21 @@ class RedisBuffer(Buffer):
         pipe.zadd(pending_key, {key: time()})
         pipe.execute()
 
-        metrics.incr(
-            "buffer.incr",
-            skip_internal=True,
-            tags={"module": model.__module__, "model": model.__name__},
-        )
+    def _incr_script(self, conn, key, pending_key, model, columns, filters, extra, signal_only):
+        args = [
+            f"{model.__module__}.{model.__name__}",
+            self._encode_value(filters),
+            self.key_expire,
+            time(),
+            "1" if signal_only is True else "0",
+            len(columns),
+        ]
+        for column, amount in columns.items():
+            args.extend((column, amount))
+        if extra:
+            for column, value in extra.items():
+                args.extend((column, self._encode_value(value)))
+        incr_script(conn, [key, pending_key], args)
 
     def process_pending(self, partition=None):
         if partition is None and self.pending_partitions > 1:
@@ -204,6 +306,11 @@ class RedisBuffer(Buffer):
             # super fast and is fine to do redundantly.
 
         pending_key = self._make_pending_key(partition)
+
+        if self.pending_chunk_size is not None:
+            self._process_pending_chunked(pending_key)
+            return
+
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(pending_key)
         # prevent a stampede due to celerybeat + periodic task
@@ -236,6 +343,48 @@ class RedisBuffer(Buffer):
         finally:
             client.delete(lock_key)
 
+    def _process_pending_chunked(self, pending_key):
+        """
+        Drains the pending set on every host in chunks of at most
+        ``pending_chunk_size`` keys.
+
+        Every chunk is popped atomically, so this doesn't need the pending
+        lock and several workers can drain the same set concurrently. To avoid
+        running forever under constant load, each host is only drained by the
+        number of keys that were pending when the drain started.
+        """
+        with self.cluster.all() as conn:
+            backlog = conn.zcard(pending_key)
+
+        pending_buffer = PendingBuffer(self.incr_batch_size)
+        keycount = 0
+
+        for host_id, size in backlog.value.items():
+            metrics.timing("buffer.pending-backlog", size, tags={"host": host_id})
+
+            conn = self.cluster.get_local_client(host_id)
+            remaining = size
+            while remaining > 0:
+                pipe = conn.pipeline()
+                pipe.zrange(pending_key, 0, self.pending_chunk_size - 1)
+                pipe.zremrangebyrank(pending_key, 0, self.pending_chunk_size - 1)
+                keys = pipe.execute()[0]
+                if not keys:
+                    break
+
+                remaining -= len(keys)
+                keycount += len(keys)
+                for key in keys:
+                    pending_buffer.append(key.decode("utf-8"))
+                    if pending_buffer.full():
+                        process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
+
+        # queue up remainder of pending keys
+        if not pending_buffer.empty():
+            process_incr.apply_async(kwargs={"batch_keys": pending_buffer.flush()})
+
+        metrics.timing("buffer.pending-size", keycount)
+
     def process(self, key=None, batch_keys=None):
         assert not (key is None and batch_keys is None)
         assert not (key is not None and batch_keys is not None)
@@ -243,9 +392,48 @@ class RedisBuffer(Buffer):
         if key is not None:
             batch_keys = [key]
 
+        if self.bulk_process and len(batch_keys) > 1:
+            self._process_batch_incr(batch_keys)
+            return
+
         for key in batch_keys:
             self._process_single_incr(key)
 
+    def _load_incr(self, key, values):
+        """
+        Returns the ``(model, columns, filters, extra, signal_only)`` stored in
+        the buffer hash at ``key``, or ``None`` if it was empty.
+        """
+        # XXX(python3): In python2 this isn't as important since redis will
+        # return string tyes (be it, byte strings), but in py3 we get bytes
+        # back, and really we just want to deal with keys as strings.
+        values = {force_text(k): v for k, v in values.items()}
+
+        if not values:
+            metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
+            self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            return None
+
+        # XXX(py3): Note that ``import_string`` explicitly wants a str in
+        # python2, so we'll decode (for python3) and then translate back to
+        # a byte string (in python2) for import_string.
+        model = import_string(str(values.pop("m").decode("utf-8")))  # NOQA
+
+        filters = self._decode_value(values.pop("f"))
+
+        incr_values = {}
+        extra_values = {}
+        signal_only = None
+        for k, v in values.items():
+            if k.startswith("i+"):
+                incr_values[k[2:]] = int(v)
+            elif k.startswith("e+"):
+                extra_values[k[2:]] = self._decode_value(v)
+            elif k == "s":
+                signal_only = bool(int(v))  # Should be 1 if set
+
+        return model, incr_values, filters, extra_values, signal_only
+
     def _process_single_incr(self, key):
         client = self.cluster.get_routing_client()
         lock_key = self._make_lock_key(key)
@@ -266,42 +454,58 @@ class RedisBuffer(Buffer):
             pipe.delete(key)
             values = pipe.execute()[0]
 
-            # XXX(python3): In python2 this isn't as important since redis will
-            # return string tyes (be it, byte strings), but in py3 we get bytes
-            # back, and really we just want to deal with keys as strings.
-            values = {force_text(k): v for k, v in values.items()}
-
-            if not values:
-                metrics.incr("buffer.revoked", tags={"reason": "empty"}, skip_internal=False)
-                self.logger.debug("buffer.revoked.empty", extra={"redis_key": key})
+            incr = self._load_incr(key, values)
+            if incr is None:
                 return
 
-            # XXX(py3): Note that ``import_string`` explicitly wants a str in
-            # python2, so we'll decode (for python3) and then translate back to
-            # a byte string (in python2) for import_string.
-            model = import_string(str(values.pop("m").decode("utf-8")))  # NOQA
+            super().process(*incr)
+        finally:
+            client.delete(lock_key)
 
-            if values["f"].startswith(b"{"):
-                filters = self._load_values(json.loads(values.pop("f").decode("utf-8")))
+    def _process_batch_incr(self, batch_keys):
+        # Same as ``_process_single_incr``, but locks and reads all keys with
+        # one round trip per Redis host and applies the increments in bulk.
+        with self.cluster.map() as client:
+            locks = {
+                key: client.set(self._make_lock_key(key), "1", nx=True, ex=10) for key in batch_keys
+            }
+
+        locked_keys = []
+        for key, result in locks.items():
+            if result.value:
+                locked_keys.append(key)
             else:
-                # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                filters = pickle.loads(values.pop("f"))
-
-            incr_values = {}
-            extra_values = {}
-            signal_only = None
-            for k, v in values.items():
-                if k.startswith("i+"):
-                    incr_values[k[2:]] = int(v)
-                elif k.startswith("e+"):
-                    if v.startswith(b"["):
-                        extra_values[k[2:]] = self._load_value(json.loads(v.decode("utf-8")))
-                    else:
-                        # TODO(dcramer): legacy pickle support - remove in Sentry 9.1
-                        extra_values[k[2:]] = pickle.loads(v)
-                elif k == "s":
-                    signal_only = bool(int(v))  # Should be 1 if set
-
-            super().process(model, incr_values, filters, extra_values, signal_only)
+                metrics.incr("buffer.revoked", tags={"reason": "locked"}, skip_internal=False)
+                self.logger.debug("buffer.revoked.locked", extra={"redis_key": key})
+
+        try:
+            router = self.cluster.get_router()
+            keys_by_host = defaultdict(list)
+            for key in locked_keys:
+                keys_by_host[router.get_host_for_key(key)].append(key)
+
+            batch = []
+            for host_id, keys in keys_by_host.items():
+                pipe = self.cluster.get_local_client(host_id).pipeline()
+                for key in keys:
+                    pipe.hgetall(key)
+                    pipe.zrem(self._make_pending_key_from_key(key), key)
+                    pipe.delete(key)
+                results = pipe.execute()
+
+                for key, values in zip(keys, results[::3]):
+                    # The key is gone from Redis already, a value that can't
+                    # be loaded must only lose its own increments.
+                    try:
+                        incr = self._load_incr(key, values)
+                    except Exception:
+                        self.logger.exception("buffer.load-failed", extra={"redis_key": key})
+                        continue
+                    if incr is not None:
+                        batch.append(incr)
+
+            super().process_batch(batch)
         finally:
-            client.delete(lock_key)
+            with self.cluster.map() as client:
+                for key in locked_keys:
+                    client.delete(self._make_lock_key(key))
@@ -545,6 +545,7 @@ CELERY_IMPORTS = (
     "sentry.tasks.members",
     "sentry.tasks.merge",
     "sentry.tasks.options",
+    "sentry.tasks.ownership",
     "sentry.tasks.ping",
     "sentry.tasks.post_process",
     "sentry.tasks.process_buffer",
@@ -595,6 +596,7 @@ CELERY_QUEUES = [
     Queue("integrations", routing_key="integrations"),
     Queue("merge", routing_key="merge"),
     Queue("options", routing_key="options"),
+    Queue("ownership", routing_key="ownership"),
     Queue("relay_config", routing_key="relay_config"),
     Queue("reports.deliver", routing_key="reports.deliver"),
     Queue("reports.prepare", routing_key="reports.prepare"),
@@ -1161,6 +1163,11 @@ SENTRY_ALLOW_ORIGIN = None
 # Enable scraping of javascript context for source code
 SENTRY_SCRAPE_JAVASCRIPT_CONTEXT = True
 
+# JSON library used by sentry.utils.json, either "simplejson" or "rapidjson"
+# (requires python-rapidjson). Both produce equivalent JSON, though floats may
+# be formatted differently (e.g. 1e16 and 1e+16).
+SENTRY_JSON_BACKEND = "simplejson"
+
 # Buffer backend
 SENTRY_BUFFER = "sentry.buffer.Buffer"
 SENTRY_BUFFER_OPTIONS = {}
@@ -1311,6 +1318,10 @@ SENTRY_SOURCE_FETCH_MAX_SIZE = 40 * 1024 * 1024
 # e.g. memcached defaults to 1MB  = 1024 * 1024
 SENTRY_CACHE_MAX_VALUE_SIZE = None
 
+# The total size in bytes of the source maps whose parsed views are kept in
+# memory across events by each process processing JavaScript events.
+SENTRY_SOURCEMAP_VIEW_CACHE_SIZE = 100 * 1024 * 1024
+
 # Fields which managed users cannot change via Sentry UI. Username and password
 # cannot be changed by managed users. Optionally include 'email' and
 # 'name' in SENTRY_MANAGED_USER_FIELDS.
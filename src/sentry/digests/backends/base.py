@@ -121,12 +121,14 @@ class Backend(Service):
         """
         raise NotImplementedError
 
-    def digest(self, key, minimum_delay=None):
+    def digest(self, key, minimum_delay=None, chunk_size=None):
         """
         Extract records from a timeline for processing.
 
         This method acts as a context manager. The target of the ``as`` clause
         is an iterator contains all of the records contained within the digest.
+        If ``chunk_size`` is provided, records are loaded lazily in chunks of
+        that size as the iterator is consumed, rather than all at once.
 
         If the context manager successfully exits, all records that were part
         of the digest are removed from the timeline and the timeline is placed
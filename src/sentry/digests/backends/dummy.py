@@ -11,7 +11,7 @@ class DummyBackend(Backend):
         return False
 
     @contextmanager
-    def digest(self, key, minimum_delay=None):
+    def digest(self, key, minimum_delay=None, chunk_size=None):
         yield []
 
     def schedule(self, deadline):
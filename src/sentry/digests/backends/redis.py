@@ -173,8 +173,24 @@ class RedisBackend(Backend):
                     exc_info=True,
                 )
 
+    def __iter_records(self, connection, key, response, chunk_size):
+        for i in range(0, len(response), chunk_size):
+            chunk = response[i : i + chunk_size]
+            values = connection.mget(
+                [
+                    f"{self.namespace}:t:{key}:r:{record_key.decode('utf-8')}"
+                    for record_key, _ in chunk
+                ]
+            )
+            for (record_key, timestamp), value in zip(chunk, values):
+                # Missing records are skipped, see ``digest`` below.
+                if value is not None:
+                    yield Record(
+                        record_key.decode("utf-8"), self.codec.decode(value), float(timestamp)
+                    )
+
     @contextmanager
-    def digest(self, key, minimum_delay=None, timestamp=None):
+    def digest(self, key, minimum_delay=None, timestamp=None, chunk_size=None):
         if minimum_delay is None:
             minimum_delay = self.minimum_delay
 
@@ -194,7 +210,8 @@ class RedisBackend(Backend):
                         timestamp,
                         key,
                         self.capacity if self.capacity else -1,
-                    ],
+                    ]
+                    + (["KEYS_ONLY"] if chunk_size else []),
                 )
             except ResponseError as e:
                 if "err(invalid_state):" in str(e):
@@ -202,27 +219,32 @@ class RedisBackend(Backend):
                 else:
                     raise
 
-            records = map(
-                lambda key__value__timestamp: Record(
-                    key__value__timestamp[0].decode("utf-8"),
-                    self.codec.decode(key__value__timestamp[1])
-                    if key__value__timestamp[1] is not None
-                    else None,
-                    float(key__value__timestamp[2]),
-                ),
-                response,
-            )
+            if chunk_size:
+                record_keys = [record_key.decode("utf-8") for record_key, _ in response]
+                yield self.__iter_records(connection, key, response, chunk_size)
+            else:
+                records = map(
+                    lambda key__value__timestamp: Record(
+                        key__value__timestamp[0].decode("utf-8"),
+                        self.codec.decode(key__value__timestamp[1])
+                        if key__value__timestamp[1] is not None
+                        else None,
+                        float(key__value__timestamp[2]),
+                    ),
+                    response,
+                )
+                record_keys = [record.key for record in records]
 
-            # If the record value is `None`, this means the record data was
-            # missing (it was presumably evicted by Redis) so we don't need to
-            # return it here.
-            yield [record for record in records if record.value is not None]
+                # If the record value is `None`, this means the record data was
+                # missing (it was presumably evicted by Redis) so we don't need to
+                # return it here.
+                yield [record for record in records if record.value is not None]
 
             script(
                 connection,
                 [key],
                 ["DIGEST_CLOSE", self.namespace, self.ttl, timestamp, key, minimum_delay]
-                + [record.key for record in records],
+                + record_keys,
             )
 
     def delete(self, key, timestamp=None):
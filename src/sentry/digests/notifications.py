@@ -1,9 +1,10 @@
 import functools
 from functools import reduce
+import heapq
 import itertools
 import logging
 
-from collections import OrderedDict, defaultdict, namedtuple
+from collections import Counter, OrderedDict, defaultdict, namedtuple
 
 from sentry.app import tsdb
 from sentry.digests import Record
@@ -14,6 +15,9 @@ logger = logging.getLogger("sentry.digests")
 
 Notification = namedtuple("Notification", "event rules")
 
+#: The maximum number of groups included for each rule by ``build_streaming_digest``.
+STREAMING_DIGEST_MAX_GROUPS = 100
+
 
 def split_key(key):
     from sentry.mail.adapter import ActionTargetType
@@ -215,3 +219,99 @@ def build_digest(project, records, state=None):
     )
 
     return pipeline(records)
+
+
+def build_streaming_digest(project, records, chunk_size=1000, max_groups=None):
+    """
+    Build a digest in the same format as ``build_digest`` from an iterator of
+    records, without holding all records in memory at once.
+
+    Records are consumed in chunks, fetching the groups and rules of each
+    chunk that have not been seen yet in bulk. Only the number of records as
+    well as the most recent and the oldest record are kept for each group
+    and rule. The ``max_groups`` groups with the most records are kept for
+    every rule, and are then sorted by their event and user counts like
+    ``build_digest`` does.
+    """
+    if max_groups is None:
+        max_groups = STREAMING_DIGEST_MAX_GROUPS
+
+    groups = {}
+    rules = {}
+    counts = defaultdict(Counter)
+    latest = {}
+    oldest = {}
+    start = end = None
+
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            break
+
+        # Groups that no longer exist or are not unresolved are stored as
+        # ``None``, so they are only fetched once.
+        group_ids = {record.value.event.group_id for record in chunk}.difference(groups)
+        if group_ids:
+            fetched = Group.objects.in_bulk(group_ids)
+            for group_id in group_ids:
+                group = fetched.get(group_id)
+                if group is not None and group.get_status() != GroupStatus.UNRESOLVED:
+                    group = None
+                groups[group_id] = group
+
+        rule_ids = set(itertools.chain.from_iterable(record.value.rules for record in chunk))
+        rule_ids.difference_update(rules)
+        if rule_ids:
+            fetched = Rule.objects.in_bulk(rule_ids)
+            rules.update((rule_id, fetched.get(rule_id)) for rule_id in rule_ids)
+
+        for record in chunk:
+            # Records are returned in reverse chronological order.
+            if end is None:
+                end = record.datetime
+            start = record.datetime
+
+            group_id = record.value.event.group_id
+            if groups[group_id] is None:
+                continue
+
+            for rule_id in record.value.rules:
+                if rules[rule_id] is None:
+                    continue
+
+                counts[rule_id][group_id] += 1
+                latest.setdefault((rule_id, group_id), record)
+                oldest[(rule_id, group_id)] = record
+
+    if end is None:
+        return
+
+    top_groups = {
+        rule_id: heapq.nlargest(max_groups, rule_counts, key=rule_counts.__getitem__)
+        for rule_id, rule_counts in counts.items()
+    }
+    group_ids = set(itertools.chain.from_iterable(top_groups.values()))
+
+    state = attach_state(
+        project=project,
+        groups={group_id: groups[group_id] for group_id in group_ids},
+        rules={rule_id: rules[rule_id] for rule_id in top_groups},
+        event_counts=tsdb.get_sums(tsdb.models.group, list(group_ids), start, end),
+        user_counts=tsdb.get_distinct_counts_totals(
+            tsdb.models.users_affected_by_group, list(group_ids), start, end
+        ),
+    )
+
+    digest = defaultdict(dict)
+    for rule_id, rule_group_ids in top_groups.items():
+        for group_id in rule_group_ids:
+            group_records = [latest[(rule_id, group_id)]]
+            if oldest[(rule_id, group_id)] is not group_records[0]:
+                group_records.append(oldest[(rule_id, group_id)])
+
+            digest[state["rules"][rule_id]][state["groups"][group_id]] = [
+                rewrite_record(record, **state) for record in group_records
+            ]
+
+    return sort_rule_groups(sort_group_contents(digest))
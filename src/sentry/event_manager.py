@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 from io import BytesIO
 import ipaddress
 
@@ -65,7 +66,7 @@ from sentry.utils.cache import cache_key_for_event
 from sentry.utils.canonical import CanonicalKeyDict
 from sentry.utils.dates import to_timestamp, to_datetime
 from sentry.utils.outcomes import Outcome, track_outcome
-from sentry.utils.safe import safe_execute, trim, get_path, setdefault_path
+from sentry.utils.safe import safe_execute, trim, compile_path, compile_set_path
 from sentry.stacktraces.processing import normalize_stacktraces_for_grouping
 from sentry.culprit import generate_culprit
 from sentry.reprocessing2 import (
@@ -76,6 +77,9 @@ from sentry.reprocessing2 import (
 
 logger = logging.getLogger("sentry.events")
 
+_get_tags = compile_path("tags", filter=True)
+_setdefault_tags = compile_set_path("tags", overwrite=False)
+
 SECURITY_REPORT_INTERFACES = ("csp", "hpkp", "expectct", "expectstaple")
 
 # Timeout for cached group crash report counts
@@ -96,7 +100,7 @@ def set_tag(data, key, value):
 
 
 def get_tag(data, key):
-    for k, v in get_path(data, "tags", filter=True) or ():
+    for k, v in _get_tags(data) or ():
         if k == key:
             return v
 
@@ -307,126 +311,88 @@ class EventManager:
             jobs = save_transaction_events([job], projects)
             return jobs[0]["event"]
 
-        with metrics.timer("event_manager.save.organization.get_from_cache"):
-            project._organization_cache = Organization.objects.get_from_cache(
-                id=project.organization_id
-            )
-
-        job = {"data": self._data, "project_id": project_id, "raw": raw, "start_time": start_time}
-        jobs = [job]
+        job = {
+            "data": self._data,
+            "project_id": project_id,
+            "raw": raw,
+            "start_time": start_time,
+            "cache_key": cache_key,
+        }
+        save_error_events([job], projects)
 
-        is_reprocessed = is_reprocessed_event(job["data"])
+        if job.get("hash_discarded") is not None:
+            raise job["hash_discarded"]
 
-        _pull_out_data(jobs, projects)
-        _get_or_create_release_many(jobs, projects)
-        _get_event_user_many(jobs, projects)
+        self._data = job["event"].data.data
+        return job["event"]
 
-        job["project_key"] = None
-        if job["key_id"] is not None:
-            with metrics.timer("event_manager.load_project_key"):
-                try:
-                    job["project_key"] = ProjectKey.objects.get_from_cache(id=job["key_id"])
-                except ProjectKey.DoesNotExist:
-                    pass
 
-        with metrics.timer("event_manager.load_grouping_config"):
-            # At this point we want to normalize the in_app values in case the
-            # clients did not set this appropriately so far.
-            grouping_config = load_grouping_config(
-                get_grouping_config_dict_for_event_data(job["data"], project)
-            )
+@metrics.wraps("event_manager.save_error_events")
+def save_error_events(jobs, projects):
+    """
+    Saves a batch of normalized error events.
 
-        with metrics.timer("event_manager.normalize_stacktraces_for_grouping"):
-            normalize_stacktraces_for_grouping(job["data"], grouping_config)
+    Every job needs the event ``data``, ``project_id``, ``start_time`` and
+    optionally ``raw`` and ``cache_key``, as passed to ``EventManager.save``.
+    Grouping runs for every event on its own, while releases, environments,
+    tsdb, nodestore and eventstream writes are handled for the whole batch.
 
-        _derive_plugin_tags_many(jobs, projects)
-        _derive_interface_tags_many(jobs)
+    If the hash of an event has been discarded, the ``HashDiscarded``
+    exception is stored on its job as ``hash_discarded`` and the event is not
+    saved. All other jobs hold the saved ``event`` afterwards.
 
-        with metrics.timer("event_manager.apply_server_fingerprinting"):
-            # The active grouping config was put into the event in the
-            # normalize step before.  We now also make sure that the
-            # fingerprint was set to `'{{ default }}' just in case someone
-            # removed it from the payload.  The call to get_hashes will then
-            # look at `grouping_config` to pick the right parameters.
-            job["data"]["fingerprint"] = job["data"].get("fingerprint") or ["{{ default }}"]
-            apply_server_fingerprinting(
-                job["data"],
-                get_fingerprinting_config_for_project(project),
-                allow_custom_title=features.has(
-                    "organizations:custom-event-title", project.organization, actor=None
-                ),
-            )
+    ``EventManager.save`` passes a single job. The ``save_events`` task saves
+    the error events of an ingest consumer batch with the
+    ``store.save-event-batches`` option.
+    """
+    _cache_organizations(projects)
 
-        with metrics.timer("event_manager.event.get_hashes"):
-            # Here we try to use the grouping config that was requested in the
-            # event.  If that config has since been deleted (because it was an
-            # experimental grouping config) we fall back to the default.
-            try:
-                flat_hashes, hierarchical_hashes = job["event"].get_hashes()
-            except GroupingConfigNotFound:
-                job["data"]["grouping_config"] = get_grouping_config_dict_for_project(project)
-                flat_hashes, hierarchical_hashes = job["event"].get_hashes()
+    for job in jobs:
+        job.setdefault("raw", False)
+        job.setdefault("cache_key", None)
+        job["is_reprocessed"] = is_reprocessed_event(job["data"])
 
-        job["data"]["hashes"] = flat_hashes
-        if hierarchical_hashes:
-            job["data"]["hierarchical_hashes"] = hierarchical_hashes
+    _pull_out_data(jobs, projects)
+    _get_or_create_release_many(jobs, projects)
+    _get_event_user_many(jobs, projects)
+    _get_project_key_many(jobs)
 
-        _materialize_metadata_many(jobs)
-
-        # The group gets the same metadata as the event when it's flushed but
-        # additionally the `last_received` key is set.  This key is used by
-        # _save_aggregate.
-        group_metadata = dict(job["materialized_metadata"])
-        group_metadata["last_received"] = job["received_timestamp"]
-        kwargs = {
-            "platform": job["platform"],
-            "message": job["event"].search_message,
-            "culprit": job["culprit"],
-            "logger": job["logger_name"],
-            "level": LOG_LEVELS_MAP.get(job["level"]),
-            "last_seen": job["event"].datetime,
-            "first_seen": job["event"].datetime,
-            "active_at": job["event"].datetime,
-            "data": group_metadata,
-        }
+    with metrics.timer("event_manager.normalize_stacktraces_for_grouping"):
+        for job in jobs:
+            # At this point we want to normalize the in_app values in case the
+            # clients did not set this appropriately so far.
+            grouping_config = load_grouping_config(
+                get_grouping_config_dict_for_event_data(job["data"], projects[job["project_id"]])
+            )
+            normalize_stacktraces_for_grouping(job["data"], grouping_config)
 
-        if job["release"]:
-            kwargs["first_release"] = job["release"]
+    _derive_plugin_tags_many(jobs, projects)
+    _derive_interface_tags_many(jobs)
+    _calculate_hashes_many(jobs, projects)
+    _materialize_metadata_many(jobs)
 
+    saved_jobs = []
+    for job in jobs:
         # Load attachments first, but persist them at the very last after
         # posting to eventstream to make sure all counters and eventstream are
         # incremented for sure. Also wait for grouping to remove attachments
         # based on the group counter.
         with metrics.timer("event_manager.get_attachments"):
-            attachments = get_attachments(cache_key, job)
-
-        save_aggregate_fn = (
-            _save_aggregate2
-            if not options.get("store.race-free-group-creation-force-disable")
-            and features.has("projects:race-free-group-creation", project)
-            else _save_aggregate
-        )
+            job["attachments"] = get_attachments(job["cache_key"], job)
 
         try:
-            job["group"], job["is_new"], job["is_regression"] = save_aggregate_fn(
-                event=job["event"],
-                flat_hashes=flat_hashes,
-                hierarchical_hashes=hierarchical_hashes,
-                release=job["release"],
-                **kwargs,
-            )
-        except HashDiscarded:
-            discard_event(job, attachments)
-            raise
-
-        job["event"].group = job["group"]
+            _save_aggregate_for_job(job, projects[job["project_id"]])
+        except HashDiscarded as e:
+            discard_event(job, job["attachments"])
+            job["hash_discarded"] = e
+        else:
+            saved_jobs.append(job)
 
-        # store a reference to the group id to guarantee validation of isolation
-        # XXX(markus): No clue what this does
-        job["event"].data.bind_ref(job["event"])
+    jobs = saved_jobs
 
-        _get_or_create_environment_many(jobs, projects)
+    _get_or_create_environment_many(jobs, projects)
 
+    for job in jobs:
         if job["group"]:
             group_environment, job["is_new_group_environment"] = GroupEnvironment.get_or_create(
                 group_id=job["group"].id,
@@ -436,8 +402,9 @@ class EventManager:
         else:
             job["is_new_group_environment"] = False
 
-        _get_or_create_release_associated_models(jobs, projects)
+    _get_or_create_release_associated_models(jobs, projects)
 
+    for job in jobs:
         if job["release"] and job["group"]:
             job["grouprelease"] = GroupRelease.get_or_create(
                 group=job["group"],
@@ -446,25 +413,30 @@ class EventManager:
                 datetime=job["event"].datetime,
             )
 
-        _tsdb_record_all_metrics(jobs)
+    _tsdb_record_all_metrics(jobs)
 
+    for job in jobs:
         if job["group"]:
-            UserReport.objects.filter(project_id=project.id, event_id=job["event"].event_id).update(
-                group_id=job["group"].id, environment_id=job["environment"].id
-            )
+            UserReport.objects.filter(
+                project_id=job["project_id"], event_id=job["event"].event_id
+            ).update(group_id=job["group"].id, environment_id=job["environment"].id)
 
         with metrics.timer("event_manager.filter_attachments_for_group"):
-            attachments = filter_attachments_for_group(attachments, job)
+            job["attachments"] = filter_attachments_for_group(job["attachments"], job)
 
-        # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
-        _materialize_event_metrics(jobs)
+    # XXX: DO NOT MUTATE THE EVENT PAYLOAD AFTER THIS POINT
+    _materialize_event_metrics(jobs)
 
-        for attachment in attachments:
+    for job in jobs:
+        for attachment in job["attachments"]:
             key = f"bytes.stored.{attachment.type}"
             old_bytes = job["event_metrics"].get(key) or 0
             job["event_metrics"][key] = old_bytes + attachment.size
 
-        _nodestore_save_many(jobs)
+    _nodestore_save_many(jobs)
+
+    for job in jobs:
+        project = projects[job["project_id"]]
         save_unprocessed_event(project, job["event"].event_id)
 
         if job["release"]:
@@ -485,27 +457,28 @@ class EventManager:
                     },
                 )
 
-        if not raw:
+        if not job["raw"]:
             if not project.first_event:
                 project.update(first_event=job["event"].datetime)
                 first_event_received.send_robust(
                     project=project, event=job["event"], sender=Project
                 )
 
-        if is_reprocessed:
+        if job["is_reprocessed"]:
             safe_execute(delete_old_primary_hash, job["event"])
 
-        _eventstream_insert_many(jobs)
+    _eventstream_insert_many(jobs)
 
+    for job in jobs:
         # Do this last to ensure signals get emitted even if connection to the
         # file store breaks temporarily.
         #
         # We do not need this for reprocessed events as for those we update the
         # group_id on existing models in post_process_group, which already does
         # this because of indiv. attachments.
-        if not is_reprocessed:
+        if not job["is_reprocessed"]:
             with metrics.timer("event_manager.save_attachments"):
-                save_attachments(cache_key, attachments, job)
+                save_attachments(job["cache_key"], job["attachments"], job)
 
         metric_tags = {"from_relay": "_relay_processed" in job["data"]}
 
@@ -521,10 +494,110 @@ class EventManager:
             tags=metric_tags,
         )
 
-        _track_outcome_accepted_many(jobs)
+    _track_outcome_accepted_many(jobs)
 
-        self._data = job["event"].data.data
-        return job["event"]
+
+@metrics.wraps("save_event.cache_organizations")
+def _cache_organizations(projects):
+    organization_ids = {project.organization_id for project in projects.values()}
+    organizations = {o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)}
+
+    for project in projects.values():
+        try:
+            project._organization_cache = organizations[project.organization_id]
+        except KeyError:
+            continue
+
+
+@metrics.wraps("save_event.get_project_key_many")
+def _get_project_key_many(jobs):
+    key_ids = {job["key_id"] for job in jobs if job["key_id"] is not None}
+    project_keys = (
+        {k.id: k for k in ProjectKey.objects.get_many_from_cache(key_ids)} if key_ids else {}
+    )
+
+    for job in jobs:
+        job["project_key"] = project_keys.get(job["key_id"])
+
+
+@metrics.wraps("save_event.calculate_hashes_many")
+def _calculate_hashes_many(jobs, projects):
+    for job in jobs:
+        project = projects[job["project_id"]]
+
+        with metrics.timer("event_manager.apply_server_fingerprinting"):
+            # The active grouping config was put into the event in the
+            # normalize step before.  We now also make sure that the
+            # fingerprint was set to `'{{ default }}' just in case someone
+            # removed it from the payload.  The call to get_hashes will then
+            # look at `grouping_config` to pick the right parameters.
+            job["data"]["fingerprint"] = job["data"].get("fingerprint") or ["{{ default }}"]
+            apply_server_fingerprinting(
+                job["data"],
+                get_fingerprinting_config_for_project(project),
+                allow_custom_title=features.has(
+                    "organizations:custom-event-title", project.organization, actor=None
+                ),
+            )
+
+        with metrics.timer("event_manager.event.get_hashes"):
+            # Here we try to use the grouping config that was requested in the
+            # event.  If that config has since been deleted (because it was an
+            # experimental grouping config) we fall back to the default.
+            try:
+                flat_hashes, hierarchical_hashes = job["event"].get_hashes()
+            except GroupingConfigNotFound:
+                job["data"]["grouping_config"] = get_grouping_config_dict_for_project(project)
+                flat_hashes, hierarchical_hashes = job["event"].get_hashes()
+
+        job["flat_hashes"] = flat_hashes
+        job["hierarchical_hashes"] = hierarchical_hashes
+        job["data"]["hashes"] = flat_hashes
+        if hierarchical_hashes:
+            job["data"]["hierarchical_hashes"] = hierarchical_hashes
+
+
+def _save_aggregate_for_job(job, project):
+    # The group gets the same metadata as the event when it's flushed but
+    # additionally the `last_received` key is set.  This key is used by
+    # _save_aggregate.
+    group_metadata = dict(job["materialized_metadata"])
+    group_metadata["last_received"] = job["received_timestamp"]
+    kwargs = {
+        "platform": job["platform"],
+        "message": job["event"].search_message,
+        "culprit": job["culprit"],
+        "logger": job["logger_name"],
+        "level": LOG_LEVELS_MAP.get(job["level"]),
+        "last_seen": job["event"].datetime,
+        "first_seen": job["event"].datetime,
+        "active_at": job["event"].datetime,
+        "data": group_metadata,
+    }
+
+    if job["release"]:
+        kwargs["first_release"] = job["release"]
+
+    save_aggregate_fn = (
+        _save_aggregate2
+        if not options.get("store.race-free-group-creation-force-disable")
+        and features.has("projects:race-free-group-creation", project)
+        else _save_aggregate
+    )
+
+    job["group"], job["is_new"], job["is_regression"] = save_aggregate_fn(
+        event=job["event"],
+        flat_hashes=job["flat_hashes"],
+        hierarchical_hashes=job["hierarchical_hashes"],
+        release=job["release"],
+        **kwargs,
+    )
+
+    job["event"].group = job["group"]
+
+    # store a reference to the group id to guarantee validation of isolation
+    # XXX(markus): No clue what this does
+    job["event"].data.bind_ref(job["event"])
 
 
 @metrics.wraps("save_event.pull_out_data")
@@ -566,7 +639,7 @@ def _pull_out_data(jobs, projects):
         # into tags (logger, level, environment, transaction).  These are
         # different from legacy attributes which are normalized into tags
         # ahead of time (site, server_name).
-        setdefault_path(data, "tags", value=[])
+        _setdefault_tags(data, [])
         set_tag(data, "level", level)
         if logger_name:
             set_tag(data, "logger", logger_name)
@@ -684,10 +757,16 @@ def _materialize_metadata_many(jobs):
 
 @metrics.wraps("save_event.get_or_create_environment_many")
 def _get_or_create_environment_many(jobs, projects):
+    environments = {}
+
     for job in jobs:
-        job["environment"] = Environment.get_or_create(
-            project=projects[job["project_id"]], name=job["environment"]
-        )
+        environment_key = (job["project_id"], job["environment"])
+        environment = environments.get(environment_key)
+        if environment is None:
+            environment = environments[environment_key] = Environment.get_or_create(
+                project=projects[job["project_id"]], name=job["environment"]
+            )
+        job["environment"] = environment
 
 
 @metrics.wraps("save_event.get_or_create_release_associated_models")
@@ -718,29 +797,38 @@ def _tsdb_record_all_metrics(jobs):
     """
     Do all tsdb-related things for save_event in here s.t. we can potentially
     put everything in a single redis pipeline someday.
+
+    Writes are collected for the whole batch first, so that every environment
+    (and timestamp, for distinct counters and frequencies) only needs one call.
     """
 
     # XXX: validate whether anybody actually uses those metrics
 
-    for job in jobs:
-        incrs = []
-        frequencies = []
-        records = []
+    # environment_id -> [(model, key, options)]
+    incrs = defaultdict(list)
+    # (timestamp, environment_id) -> [(model, key, values)]
+    records = defaultdict(list)
+    # timestamp -> [(model, request)]
+    frequencies = defaultdict(list)
 
-        incrs.append((tsdb.models.project, job["project_id"]))
+    for job in jobs:
         event = job["event"]
         group = job["group"]
         release = job["release"]
         environment = job["environment"]
+        timestamp = event.datetime
+
+        job_incrs = incrs[environment.id]
+        job_incrs.append((tsdb.models.project, job["project_id"], {"timestamp": timestamp}))
 
         if group:
-            incrs.append((tsdb.models.group, group.id))
-            frequencies.append(
+            job_incrs.append((tsdb.models.group, group.id, {"timestamp": timestamp}))
+            frequencies[timestamp].append(
                 (tsdb.models.frequent_environments_by_group, {group.id: {environment.id: 1}})
             )
 
             if release:
-                frequencies.append(
+                frequencies[timestamp].append(
                     (
                         tsdb.models.frequent_releases_by_group,
                         {group.id: {job["grouprelease"].id: 1}},
@@ -748,25 +836,30 @@ def _tsdb_record_all_metrics(jobs):
                 )
 
         if release:
-            incrs.append((tsdb.models.release, release.id))
+            job_incrs.append((tsdb.models.release, release.id, {"timestamp": timestamp}))
 
         user = job["user"]
 
         if user:
             project_id = job["project_id"]
-            records.append((tsdb.models.users_affected_by_project, project_id, (user.tag_value,)))
+            job_records = records[(timestamp, environment.id)]
+            job_records.append(
+                (tsdb.models.users_affected_by_project, project_id, (user.tag_value,))
+            )
 
             if group:
-                records.append((tsdb.models.users_affected_by_group, group.id, (user.tag_value,)))
+                job_records.append(
+                    (tsdb.models.users_affected_by_group, group.id, (user.tag_value,))
+                )
 
-        if incrs:
-            tsdb.incr_multi(incrs, timestamp=event.datetime, environment_id=environment.id)
+    for environment_id, items in incrs.items():
+        tsdb.incr_multi(items, environment_id=environment_id)
 
-        if records:
-            tsdb.record_multi(records, timestamp=event.datetime, environment_id=environment.id)
+    for (timestamp, environment_id), items in records.items():
+        tsdb.record_multi(items, timestamp=timestamp, environment_id=environment_id)
 
-        if frequencies:
-            tsdb.record_frequency_multi(frequencies, timestamp=event.datetime)
+    for timestamp, requests in frequencies.items():
+        tsdb.record_frequency_multi(requests, timestamp=timestamp)
 
 
 @metrics.wraps("save_event.nodestore_save_many")
@@ -1588,20 +1681,7 @@ def _materialize_event_metrics(jobs):
 
 @metrics.wraps("event_manager.save_transaction_events")
 def save_transaction_events(jobs, projects):
-    with metrics.timer("event_manager.save_transactions.collect_organization_ids"):
-        organization_ids = {project.organization_id for project in projects.values()}
-
-    with metrics.timer("event_manager.save_transactions.fetch_organizations"):
-        organizations = {
-            o.id: o for o in Organization.objects.get_many_from_cache(organization_ids)
-        }
-
-    with metrics.timer("event_manager.save_transactions.set_organization_cache"):
-        for project in projects.values():
-            try:
-                project._organization_cache = organizations[project.organization_id]
-            except KeyError:
-                continue
+    _cache_organizations(projects)
 
     with metrics.timer("event_manager.save_transactions.prepare_jobs"):
         for job in jobs:
@@ -11,17 +11,29 @@ from sentry.grouping.variants import (
     SaltedComponentVariant,
     HIERARCHICAL_VARIANTS,
 )
-from sentry.grouping.enhancer import Enhancements, InvalidEnhancerConfig, ENHANCEMENT_BASES
+from sentry.grouping.enhancer import (
+    Enhancements,
+    InvalidEnhancerConfig,
+    ENHANCEMENT_BASES,
+    ENHANCEMENTS_CACHE_SIZE,
+)
 from sentry.grouping.utils import (
     is_default_fingerprint_var,
     hash_from_values,
     resolve_fingerprint_values,
     expand_title_template,
 )
+from sentry.utils.cache import LRUCache
 
 
 HASH_RE = re.compile(r"^[0-9a-f]{32}$")
 
+# Dumped enhancements keyed by the hash of the project's config.  This sits
+# in front of the shared cache, which holds the same values for all workers.
+project_enhancements_cache = LRUCache(
+    ENHANCEMENTS_CACHE_SIZE, metric="grouping.enhancements.cache", tags={"cache": "project"}
+)
+
 
 class GroupingConfigNotFound(LookupError):
     pass
@@ -61,15 +73,18 @@ def _get_project_enhancements_config(project):
     cache_key = (
         "grouping-enhancements:" + md5_text(f"{enhancements_base}|{enhancements}").hexdigest()
     )
-    rv = cache.get(cache_key)
+    rv = project_enhancements_cache.get(cache_key)
     if rv is not None:
         return rv
 
-    try:
-        rv = Enhancements.from_config_string(enhancements, bases=[enhancements_base]).dumps()
-    except InvalidEnhancerConfig:
-        rv = get_default_enhancements()
-    cache.set(cache_key, rv)
+    rv = cache.get(cache_key)
+    if rv is None:
+        try:
+            rv = Enhancements.from_config_string(enhancements, bases=[enhancements_base]).dumps()
+        except InvalidEnhancerConfig:
+            rv = get_default_enhancements()
+        cache.set(cache_key, rv)
+    project_enhancements_cache.set(cache_key, rv)
     return rv
 
 
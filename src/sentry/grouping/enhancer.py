@@ -12,8 +12,9 @@ from sentry.stacktraces.functions import set_in_app
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.utils import get_rule_bool
+from sentry.utils.cache import LRUCache
 from sentry.utils.glob import glob_match
-from sentry.utils.safe import get_path
+from sentry.utils.safe import compile_path
 from sentry.utils.compat import zip
 from sentry.utils.strings import unescape_string
 
@@ -88,6 +89,8 @@ ACTION_FLAGS = {
 }
 REVERSE_ACTION_FLAGS = {v: k for k, v in ACTION_FLAGS.items()}
 
+_get_orig_in_app = compile_path("data", "orig_in_app")
+
 
 MATCHERS = {
     # discover field names
@@ -106,10 +109,33 @@ MATCHERS = {
 }
 
 
+# Upper bound of distinct frames whose matching rules are remembered by
+# compiled enhancements, see ``CompiledRules``.
+FRAME_CACHE_SIZE = 10000
+
+# Upper bound of distinct configs kept by every process local enhancements cache.
+ENHANCEMENTS_CACHE_SIZE = 1000
+
+
 class InvalidEnhancerConfig(Exception):
     pass
 
 
+def get_frame_match_values(frame_data, platform):
+    """Extracts everything but ``in_app`` that matchers test from a frame.
+    ``in_app`` is excluded as rules can change it while they are applied.
+    """
+    from sentry.stacktraces.functions import get_function_name_for_frame
+
+    return (
+        get_behavior_family_for_platform(frame_data.get("platform") or platform),
+        get_function_name_for_frame(frame_data, platform) or "<unknown>",
+        frame_data.get("module") or "<unknown>",
+        frame_data.get("abs_path") or frame_data.get("filename") or "",
+        frame_data.get("package") or "",
+    )
+
+
 class Match:
     def __init__(self, key, pattern, negated=False):
         try:
@@ -127,18 +153,39 @@ class Match:
         )
 
     def matches_frame(self, frame_data, platform):
-        rv = self._positive_frame_match(frame_data, platform)
+        if self.key == "app":
+            return self.matches_app(frame_data)
+        return self.matches_values(get_frame_match_values(frame_data, platform))
+
+    def matches_app(self, frame_data):
+        rv = self._positive_app_match(frame_data)
+        if self.negated:
+            rv = not rv
+        return rv
+
+    def matches_values(self, match_values):
+        """Like ``matches_frame`` for matchers other than ``app``, but with
+        the values from ``get_frame_match_values``.
+        """
+        rv = self._positive_value_match(match_values)
         if self.negated:
             rv = not rv
         return rv
 
-    def _positive_frame_match(self, frame_data, platform):
+    def _positive_app_match(self, frame_data):
+        # in-app matching is just a bool
+        ref_val = get_rule_bool(self.pattern)
+        return ref_val is not None and ref_val == frame_data.get("in_app")
+
+    def _positive_value_match(self, match_values):
+        family, function, module, path, package = match_values
+
         # Path matches are always case insensitive
         if self.key in ("path", "package"):
             if self.key == "package":
-                value = frame_data.get("package") or ""
+                value = package
             else:
-                value = frame_data.get("abs_path") or frame_data.get("filename") or ""
+                value = path
             if glob_match(
                 value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
             ):
@@ -154,21 +201,13 @@ class Match:
             flags = self.pattern.split(",")
             if "all" in flags:
                 return True
-            family = get_behavior_family_for_platform(frame_data.get("platform") or platform)
             return family in flags
 
-        # in-app matching is just a bool
-        if self.key == "app":
-            ref_val = get_rule_bool(self.pattern)
-            return ref_val is not None and ref_val == frame_data.get("in_app")
-
         # all other matches are case sensitive
         if self.key == "function":
-            from sentry.stacktraces.functions import get_function_name_for_frame
-
-            value = get_function_name_for_frame(frame_data, platform) or "<unknown>"
+            value = function
         elif self.key == "module":
-            value = frame_data.get("module") or "<unknown>"
+            value = module
         else:
             # should not happen :)
             value = "<unknown>"
@@ -243,7 +282,7 @@ class FlagAction(Action):
         return []
 
     def _in_app_changed(self, frame, component):
-        orig_in_app = get_path(frame, "data", "orig_in_app")
+        orig_in_app = _get_orig_in_app(frame)
 
         if orig_in_app is not None:
             if orig_in_app == -1:
@@ -335,26 +374,31 @@ class Enhancements:
             bases = []
         self.bases = bases
 
+    def _get_compiled_rules(self):
+        # Compiled lazily and not in the constructor, so that the rules of
+        # enhancements that are only parsed or serialized aren't compiled.
+        compiled = self.__dict__.get("_compiled_rules")
+        if compiled is None:
+            compiled = self._compiled_rules = CompiledRules(list(self.iter_rules()))
+        return compiled
+
     def apply_modifications_to_frame(self, frames, platform):
         """This applies the frame modifications to the frames itself.  This
         does not affect grouping.
         """
-        for rule in self.iter_rules():
-            for idx, frame in enumerate(frames):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.apply_modifications_to_frame(frames, idx)
+        for rule, idx in self._get_compiled_rules().iter_matches(frames, platform):
+            for action in rule.actions:
+                action.apply_modifications_to_frame(frames, idx)
 
     def update_frame_components_contributions(self, components, frames, platform):
         stacktrace_state = StacktraceState()
 
         # Apply direct frame actions and update the stack state alongside
-        for rule in self.iter_rules():
-            for idx, (component, frame) in enumerate(zip(components, frames)):
-                actions = rule.get_matching_frame_actions(frame, platform)
-                for action in actions or ():
-                    action.update_frame_components_contributions(components, frames, idx, rule=rule)
-                    action.modify_stacktrace_state(stacktrace_state, rule)
+        matched_frames = frames[: len(components)]
+        for rule, idx in self._get_compiled_rules().iter_matches(matched_frames, platform):
+            for action in rule.actions:
+                action.update_frame_components_contributions(components, frames, idx, rule=rule)
+                action.modify_stacktrace_state(stacktrace_state, rule)
 
         # Use the stack state to update frame contributions again to trim
         # down to max-frames.  min-frames is handled on the other hand for
@@ -450,8 +494,21 @@ class Enhancements:
 
     @classmethod
     def loads(cls, data):
-        if isinstance(data, str):
-            data = data.encode("ascii", "ignore")
+        """Loads dumped enhancements.  As the same few configs are loaded for
+        every event, the result is shared through a process wide cache and
+        must not be modified.
+        """
+        if isinstance(data, bytes):
+            data = data.decode("ascii", "ignore")
+        rv = loaded_enhancements_cache.get(data)
+        if rv is None:
+            rv = cls._loads(data)
+            loaded_enhancements_cache.set(data, rv)
+        return rv
+
+    @classmethod
+    def _loads(cls, data):
+        data = data.encode("ascii", "ignore")
         padded = data + b"=" * (4 - (len(data) % 4))
         try:
             return cls._from_config_structure(
@@ -513,6 +570,64 @@ class Rule:
         )
 
 
+class CompiledRules:
+    """Matches frames against a list of rules.
+
+    For every frame, all matchers except for ``app`` are evaluated against all
+    rules in one pass and the indexes of matching rules are cached by the
+    frame's match values, so recurring frames are only matched once.  The
+    ``app`` matchers are checked when a rule is applied, as earlier rules can
+    change ``in_app`` of any frame.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._value_matchers = []
+        self._app_matchers = []
+        for rule in rules:
+            value_matchers = [m for m in rule.matchers if m.key != "app"]
+            # Family matchers are cheap and rule out most rules for a frame,
+            # so they are checked first.
+            value_matchers.sort(key=lambda m: m.key != "family")
+            self._value_matchers.append(value_matchers)
+            self._app_matchers.append([m for m in rule.matchers if m.key == "app"])
+        self._frame_cache = {}
+
+    def _get_matching_rule_indexes(self, match_values):
+        rv = self._frame_cache.get(match_values)
+        if rv is None:
+            rv = tuple(
+                rule_idx
+                for rule_idx, (rule, matchers) in enumerate(zip(self.rules, self._value_matchers))
+                if rule.matchers and all(m.matches_values(match_values) for m in matchers)
+            )
+            if len(self._frame_cache) >= FRAME_CACHE_SIZE:
+                self._frame_cache.clear()
+            self._frame_cache[match_values] = rv
+        return rv
+
+    def iter_matches(self, frames, platform):
+        """Yields ``(rule, frame_idx)`` for every rule matching a frame in
+        the same order as iterating over rules and then over frames would.
+        """
+        frame_indexes = [[] for _ in self.rules]
+        for idx, frame in enumerate(frames):
+            match_values = get_frame_match_values(frame, platform)
+            for rule_idx in self._get_matching_rule_indexes(match_values):
+                frame_indexes[rule_idx].append(idx)
+
+        for rule, app_matchers, indexes in zip(self.rules, self._app_matchers, frame_indexes):
+            for idx in indexes:
+                if all(m.matches_app(frames[idx]) for m in app_matchers):
+                    yield rule, idx
+
+
+# Enhancements loaded from their dumped form, keyed by that.
+loaded_enhancements_cache = LRUCache(
+    ENHANCEMENTS_CACHE_SIZE, metric="grouping.enhancements.cache", tags={"cache": "loaded"}
+)
+
+
 class EnhancmentsVisitor(NodeVisitor):
     visit_comment = visit_empty = lambda *a: None
     unwrapped_exceptions = (InvalidEnhancerConfig,)
@@ -5,13 +5,17 @@ from parsimonious.exceptions import ParseError
 
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.utils import get_rule_bool
-from sentry.utils.safe import get_path
+from sentry.utils.safe import compile_path, get_path
 from sentry.utils.glob import glob_match
 from sentry.utils.strings import unescape_string
 
 
 VERSION = 1
 
+_get_exceptions = compile_path("exception", "values", filter=True)
+_get_frames = compile_path("stacktrace", "frames", filter=True)
+_get_tags = compile_path("tags", filter=True)
+
 
 # Grammar is defined in EBNF syntax.
 fingerprinting_grammar = Grammar(
@@ -99,7 +103,7 @@ class EventAccess:
     def get_exceptions(self):
         if self._exceptions is None:
             self._exceptions = []
-            for exc in get_path(self.event, "exception", "values", filter=True) or ():
+            for exc in _get_exceptions(self.event) or ():
                 self._exceptions.append(
                     {
                         "type": exc.get("type"),
@@ -131,8 +135,8 @@ class EventAccess:
                 )
 
             have_errors = False
-            for exc in get_path(self.event, "exception", "values", filter=True) or ():
-                for frame in get_path(exc, "stacktrace", "frames", filter=True) or ():
+            for exc in _get_exceptions(self.event) or ():
+                for frame in _get_frames(exc) or ():
                     _push_frame(frame)
                 have_errors = True
 
@@ -155,7 +159,7 @@ class EventAccess:
     def get_tags(self):
         if self._tags is None:
             self._tags = [
-                {"tags.%s" % k: v for (k, v) in get_path(self.event, "tags", filter=True) or ()}
+                {"tags.%s" % k: v for (k, v) in _get_tags(self.event) or ()}
             ]
         return self._tags
 
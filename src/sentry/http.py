@@ -29,7 +29,9 @@ logger = logging.getLogger(__name__)
 MAX_URL_LENGTH = 150
 
 # UrlResult.body **must** be bytes
-UrlResult = namedtuple("UrlResult", ["url", "headers", "body", "status", "encoding"])
+UrlResult = namedtuple("UrlResult", ["url", "headers", "body", "status", "encoding", "checksum"])
+# The SHA1 checksum of the body is only known ahead for files stored by Sentry
+UrlResult.__new__.__defaults__ = (None,)
 
 # In case SSL is unavailable (light builds) we can't import this here.
 try:
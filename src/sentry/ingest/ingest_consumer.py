@@ -2,17 +2,21 @@ import random
 import functools
 import logging
 import msgpack
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 from django.conf import settings
+from django.db import connections
 from django.core.cache import cache
 
 import sentry_sdk
 
-from sentry import eventstore, features, options
+from sentry import buffer, eventstore, features, options
 
-from sentry.models import Project
+from sentry.models import Project, ProjectOption
 from sentry.signals import event_accepted
-from sentry.tasks.store import preprocess_event
+from sentry.tasks.store import preprocess_event, save_events
 from sentry.utils import json, metrics
 from sentry.utils.sdk import mark_scope_as_unsafe
 from sentry.utils.dates import to_datetime
@@ -22,7 +26,7 @@ from sentry.utils.batching_kafka_consumer import AbstractBatchWorker
 from sentry.attachments import CachedAttachment, attachment_cache
 from sentry.ingest.types import ConsumerType
 from sentry.ingest.userreport import Conflict, save_userreport
-from sentry.event_manager import save_attachment
+from sentry.event_manager import _cache_organizations, save_attachment
 from sentry.eventstore.processing import event_processing_store
 
 logger = logging.getLogger(__name__)
@@ -32,6 +36,26 @@ CACHE_TIMEOUT = 3600
 
 
 class IngestConsumerWorker(AbstractBatchWorker):
+    """
+    Processes batches of ingest messages. With ``processes`` greater than one,
+    the messages of a batch are fanned out to a pool of worker processes.
+    Messages belonging to the same event are always processed in order by a
+    single process, and a batch is only flushed (and its offsets committed)
+    once every message in it has finished.
+    """
+
+    def __init__(self, processes=1):
+        self.processes = processes
+        self.__pool = None
+
+    def _get_pool(self):
+        if self.__pool is None:
+            # Database connections must not be shared with the forked
+            # processes, they are reopened on demand by either side.
+            connections.close_all()
+            self.__pool = ProcessPoolExecutor(self.processes)
+        return self.__pool
+
     def process_message(self, message):
         message = msgpack.unpackb(message.value(), use_list=False)
         return message
@@ -39,7 +63,15 @@ class IngestConsumerWorker(AbstractBatchWorker):
     def flush_batch(self, batch):
         mark_scope_as_unsafe()
         with metrics.timer("ingest_consumer.flush_batch"):
-            return self._flush_batch(batch)
+            try:
+                return self._flush_batch(batch)
+            finally:
+                # Hand increments coalesced while processing this batch over
+                # to the buffer backend.
+                buffer.flush()
+                # Options prefetched for this batch must not outlive it, the
+                # consumer does not clear the local cache otherwise.
+                ProjectOption.objects.clear_local_cache()
 
     def _flush_batch(self, batch):
         attachment_chunks = []
@@ -68,20 +100,98 @@ class IngestConsumerWorker(AbstractBatchWorker):
 
         with metrics.timer("ingest_consumer.fetch_projects"):
             projects = {p.id: p for p in Project.objects.get_many_from_cache(projects_to_fetch)}
+            _cache_organizations(projects)
+
+        if self.processes <= 1:
+            # Worker processes fetch the options for themselves.
+            with metrics.timer("ingest_consumer.fetch_project_options"):
+                ProjectOption.objects.get_all_values_bulk(projects.values())
 
         if attachment_chunks:
             # attachment_chunk messages need to be processed before attachment/event messages.
             with metrics.timer("ingest_consumer.process_attachment_chunk_batch"):
-                for attachment_chunk in attachment_chunks:
-                    process_attachment_chunk(attachment_chunk, projects=projects)
+                self._process_messages(
+                    [(process_attachment_chunk, chunk) for chunk in attachment_chunks], projects
+                )
 
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
-                for processing_func, message in other_messages:
-                    processing_func(message, projects=projects)
+                self._process_messages(
+                    other_messages,
+                    projects,
+                    save_event_batches=options.get("store.save-event-batches"),
+                )
+
+    def _process_messages(self, messages, projects, save_event_batches=False):
+        if self.processes <= 1 or len(messages) <= 1:
+            _run_processing_funcs(messages, projects, save_event_batches)
+            return
+
+        # Group messages by event to keep chunks, attachments and events in
+        # the order they were produced in, then spread the groups evenly
+        # across one task per process.
+        groups = OrderedDict()
+        for processing_func, message in messages:
+            key = (message["project_id"], message.get("event_id"))
+            groups.setdefault(key, []).append((processing_func, message))
+
+        tasks = [[] for _ in range(min(self.processes, len(groups)))]
+        for index, group in enumerate(groups.values()):
+            tasks[index % len(tasks)].extend(group)
+
+        # Consuming the results blocks until every task has completed and
+        # re-raises the first error, so a batch is never committed partially.
+        # If a worker process dies, e.g. killed for running out of memory, the
+        # pool is broken and raises too. It is replaced for the next batch.
+        pool = self._get_pool()
+        try:
+            list(
+                pool.map(
+                    _process_messages_task,
+                    [(task, projects, save_event_batches) for task in tasks],
+                )
+            )
+        except BrokenProcessPool:
+            pool.shutdown(wait=False)
+            self.__pool = None
+            raise
 
     def shutdown(self):
-        pass
+        if self.__pool is not None:
+            self.__pool.shutdown()
+            self.__pool = None
+
+
+def _process_messages_task(args):
+    """
+    Processes a list of messages in a worker process of
+    ``IngestConsumerWorker``.
+    """
+    messages, projects, save_event_batches = args
+    mark_scope_as_unsafe()
+    try:
+        ProjectOption.objects.get_all_values_bulk(projects.values())
+        _run_processing_funcs(messages, projects, save_event_batches)
+    finally:
+        buffer.flush()
+        ProjectOption.objects.clear_local_cache()
+
+
+def _run_processing_funcs(messages, projects, save_event_batches=False):
+    """
+    Processes a list of messages. With ``save_event_batches``, the error
+    events that need no processing are saved by a single ``save_events``
+    task once all messages were processed.
+    """
+    save_batch = [] if save_event_batches else None
+    for processing_func, message in messages:
+        if processing_func is process_event:
+            processing_func(message, projects=projects, save_batch=save_batch)
+        else:
+            processing_func(message, projects=projects)
+
+    if save_batch:
+        save_events.delay(jobs=save_batch)
 
 
 def trace_func(**span_kwargs):
@@ -100,7 +210,7 @@ def trace_func(**span_kwargs):
 
 
 @metrics.wraps("ingest_consumer.process_event")
-def _do_process_event(message, projects):
+def _do_process_event(message, projects, save_batch=None):
     payload = message["payload"]
     start_time = float(message["start_time"])
     event_id = message["event_id"]
@@ -169,6 +279,8 @@ def _do_process_event(message, projects):
             start_time=start_time,
             event_id=event_id,
             project=project,
+            organization_prefetched=True,
+            save_batch=save_batch,
         )
 
     # remember for an 1 hour that we saved this event (deduplication protection)
@@ -179,8 +291,8 @@ def _do_process_event(message, projects):
 
 
 @trace_func(name="ingest_consumer.process_event")
-def process_event(message, projects):
-    return _do_process_event(message, projects)
+def process_event(message, projects, save_batch=None):
+    return _do_process_event(message, projects, save_batch=save_batch)
 
 
 @trace_func(name="ingest_consumer.process_attachment_chunk")
@@ -270,7 +382,7 @@ def process_userreport(message, projects):
         return False
 
 
-def get_ingest_consumer(consumer_types, once=False, **options):
+def get_ingest_consumer(consumer_types, once=False, processes=1, **options):
     """
     Handles events coming via a kafka queue.
 
@@ -278,5 +390,5 @@ def get_ingest_consumer(consumer_types, once=False, **options):
     """
     topic_names = {ConsumerType.get_topic_name(consumer_type) for consumer_type in consumer_types}
     return create_batching_kafka_consumer(
-        topic_names=topic_names, worker=IngestConsumerWorker(), **options
+        topic_names=topic_names, worker=IngestConsumerWorker(processes=processes), **options
     )
@@ -7,6 +7,7 @@ import logging
 import re
 import sys
 import base64
+import hashlib
 import zlib
 
 from django.conf import settings
@@ -28,11 +29,12 @@ except ImportError:
 from sentry import http
 from sentry.interfaces.stacktrace import Stacktrace
 from sentry.models import EventError, ReleaseFile, Organization
+from sentry.models.releasefile import read_artifact_index
 
 # separate from either the source cache or the source maps cache, this is for
 # holding the results of attempting to fetch both kinds of files, either from the
 # database or from the internet
-from sentry.utils.cache import cache
+from sentry.utils.cache import LRUCache, cache
 
 from sentry.utils.files import compress_file
 from sentry.utils.hashlib import md5_text
@@ -76,6 +78,12 @@ MAX_RESOURCE_FETCHES = 100
 
 CACHE_MAX_VALUE_SIZE = settings.SENTRY_CACHE_MAX_VALUE_SIZE
 
+# parsed source maps shared by all events processed in this process, bounded by
+# the total size in bytes of the source maps they were parsed from
+sourcemap_view_cache = LRUCache(
+    settings.SENTRY_SOURCEMAP_VIEW_CACHE_SIZE, metric="sourcemaps.view_cache"
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -231,11 +239,40 @@ def should_retry_fetch(attempt: int, e: Exception) -> bool:
 fetch_retry_policy = ConditionalRetryPolicy(should_retry_fetch, exponential_delay(0.05))
 
 
-def fetch_release_file(filename, release, dist=None):
+class LazyArtifactIndex:
+    """
+    The artifact index of a release for the files of one event.  It is only
+    read once a file is not in the release file cache, and then the files of
+    all ``urls`` the event needs are loaded with a single query.
+    """
+
+    def __init__(self, release, dist, urls=()):
+        self.release = release
+        self.dist = dist
+        self.urls = urls
+        self._index = None
+        self._loaded = False
+
+    def get_release_file(self, filename):
+        if not self._loaded:
+            self._loaded = True
+            self._index = read_artifact_index(self.release, self.dist)
+            if self._index is not None:
+                self._index.prefetch([filename, *self.urls])
+
+        if self._index is None:
+            return None
+        return self._index.get_release_file(filename)
+
+
+def fetch_release_file(filename, release, dist=None, artifact_index=None):
     """
     Attempt to retrieve a release artifact from the database.
 
-    Caches the result of that attempt (whether successful or not).
+    Caches the result of that attempt (whether successful or not).  Files in
+    the artifact index of the release are not looked up in the database, an
+    ``artifact_index`` shared by the files of an event can be given to load
+    them together.
     """
 
     dist_name = dist and dist.name or None
@@ -256,37 +293,19 @@ def fetch_release_file(filename, release, dist=None):
 
     # not in the cache (meaning we haven't checked the database recently), so check the database
     if result is None:
-        filename_choices = ReleaseFile.normalize(filename)
-        filename_idents = [ReleaseFile.get_ident(f, dist_name) for f in filename_choices]
-
-        logger.debug(
-            "Checking database for release artifact %r (release_id=%s)", filename, release.id
-        )
-
-        possible_files = list(
-            ReleaseFile.objects.filter(
-                release=release, dist=dist, ident__in=filename_idents
-            ).select_related("file")
-        )
+        if artifact_index is None:
+            artifact_index = LazyArtifactIndex(release, dist)
+        releasefile = artifact_index.get_release_file(filename)
+        if releasefile is None:
+            releasefile = get_release_file_from_database(filename, release, dist)
 
-        if len(possible_files) == 0:
+        if releasefile is None:
             logger.debug(
                 "Release artifact %r not found in database (release_id=%s)", filename, release.id
             )
             cache.set(cache_key, -1, 60)
             return None
 
-        elif len(possible_files) == 1:
-            releasefile = possible_files[0]
-
-        else:
-            # Pick first one that matches in priority order.
-            # This is O(N*M) but there are only ever at most 4 things here
-            # so not really worth optimizing.
-            releasefile = next(
-                rf for ident in filename_idents for rf in possible_files if rf.ident == ident
-            )
-
         logger.debug(
             "Found release artifact %r (id=%s, release_id=%s)", filename, releasefile.id, release.id
         )
@@ -317,7 +336,8 @@ def fetch_release_file(filename, release, dist=None):
         else:
             headers = {k.lower(): v for k, v in releasefile.file.headers.items()}
             encoding = get_encoding_from_headers(headers)
-            result = http.UrlResult(filename, headers, body, 200, encoding)
+            checksum = releasefile.file.checksum
+            result = http.UrlResult(filename, headers, body, 200, encoding, checksum)
 
             # If we don't have the compressed body for caching because the
             # cached metadata said it is too large payload for the cache
@@ -325,7 +345,7 @@ def fetch_release_file(filename, release, dist=None):
             if z_body:
                 # This will implicitly skip too large payloads. Those will be cached
                 # on the file system by `ReleaseFile.cache`, instead.
-                cache.set(cache_key, (headers, z_body, 200, encoding), 3600)
+                cache.set(cache_key, (headers, z_body, 200, encoding, checksum), 3600)
 
                 # In case the previous call to cache implicitly fails, we use
                 # the meta data to avoid pointless compression which is done
@@ -338,20 +358,51 @@ def fetch_release_file(filename, release, dist=None):
 
     # in the cache as a successful attempt, including the zipped contents of the file
     else:
-        # Previous caches would be a 3-tuple instead of a 4-tuple,
+        # Previous caches would be a 3-tuple or 4-tuple instead of a 5-tuple,
         # so this is being maintained for backwards compatibility
         try:
             encoding = result[3]
         except IndexError:
             encoding = None
+        try:
+            checksum = result[4]
+        except IndexError:
+            checksum = None
         result = http.UrlResult(
-            filename, result[0], zlib.decompress(result[1]), result[2], encoding
+            filename, result[0], zlib.decompress(result[1]), result[2], encoding, checksum
         )
 
     return result
 
 
-def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
+def get_release_file_from_database(filename, release, dist=None):
+    dist_name = dist and dist.name or None
+    filename_choices = ReleaseFile.normalize(filename)
+    filename_idents = [ReleaseFile.get_ident(f, dist_name) for f in filename_choices]
+
+    logger.debug("Checking database for release artifact %r (release_id=%s)", filename, release.id)
+
+    possible_files = list(
+        ReleaseFile.objects.filter(
+            release=release, dist=dist, ident__in=filename_idents
+        ).select_related("file")
+    )
+
+    if len(possible_files) == 0:
+        return None
+
+    elif len(possible_files) == 1:
+        return possible_files[0]
+
+    # Pick first one that matches in priority order.
+    # This is O(N*M) but there are only ever at most 4 things here
+    # so not really worth optimizing.
+    return next(rf for ident in filename_idents for rf in possible_files if rf.ident == ident)
+
+
+def fetch_file(
+    url, project=None, release=None, dist=None, allow_scraping=True, artifact_index=None
+):
     """
     Pull down a URL, returning a UrlResult object.
 
@@ -369,7 +420,7 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
     # if we've got a release to look on, try that first (incl associated cache)
     if release:
         with metrics.timer("sourcemaps.release_file"):
-            result = fetch_release_file(url, release, dist)
+            result = fetch_release_file(url, release, dist, artifact_index=artifact_index)
     else:
         result = None
 
@@ -438,6 +489,7 @@ def fetch_file(url, project=None, release=None, dist=None, allow_scraping=True):
                 result.body.encode("utf8"),
                 result.status,
                 result.encoding,
+                result.checksum,
             )
         except UnicodeEncodeError:
             error = {
@@ -475,7 +527,9 @@ def get_max_age(headers):
     return min(max_age, CACHE_CONTROL_MAX)
 
 
-def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=True):
+def fetch_sourcemap(
+    url, project=None, release=None, dist=None, allow_scraping=True, artifact_index=None
+):
     if is_data_uri(url):
         try:
             body = base64.b64decode(
@@ -484,19 +538,57 @@ def fetch_sourcemap(url, project=None, release=None, dist=None, allow_scraping=T
             )
         except TypeError as e:
             raise UnparseableSourcemap({"url": "<base64>", "reason": str(e)})
+        checksum = None
     else:
         # look in the database and, if not found, optionally try to scrape the web
         result = fetch_file(
-            url, project=project, release=release, dist=dist, allow_scraping=allow_scraping
+            url,
+            project=project,
+            release=release,
+            dist=dist,
+            allow_scraping=allow_scraping,
+            artifact_index=artifact_index,
         )
         body = result.body
+        checksum = result.checksum
+
+    cache_key = get_sourcemap_view_cache_key(
+        url, body, release=release, dist=dist, checksum=checksum
+    )
+    sourcemap_view = sourcemap_view_cache.get(cache_key)
+    if sourcemap_view is not None:
+        return sourcemap_view
+
     try:
-        return SourceMapView.from_json_bytes(body)
+        with metrics.timer("sourcemaps.parse"):
+            sourcemap_view = SourceMapView.from_json_bytes(body)
     except Exception as exc:
         # This is in debug because the product shows an error already.
         logger.debug(str(exc), exc_info=True)
         raise UnparseableSourcemap({"url": http.expose_url(url)})
 
+    sourcemap_view_cache.set(cache_key, sourcemap_view, size=len(body))
+    metrics.timing("sourcemaps.view_cache.size", sourcemap_view_cache.size)
+    return sourcemap_view
+
+
+def get_sourcemap_view_cache_key(url, body, release=None, dist=None, checksum=None):
+    """
+    Parsed source maps are cached by the release and the ident of the file
+    they were fetched as, along with the checksum of their contents, so a
+    source map that is uploaded again or changes on the web is parsed again.
+
+    Release files pass the checksum stored with them, only the contents of
+    scraped and inline source maps are hashed.
+    """
+    if is_data_uri(url):
+        ident = None
+    else:
+        ident = ReleaseFile.get_ident(url, dist and dist.name or None)
+    if checksum is None:
+        checksum = hashlib.sha1(body).hexdigest()
+    return (release and release.id, ident, checksum)
+
 
 def is_data_uri(url):
     return url[:BASE64_PREAMBLE_LENGTH] == BASE64_SOURCEMAP_PREAMBLE
@@ -573,6 +665,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
 
         self.release = None
         self.dist = None
+        self.artifact_index = None
 
     def get_stacktraces(self, data):
         exceptions = get_path(data, "exception", "values", filter=True, default=())
@@ -890,6 +983,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                     release=self.release,
                     dist=self.dist,
                     allow_scraping=self.allow_scraping,
+                    artifact_index=self.artifact_index,
                 )
         except http.BadSource as exc:
             # most people don't upload release artifacts for their third-party libraries,
@@ -928,6 +1022,7 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                     release=self.release,
                     dist=self.dist,
                     allow_scraping=self.allow_scraping,
+                    artifact_index=self.artifact_index,
                 )
         except http.BadSource as exc:
             # we don't perform the same check here as above, because if someone has
@@ -968,6 +1063,9 @@ class JavaScriptStacktraceProcessor(StacktraceProcessor):
                 continue
             pending_file_list.add(f["abs_path"])
 
+        if self.release:
+            self.artifact_index = LazyArtifactIndex(self.release, self.dist, pending_file_list)
+
         for idx, filename in enumerate(pending_file_list):
             with sentry_sdk.start_span(
                 op="JavaScriptStacktraceProcessor.populate_source_cache.cache_source"
@@ -1,4 +1,5 @@
 import sys
+import bisect
 import jsonschema
 import logging
 import time
@@ -16,6 +17,8 @@ from sentry import features, options
 from sentry.auth.system import get_system_token
 from sentry.cache import default_cache
 from sentry.utils import json, metrics
+from sentry.utils.cache import cache
+from sentry.utils.hashlib import md5_text
 from sentry.net.http import Session
 from sentry.tasks.store import RetrySymbolication
 from sentry.models import Organization
@@ -185,6 +188,10 @@ class Symbolicator:
         )
 
     def process_payload(self, stacktraces, modules, signal=None):
+        frame_cache_ttl = options.get("symbolicator.frame-cache-ttl")
+        if frame_cache_ttl:
+            return self._process_payload_cached(stacktraces, modules, signal, frame_cache_ttl)
+
         return self._process(
             lambda: self.sess.symbolicate_stacktraces(
                 stacktraces=stacktraces, modules=modules, signal=signal
@@ -192,6 +199,250 @@ class Symbolicator:
             "symbolicate_stacktraces",
         )
 
+    def _process_payload_cached(self, stacktraces, modules, signal, frame_cache_ttl):
+        frame_cache = FrameCache(self.sess.sources, self.sess.options, modules, signal)
+
+        # The frames sent to symbolicator must not change while polling a
+        # pending task, so the cache lookup of the first attempt is kept.
+        hits_cache_key = f"{self.task_id_cache_key}:frames"
+        hits = default_cache.get(hits_cache_key)
+        if hits is None:
+            hits = frame_cache.get_many(stacktraces)
+            default_cache.set(hits_cache_key, hits, REQUEST_CACHE_TIMEOUT)
+
+        cached_frames = {(s_idx, f_idx): frames for s_idx, f_idx, frames in hits["frames"]}
+        cached_modules = {idx: module for idx, module in hits["modules"]}
+
+        # Send the remaining frames of every stacktrace with a cache miss.
+        # The first frame is always kept, as symbolicator only adjusts the
+        # instruction address of caller frames.
+        request_stacktraces = []
+        request_frames = []
+        for s_idx, stacktrace in enumerate(stacktraces):
+            positions = [
+                (s_idx, f_idx)
+                for f_idx in range(len(stacktrace["frames"]))
+                if (s_idx, f_idx) not in cached_frames
+            ]
+            if not positions:
+                continue
+            if positions[0] != (s_idx, 0):
+                positions.insert(0, (s_idx, 0))
+            request_stacktraces.append(
+                dict(stacktrace, frames=[stacktrace["frames"][f_idx] for _, f_idx in positions])
+            )
+            request_frames.append(positions)
+
+        metrics.incr("symbolicator.frame_cache", amount=len(cached_frames), tags={"result": "hit"})
+        metrics.incr(
+            "symbolicator.frame_cache",
+            amount=sum(len(positions) for positions in request_frames),
+            tags={"result": "miss"},
+        )
+
+        if request_stacktraces:
+            response = self._process(
+                lambda: self.sess.symbolicate_stacktraces(
+                    stacktraces=request_stacktraces, modules=modules, signal=signal
+                ),
+                "symbolicate_stacktraces",
+            )
+        else:
+            response = {"status": "completed", "stacktraces": [], "modules": [{}] * len(modules)}
+
+        default_cache.delete(hits_cache_key)
+        if response.get("status") != "completed":
+            return response
+
+        # Merge the cached frames back in, in the order of the original
+        # stacktraces, and store the newly symbolicated frames.
+        complete_frames = dict(cached_frames)
+        for positions, complete_stacktrace in zip(request_frames, response["stacktraces"]):
+            for position in positions:
+                complete_frames.pop(position, None)
+            for complete_frame in complete_stacktrace.get("frames") or ():
+                position = positions[complete_frame["original_index"]]
+                complete_frames.setdefault(position, []).append(complete_frame)
+        frame_cache.set_many(stacktraces, complete_frames, response["modules"], frame_cache_ttl)
+
+        response["stacktraces"] = [
+            {
+                "frames": [
+                    dict(complete_frame, original_index=f_idx)
+                    for f_idx in range(len(stacktrace["frames"]))
+                    for complete_frame in complete_frames.get((s_idx, f_idx)) or ()
+                ]
+            }
+            for s_idx, stacktrace in enumerate(stacktraces)
+        ]
+
+        # Modules only referenced by cached frames were not used by
+        # symbolicator, report their status from the cache instead.
+        for idx, module in cached_modules.items():
+            if response["modules"][idx].get("debug_status") in (None, "unused"):
+                response["modules"][idx] = dict(module)
+        for idx, module in enumerate(response["modules"]):
+            if not module:
+                response["modules"][idx] = {"debug_status": "unused"}
+
+        return response
+
+
+def _parse_addr(value):
+    if isinstance(value, str):
+        return int(value, 16)
+    return int(value)
+
+
+class FrameCache:
+    """
+    Caches the symbolicated frames of native stacktraces, keyed by the debug
+    id of the module, the address relative to the module and the source
+    configuration. Crash spikes send the same frames over and over, so most
+    of them can be filled in without asking symbolicator.
+
+    Only frames with absolute addresses inside a known module that were fully
+    symbolicated are cached. Addresses in the cached frames are stored
+    relative to the module and rebased on the image address of every event.
+    """
+
+    def __init__(self, sources, options, modules, signal=None):
+        self.prefix = md5_text(json.dumps(sources), json.dumps(options)).hexdigest()
+        self.modules = modules
+        self.signal = signal
+
+        images = []
+        for idx, module in enumerate(modules):
+            try:
+                image_addr = _parse_addr(module["image_addr"])
+                image_size = int(module["image_size"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if module.get("debug_id") and image_size > 0:
+                images.append((image_addr, image_addr + image_size, idx))
+
+        images.sort()
+        self.images = images
+        self.image_starts = [start for start, _, _ in images]
+        self.image_addrs = {idx: start for start, _, idx in images}
+
+    def _find_module(self, frame):
+        if frame.get("addr_mode") not in (None, "abs"):
+            return None
+
+        try:
+            addr = _parse_addr(frame["instruction_addr"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        i = bisect.bisect_right(self.image_starts, addr) - 1
+        if i < 0:
+            return None
+
+        start, end, idx = self.images[i]
+        if addr >= end:
+            return None
+
+        return idx, addr - start
+
+    def _get_frame_key(self, idx, offset, first, frame):
+        # The first frame is symbolicated differently, as its instruction
+        # address is not adjusted depending on the signal.
+        flags = "{}:{}".format(self.signal if first else "-", frame.get("trust") or "")
+        return "symbolicator:frame:{}:{}".format(
+            self.prefix,
+            md5_text("{}:{:x}:{}".format(self.modules[idx]["debug_id"], offset, flags)).hexdigest(),
+        )
+
+    def _get_module_key(self, idx):
+        return "symbolicator:module:{}:{}".format(
+            self.prefix, md5_text(self.modules[idx]["debug_id"]).hexdigest()
+        )
+
+    def _get_frame_keys(self, frames_by_position):
+        keys = {}
+        for position, frame in frames_by_position:
+            found = self._find_module(frame)
+            if found is not None:
+                idx, offset = found
+                keys[position] = idx, self._get_frame_key(idx, offset, position[1] == 0, frame)
+        return keys
+
+    def get_many(self, stacktraces):
+        """
+        Returns the cached frames for ``stacktraces`` as a JSON serializable
+        dict, with ``frames`` as ``[stacktrace_idx, frame_idx, frames]`` and
+        the ``modules`` those frames belong to as ``[module_idx, module]``.
+        """
+        frame_keys = self._get_frame_keys(
+            ((s_idx, f_idx), frame)
+            for s_idx, stacktrace in enumerate(stacktraces)
+            for f_idx, frame in enumerate(stacktrace["frames"])
+        )
+        module_keys = {idx: self._get_module_key(idx) for idx, _ in frame_keys.values()}
+
+        values = cache.get_many(
+            list({key for _, key in frame_keys.values()} | set(module_keys.values()))
+        )
+
+        frames = []
+        modules = {}
+        for (s_idx, f_idx), (idx, key) in sorted(frame_keys.items()):
+            module = values.get(module_keys[idx])
+            cached_frames = values.get(key)
+            if module is None or cached_frames is None:
+                continue
+
+            frames.append([s_idx, f_idx, [self._rebase(f, idx) for f in cached_frames]])
+            modules[idx] = module
+
+        return {"frames": frames, "modules": sorted(modules.items())}
+
+    def set_many(self, stacktraces, complete_frames, complete_modules, timeout):
+        """
+        Caches the fully symbolicated frames of ``complete_frames``, mapping
+        ``(stacktrace_idx, frame_idx)`` to the symbolicator frames.  They are
+        keyed by the frames of ``stacktraces`` sent to symbolicator, like in
+        ``get_many``, rather than by the frames symbolicator returned.
+        """
+        frame_keys = self._get_frame_keys(
+            ((s_idx, f_idx), stacktraces[s_idx]["frames"][f_idx])
+            for (s_idx, f_idx), frames in complete_frames.items()
+            # Frames taken from the cache have already been rebased, skip them.
+            if frames and "original_index" in frames[0]
+        )
+
+        values = {}
+        for position, (idx, key) in frame_keys.items():
+            module = complete_modules[idx]
+            frames = complete_frames[position]
+            if module.get("debug_status") != "found" or any(
+                f.get("status") != "symbolicated" for f in frames
+            ):
+                continue
+
+            values[key] = [self._unbase(f, idx) for f in frames]
+            values[self._get_module_key(idx)] = {
+                k: v for k, v in module.items() if k != "image_addr"
+            }
+
+        if values:
+            cache.set_many(values, timeout)
+
+    def _unbase(self, frame, idx):
+        frame = {k: v for k, v in frame.items() if k != "original_index"}
+        for key in ("instruction_addr", "sym_addr"):
+            if frame.get(key) is not None:
+                frame[key] = _parse_addr(frame[key]) - self.image_addrs[idx]
+        return frame
+
+    def _rebase(self, frame, idx):
+        frame = dict(frame)
+        for key in ("instruction_addr", "sym_addr"):
+            if frame.get(key) is not None:
+                frame[key] = "0x%x" % (frame[key] + self.image_addrs[idx])
+        return frame
+
 
 def redact_internal_sources(response):
     """Redacts information about internal sources from a response.
@@ -1,9 +1,11 @@
 import logging
 
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 
 from sentry.db.models import FlexibleForeignKey, DefaultFieldsModel, JSONField, sane_repr
+from sentry.models.projectownership import get_schema_digest, schedule_compile_ownership_rules
 from sentry.utils.cache import cache
 
 logger = logging.getLogger(__name__)
@@ -51,5 +53,22 @@ class ProjectCodeOwners(DefaultFieldsModel):
                 codeowners = self.objects.get(project_id=project_id)
             except self.DoesNotExist:
                 codeowners = False
+            else:
+                get_schema_digest(codeowners)
             cache.set(cache_key, codeowners, READ_CACHE_DURATION)
         return codeowners or None
+
+
+def invalidate_codeowners_cache(instance, **kwargs):
+    cache_key = ProjectCodeOwners.get_cache_key(instance.project_id)
+    cache.delete(cache_key)
+    # Concurrent reads may have cached the previous version until committed
+    transaction.on_commit(
+        lambda: cache.delete(cache_key), using=router.db_for_write(ProjectCodeOwners)
+    )
+    schedule_compile_ownership_rules(instance.project_id)
+
+
+# Signals update the cached reads used in post_processing
+post_save.connect(invalidate_codeowners_cache, sender=ProjectCodeOwners, weak=False)
+post_delete.connect(invalidate_codeowners_cache, sender=ProjectCodeOwners, weak=False)
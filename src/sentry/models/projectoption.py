@@ -52,6 +52,39 @@ class ProjectOptionManager(OptionManager):
                 self._option_cache[cache_key] = result
         return self._option_cache.get(cache_key, {})
 
+    def get_all_values_bulk(self, projects):
+        """
+        Returns the options of many projects keyed by project id, reading them
+        with a single cache roundtrip and a single query for cache misses.
+        The values are kept in the local cache, so subsequent calls to
+        ``get_value`` for these projects do not hit the cache again.
+        """
+        project_ids = {p.id if isinstance(p, models.Model) else p for p in projects}
+        cache_keys = {
+            self._make_key(project_id): project_id
+            for project_id in project_ids
+            if self._make_key(project_id) not in self._option_cache
+        }
+
+        if cache_keys:
+            cached = cache.get_many(list(cache_keys))
+            self._option_cache.update(cached)
+
+            missing = {cache_keys[key]: {} for key in cache_keys if key not in cached}
+            if missing:
+                for option in self.filter(project__in=list(missing)):
+                    missing[option.project_id][option.key] = option.value
+                result = {
+                    self._make_key(project_id): values for project_id, values in missing.items()
+                }
+                cache.set_many(result)
+                self._option_cache.update(result)
+
+        return {
+            project_id: self._option_cache.get(self._make_key(project_id), {})
+            for project_id in project_ids
+        }
+
     def reload_cache(self, project_id, update_reason):
         if update_reason != "projectoption.get_all_values":
             schedule_update_config_cache(
@@ -1,20 +1,37 @@
 import operator
+import pickle
+import zlib
 
 
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
 from django.db.models import Q
 from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
-from sentry.ownership.grammar import load_schema
-from sentry.utils import metrics
+from sentry.ownership.grammar import compile_rules, load_schema
+from sentry.utils import json, metrics
 from sentry.utils.cache import cache
+from sentry.utils.hashlib import md5_text
 from functools import reduce
 
 READ_CACHE_DURATION = 3600
 
+# Compiled rules are keyed by the digests of their schemas and never outdated
+COMPILED_RULES_CACHE_DURATION = 86400
+
+# Bump when CompiledRules changes, to ignore rules compiled by older versions
+COMPILED_RULES_VERSION = 2
+
+CACHE_MAX_VALUE_SIZE = settings.SENTRY_CACHE_MAX_VALUE_SIZE
+
+# Maximum number of projects to keep compiled rules for in every process
+MAX_COMPILED_RULES = 1000
+
+_compiled_rules = {}
+
 
 class ProjectOwnership(Model):
     __core__ = True
@@ -41,10 +58,14 @@ class ProjectOwnership(Model):
     def get_cache_key(self, project_id):
         return f"projectownership_project_id:1:{project_id}"
 
+    @classmethod
+    def get_compiled_rules_cache_key(self, project_id, version):
+        return f"projectownership_rules:{COMPILED_RULES_VERSION}:{project_id}:{version}"
+
     @classmethod
     def get_combined_schema(self, ownership, codeowners):
         if codeowners and codeowners.schema:
-            ownership.schema = (
+            return (
                 codeowners.schema
                 if not ownership.schema
                 else {
@@ -76,9 +97,47 @@ class ProjectOwnership(Model):
                 ownership = cls.objects.get(project_id=project_id)
             except cls.DoesNotExist:
                 ownership = False
+            else:
+                get_schema_digest(ownership)
             cache.set(cache_key, ownership, READ_CACHE_DURATION)
         return ownership or None
 
+    @classmethod
+    def get_compiled_rules_cached(cls, project_id, ownership, codeowners):
+        """
+        Compiled rules of the combined schema of ``ownership`` and
+        ``codeowners``.
+
+        Rules are compiled in the background whenever either of them changes
+        (see ``compile_ownership_rules``) and then kept in memory per project.
+        Schema versions are digests computed when the models are cached, so
+        events never need to serialize, load or compile large schemas.
+        """
+        version = md5_text(
+            get_schema_digest(ownership), ":", get_schema_digest(codeowners)
+        ).hexdigest()
+        cached = _compiled_rules.get(project_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        # Rules are stored compressed, as the rules of large CODEOWNERS files
+        # would exceed the maximum size of cached values otherwise.
+        cache_key = cls.get_compiled_rules_cache_key(project_id, version)
+        z_data = get_compiled_rules_data(cache_key)
+        if z_data is not None:
+            compiled = pickle.loads(zlib.decompress(z_data))
+        else:
+            metrics.incr("projectownership.compile_rules")
+            compiled = compile_rules(load_schema(cls.get_combined_schema(ownership, codeowners)))
+            z_data = zlib.compress(pickle.dumps(compiled, pickle.HIGHEST_PROTOCOL))
+            metrics.timing("projectownership.compiled_rules.size", len(z_data))
+            set_compiled_rules_data(cache_key, z_data)
+
+        if len(_compiled_rules) >= MAX_COMPILED_RULES:
+            _compiled_rules.clear()
+        _compiled_rules[project_id] = (version, compiled)
+        return compiled
+
     @classmethod
     def get_owners(cls, project_id, data):
         """
@@ -98,9 +157,7 @@ class ProjectOwnership(Model):
             ownership = cls(project_id=project_id)
 
         codeowners = ProjectCodeOwners.get_codeowners_cached(project_id)
-        ownership.schema = cls.get_combined_schema(ownership, codeowners)
-
-        rules = cls._matching_ownership_rules(ownership, project_id, data)
+        rules = cls._matching_ownership_rules(ownership, codeowners, project_id, data)
 
         if not rules:
             return cls.Everyone if ownership.fallthrough else [], None
@@ -137,9 +194,7 @@ class ProjectOwnership(Model):
             if not ownership:
                 ownership = cls(project_id=project_id)
 
-            ownership.schema = cls.get_combined_schema(ownership, codeowners)
-
-            rules = cls._matching_ownership_rules(ownership, project_id, data)
+            rules = cls._matching_ownership_rules(ownership, codeowners, project_id, data)
             if not rules:
                 return ownership.auto_assignment, []
 
@@ -163,14 +218,15 @@ class ProjectOwnership(Model):
             return ownership.auto_assignment, ActorTuple.resolve_many(actors)
 
     @classmethod
-    def _matching_ownership_rules(cls, ownership, project_id, data):
-        rules = []
-        if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
+    def has_schema(cls, ownership, codeowners):
+        return bool(ownership.schema or (codeowners and codeowners.schema))
+
+    @classmethod
+    def _matching_ownership_rules(cls, ownership, codeowners, project_id, data):
+        if not cls.has_schema(ownership, codeowners):
+            return []
 
-        return rules
+        return cls.get_compiled_rules_cached(project_id, ownership, codeowners).match(data)
 
 
 def resolve_actors(owners, project_id):
@@ -226,18 +282,75 @@ def resolve_actors(owners, project_id):
     return {o: actors.get((o.type, o.identifier.lower())) for o in owners}
 
 
+def get_schema_digest(instance):
+    """
+    Digest of the schema of a ProjectOwnership or ProjectCodeOwners. It is
+    memoized on the instance, so it is stored along with it in the cache.
+    """
+    if not instance or not instance.schema:
+        return ""
+    digest = getattr(instance, "_schema_digest", None)
+    if digest is None:
+        digest = instance._schema_digest = md5_text(json.dumps(instance.schema)).hexdigest()
+    return digest
+
+
+def get_compiled_rules_data(cache_key):
+    """
+    Reads compressed compiled rules written by ``set_compiled_rules_data``.
+    Rules split into chunks are only returned if none of them was evicted.
+    """
+    z_data = cache.get(cache_key)
+    if not isinstance(z_data, int):
+        return z_data
+
+    chunk_keys = [f"{cache_key}:{i}" for i in range(z_data)]
+    chunks = cache.get_many(chunk_keys)
+    if len(chunks) != len(chunk_keys):
+        return None
+    return b"".join(chunks[key] for key in chunk_keys)
+
+
+def set_compiled_rules_data(cache_key, z_data):
+    """
+    Caches compressed compiled rules.  Rules larger than the maximum size of
+    cached values are split into chunks, and the number of chunks is stored
+    in their place.
+    """
+    if not CACHE_MAX_VALUE_SIZE or len(z_data) <= CACHE_MAX_VALUE_SIZE:
+        cache.set(cache_key, z_data, COMPILED_RULES_CACHE_DURATION)
+        return
+
+    chunks = {
+        f"{cache_key}:{i}": z_data[offset : offset + CACHE_MAX_VALUE_SIZE]
+        for i, offset in enumerate(range(0, len(z_data), CACHE_MAX_VALUE_SIZE))
+    }
+    metrics.timing("projectownership.compiled_rules.chunks", len(chunks))
+    cache.set_many(chunks, COMPILED_RULES_CACHE_DURATION)
+    cache.set(cache_key, len(chunks), COMPILED_RULES_CACHE_DURATION)
+
+
+def schedule_compile_ownership_rules(project_id):
+    from sentry.tasks.ownership import compile_ownership_rules
+
+    transaction.on_commit(
+        lambda: compile_ownership_rules.delay(project_id=project_id),
+        using=router.db_for_write(ProjectOwnership),
+    )
+
+
+def update_ownership_cache(instance, **kwargs):
+    instance.__dict__.pop("_schema_digest", None)
+    get_schema_digest(instance)
+    cache.set(ProjectOwnership.get_cache_key(instance.project_id), instance, READ_CACHE_DURATION)
+    schedule_compile_ownership_rules(instance.project_id)
+
+
+def delete_ownership_cache(instance, **kwargs):
+    cache.set(ProjectOwnership.get_cache_key(instance.project_id), False, READ_CACHE_DURATION)
+    schedule_compile_ownership_rules(instance.project_id)
+
+
 # Signals update the cached reads used in post_processing
-post_save.connect(
-    lambda instance, **kwargs: cache.set(
-        ProjectOwnership.get_cache_key(instance.project_id), instance, READ_CACHE_DURATION
-    ),
-    sender=ProjectOwnership,
-    weak=False,
-)
-post_delete.connect(
-    lambda instance, **kwargs: cache.set(
-        ProjectOwnership.get_cache_key(instance.project_id), False, READ_CACHE_DURATION
-    ),
-    sender=ProjectOwnership,
-    weak=False,
-)
+post_save.connect(update_ownership_cache, sender=ProjectOwnership, weak=False)
+post_delete.connect(delete_ownership_cache, sender=ProjectOwnership, weak=False)
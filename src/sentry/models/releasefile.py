@@ -1,16 +1,25 @@
 import os
 import errno
+import zlib
 
-from django.core.files.base import File as FileObj
-from django.db import models
+from django.core.files.base import ContentFile, File as FileObj
+from django.db import models, transaction
 from urllib.parse import urlsplit, urlunsplit
 
 from sentry import options
 from sentry.db.models import BoundedPositiveIntegerField, FlexibleForeignKey, Model, sane_repr
 from sentry.models import clear_cached_files
-from sentry.utils import metrics
+from sentry.utils import json, metrics
+from sentry.utils.cache import LRUCache, cache
 from sentry.utils.hashlib import sha1_text
 
+ARTIFACT_INDEX_FILENAME = "artifact-index.json"
+ARTIFACT_INDEX_TYPE = "release.artifact-index"
+
+# Files of parsed artifact indexes keyed by the id of the index file, bounded by
+# the total size in bytes of the index files.
+artifact_index_cache = LRUCache(32 * 1024 * 1024, metric="release_file.artifact_index.local_cache")
+
 
 class ReleaseFile(Model):
     r"""
@@ -118,3 +127,179 @@ class ReleaseFileCache:
 
 
 ReleaseFile.cache = ReleaseFileCache()
+
+
+class ReleaseArtifactIndex:
+    """
+    Maps the names of all release files of a release and dist to the ids of
+    the release file and file, and the checksum and size of the file.
+
+    The index is stored in a single file referenced from the release's data,
+    so that resolving the urls of an event's frames doesn't need to query
+    release files one by one.
+    """
+
+    def __init__(self, release, dist, files):
+        self.release = release
+        self.dist = dist
+        self.files = files
+        self._file_cache = {}
+
+    @classmethod
+    def build(cls, release, dist):
+        files = {}
+        queryset = ReleaseFile.objects.filter(release=release, dist=dist).values_list(
+            "id", "ident", "name", "file_id", "file__checksum", "file__size"
+        )
+        for (id, ident, name, file_id, checksum, size) in queryset.iterator():
+            files[name] = {
+                "id": id,
+                "ident": ident,
+                "file_id": file_id,
+                "sha1": checksum,
+                "size": size,
+            }
+        return cls(release, dist, files)
+
+    def resolve(self, url):
+        """Returns the name and entry of the file for the url, trying the
+        names in the same order as the release file lookup by url.
+        """
+        for name in ReleaseFile.normalize(url):
+            entry = self.files.get(name)
+            if entry is not None:
+                return name, entry
+        return None, None
+
+    def prefetch(self, urls):
+        """Loads the files of all the given urls with a single query."""
+        from sentry.models.file import File
+
+        file_ids = set()
+        for url in urls:
+            _, entry = self.resolve(url)
+            if entry is not None and entry["file_id"] not in self._file_cache:
+                file_ids.add(entry["file_id"])
+
+        if file_ids:
+            files = File.objects.in_bulk(file_ids)
+            for file_id in file_ids:
+                self._file_cache[file_id] = files.get(file_id)
+
+    def get_release_file(self, url):
+        """Returns an unsaved release file for the url, or `None` if it's
+        not in the index or its file no longer exists.
+        """
+        name, entry = self.resolve(url)
+        if entry is None:
+            return None
+
+        self.prefetch([url])
+        file = self._file_cache[entry["file_id"]]
+        if file is None:
+            return None
+
+        return ReleaseFile(
+            id=entry["id"],
+            organization_id=self.release.organization_id,
+            release=self.release,
+            dist=self.dist,
+            file=file,
+            ident=entry["ident"],
+            name=name,
+        )
+
+
+def _get_artifact_index_key(dist):
+    return str(dist.id) if dist is not None else ""
+
+
+def _get_artifact_index_cache_key(file_id):
+    return f"artifact-index:v1:{file_id}"
+
+
+def read_artifact_index(release, dist):
+    """Loads the artifact index of a release and dist, if there is one."""
+    from sentry.models.file import File
+
+    file_id = (release.data or {}).get("artifact_indexes", {}).get(_get_artifact_index_key(dist))
+    if file_id is None:
+        return None
+
+    # The file of an index never changes, a new index is a new file.
+    files = artifact_index_cache.get(file_id)
+    if files is not None:
+        return ReleaseArtifactIndex(release, dist, files)
+
+    cache_key = _get_artifact_index_cache_key(file_id)
+    z_data = cache.get(cache_key)
+    if z_data is None:
+        metrics.incr("release_file.artifact_index.cache", tags={"result": "miss"})
+        try:
+            file = File.objects.get(id=file_id)
+        except File.DoesNotExist:
+            # The release is cached and might still refer to a replaced index.
+            return None
+        with file.getfile() as fp:
+            data = fp.read()
+        cache.set(cache_key, zlib.compress(data), 3600)
+    else:
+        metrics.incr("release_file.artifact_index.cache", tags={"result": "hit"})
+        data = zlib.decompress(z_data)
+
+    files = json.loads(data)["files"]
+    artifact_index_cache.set(file_id, files, size=len(data))
+    return ReleaseArtifactIndex(release, dist, files)
+
+
+def _set_artifact_index_file(release, dist, file_id):
+    from sentry.models.release import Release
+
+    key = _get_artifact_index_key(dist)
+    with transaction.atomic():
+        locked_release = Release.objects.select_for_update().get(id=release.id)
+        data = dict(locked_release.data or {})
+        indexes = dict(data.get("artifact_indexes") or {})
+        old_file_id = indexes.pop(key, None)
+        if file_id is not None:
+            indexes[key] = file_id
+        data["artifact_indexes"] = indexes
+        locked_release.update(data=data)
+
+    release.data = data
+    cache.delete(Release.get_cache_key(release.organization_id, release.version))
+    return old_file_id
+
+
+def _delete_artifact_index_file(file_id):
+    from sentry.models.file import File
+
+    if file_id is not None:
+        for file in File.objects.filter(id=file_id):
+            file.delete()
+
+
+def update_artifact_index(release, dist):
+    """Indexes all current release files of a release and dist."""
+    from sentry.models.file import File
+
+    index = ReleaseArtifactIndex.build(release, dist)
+    file = File.objects.create(
+        name=ARTIFACT_INDEX_FILENAME,
+        type=ARTIFACT_INDEX_TYPE,
+        headers={"Content-Type": "application/json"},
+    )
+    file.putfile(ContentFile(json.dumps({"files": index.files}).encode("utf-8")))
+    metrics.timing("release_file.artifact_index.files", len(index.files))
+
+    _delete_artifact_index_file(_set_artifact_index_file(release, dist, file.id))
+    return index
+
+
+def delete_artifact_index(release, dist):
+    """Removes the artifact index of a release and dist.  This must be
+    called whenever release files are changed outside of the index.
+    """
+    if _get_artifact_index_key(dist) not in (release.data or {}).get("artifact_indexes", {}):
+        return
+    _delete_artifact_index_file(_set_artifact_index_file(release, dist, None))
@@ -1,11 +1,13 @@
 from threading import local
 
 import sentry_sdk
+import zstandard
 
 from django.core.cache import caches, InvalidCacheBackendError
 
 from sentry.utils.cache import memoize
 from sentry.utils import json
+from sentry.utils.imports import import_string
 from sentry.utils.services import Service
 
 
@@ -25,6 +27,100 @@ json_dumps = json.JSONEncoder(
 json_loads = json._default_decoder.decode
 
 
+class NodeCodec:
+    """
+    Compresses encoded nodes before they are written to the backend.
+
+    Every value written by a codec starts with the codec's header byte, which
+    must never start an encoded node (``{``) or a legacy pickled one, so that
+    values written before a codec was configured still decode.  Values of the
+    codecs in ``DEFAULT_CODECS`` also decode once the codec is no longer
+    configured, as long as they do not depend on its options.
+    """
+
+    header = None
+
+    def compress(self, data, platform=None):
+        raise NotImplementedError
+
+    def decompress(self, data):
+        raise NotImplementedError
+
+
+class ZstdCodec(NodeCodec):
+    """
+    Compresses nodes with zstd, optionally with trained dictionaries per event
+    platform.  Dictionaries are looked up by the id stored in every frame, so
+    the codec and its dictionaries must stay configured for as long as nodes
+    compressed with them are kept.  Without the configuration only nodes
+    compressed without a dictionary can be decoded.
+
+    >>> SENTRY_NODESTORE_OPTIONS = {
+    ...     'codec': {
+    ...         'path': 'sentry.nodestore.base.ZstdCodec',
+    ...         'options': {
+    ...             'level': 3,
+    ...             'dictionaries': {'javascript': '/etc/sentry/javascript.zstd-dict'},
+    ...         },
+    ...     },
+    ... }
+    """
+
+    header = b"\x01"
+
+    def __init__(self, level=3, dictionaries=None):
+        self.level = level
+        self.dictionaries = {}
+        self._dictionaries_by_id = {}
+        for platform, dictionary in (dictionaries or {}).items():
+            if isinstance(dictionary, str):
+                with open(dictionary, "rb") as f:
+                    dictionary = zstandard.ZstdCompressionDict(f.read())
+            if not dictionary.dict_id():
+                raise ValueError(f"zstd dictionary for {platform!r} is not a trained dictionary")
+            self.dictionaries[platform] = dictionary
+            self._dictionaries_by_id[dictionary.dict_id()] = dictionary
+
+        self._compressors = {}
+        self._decompressors = {}
+
+    def _get_compressor(self, platform):
+        dictionary = self.dictionaries.get(platform)
+        dict_id = dictionary.dict_id() if dictionary is not None else 0
+        compressor = self._compressors.get(dict_id)
+        if compressor is None:
+            compressor = self._compressors[dict_id] = zstandard.ZstdCompressor(
+                level=self.level, dict_data=dictionary
+            )
+        return compressor
+
+    def _get_decompressor(self, dict_id):
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            dictionary = None
+            if dict_id:
+                dictionary = self._dictionaries_by_id.get(dict_id)
+                if dictionary is None:
+                    raise ValueError(f"zstd dictionary {dict_id} is not configured")
+            decompressor = self._decompressors[dict_id] = zstandard.ZstdDecompressor(
+                dict_data=dictionary
+            )
+        return decompressor
+
+    def compress(self, data, platform=None):
+        return self.header + self._get_compressor(platform).compress(data)
+
+    def decompress(self, data):
+        data = data[1:]
+        dict_id = zstandard.get_frame_parameters(data).dict_id
+        return self._get_decompressor(dict_id).decompress(data)
+
+
+# Codecs used, with their default options, to decode values of codecs other
+# than the configured one.
+DEFAULT_CODECS = {ZstdCodec.header: ZstdCodec}
+
+
 class NodeStorage(local, Service):
     """
     Nodestore is a key-value store that is used to store event payloads. It comes in two flavors:
@@ -72,6 +168,56 @@ class NodeStorage(local, Service):
         "bootstrap",
     )
 
+    codec = None
+
+    def __init__(self, codec=None):
+        self._setup_codec(codec)
+
+    def _setup_codec(self, codec):
+        """
+        Configures the codec used to compress nodes, given as a dictionary
+        with the ``path`` of the codec class and its ``options``.
+        """
+        if codec is not None:
+            codec = import_string(codec["path"])(**codec.get("options", {}))
+        self.codec = codec
+        self._default_codecs = {}
+
+    def _get_codec(self, header):
+        if self.codec is not None and self.codec.header == header:
+            return self.codec
+
+        codec = self._default_codecs.get(header)
+        if codec is None:
+            codec_cls = DEFAULT_CODECS.get(header)
+            if codec_cls is None:
+                return None
+            codec = self._default_codecs[header] = codec_cls()
+        return codec
+
+    def _compress(self, data, platform=None):
+        if self.codec is None:
+            return data
+        return self.codec.compress(data, platform=platform)
+
+    def _decompress(self, value):
+        """
+        Decompresses a value written with a codec.  Any other value is
+        returned as is.
+        """
+        if not value:
+            return value
+        codec = self._get_codec(value[:1])
+        if codec is None:
+            return value
+        return codec.decompress(value)
+
+    def _has_codec_header(self, value):
+        if not value:
+            return False
+        header = value[:1]
+        return header in DEFAULT_CODECS or (self.codec is not None and self.codec.header == header)
+
     def delete(self, id):
         """
         >>> nodestore.delete('key1')
@@ -136,7 +282,7 @@ class NodeStorage(local, Service):
 
             span.set_tag("subkey", str(subkey))
             bytes_data = self._get_bytes(id)
-            rv = self._decode(bytes_data, subkey=subkey)
+            rv = self._decode(self._decompress(bytes_data), subkey=subkey)
             if subkey is None:
                 # set cache item only after we know decoding did not fail
                 self._set_cache_item(id, rv)
@@ -181,7 +327,7 @@ class NodeStorage(local, Service):
                 uncached_ids = id_list
 
             items = {
-                id: self._decode(value, subkey=subkey)
+                id: self._decode(self._decompress(value), subkey=subkey)
                 for id, value in self._get_bytes_multi(uncached_ids).items()
             }
             if subkey is None:
@@ -240,7 +386,8 @@ class NodeStorage(local, Service):
         """
         with sentry_sdk.start_span(op="nodestore.set_subkeys"):
             cache_item = data.get(None)
-            bytes_data = self._encode(data)
+            platform = cache_item.get("platform") if isinstance(cache_item, dict) else None
+            bytes_data = self._compress(self._encode(data), platform=platform)
             self._set_bytes(id, bytes_data, ttl=ttl)
             # set cache only after encoding and write to nodestore has succeeded
             self._set_cache_item(id, cache_item)
@@ -17,6 +17,8 @@ class BigtableNodeStorage(NodeStorage):
         valid for reading + returning)
     :param compression: A boolean whether to enable zlib-compression, or the
         string "zstd" to use zstd.
+    :param codec: The codec nodes are compressed with before they are stored,
+        see ``NodeCodec``.  This should not be combined with ``compression``.
 
     >>> BigtableNodeStorage(
     ...     project='some-project',
@@ -37,8 +39,11 @@ class BigtableNodeStorage(NodeStorage):
         automatic_expiry=False,
         default_ttl=None,
         compression=False,
+        codec=None,
         **client_options,
     ):
+        self._setup_codec(codec)
+
         if compression is True:
             compression = "zlib"
         elif compression is False:
@@ -1,12 +1,14 @@
+import base64
 import math
 import logging
 import pickle
+import zlib
 
 from django.utils import timezone
 
 from sentry.db.models import create_or_update
 from sentry.nodestore.base import NodeStorage
-from sentry.utils.strings import decompress, compress
+from sentry.utils.strings import compress
 
 from .models import Node
 
@@ -34,22 +36,37 @@ class DjangoNodeStorage(NodeStorage):
             logger.exception(e)
             return {}
 
+    def _load_data(self, data):
+        # Values written with a codec are only base64 encoded, values written
+        # without one are zlib compressed as well.
+        value = base64.b64decode(data)
+        if self._has_codec_header(value):
+            return value
+        return zlib.decompress(value)
+
+    def _dump_data(self, value):
+        if self._has_codec_header(value):
+            return base64.b64encode(value).decode("utf-8")
+        return compress(value)
+
     def _get_bytes(self, id):
         try:
             data = Node.objects.get(id=id).data
-            return decompress(data)
+            return self._load_data(data)
         except Node.DoesNotExist:
             return None
 
     def _get_bytes_multi(self, id_list):
-        return {n.id: decompress(n.data) for n in Node.objects.filter(id__in=id_list)}
+        return {n.id: self._load_data(n.data) for n in Node.objects.filter(id__in=id_list)}
 
     def delete_multi(self, id_list):
         Node.objects.filter(id__in=id_list).delete()
         self._delete_cache_items(id_list)
 
     def _set_bytes(self, id, data, ttl=None):
-        create_or_update(Node, id=id, values={"data": compress(data), "timestamp": timezone.now()})
+        create_or_update(
+            Node, id=id, values={"data": self._dump_data(data), "timestamp": timezone.now()}
+        )
 
     def cleanup(self, cutoff_timestamp):
         from sentry.db.deletion import BulkDeleteQuery
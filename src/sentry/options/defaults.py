@@ -109,6 +109,8 @@ register(
     default={"url": "http://localhost:3021"},
     flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK,
 )
+# Seconds symbolicated native frames are cached for, 0 disables the cache.
+register("symbolicator.frame-cache-ttl", default=0)
 
 # Backend chart rendering via chartcuterie
 register("chart-rendering.enabled", default=False, flags=FLAG_ALLOW_EMPTY | FLAG_PRIORITIZE_DISK)
@@ -192,6 +194,8 @@ register("snuba.search.chunk-growth-rate", default=1.5)
 register("snuba.search.max-chunk-size", default=2000)
 register("snuba.search.max-total-chunk-time-seconds", default=30.0)
 register("snuba.search.hits-sample-size", default=100)
+register("snuba.search.candidate-cache-ttl", default=0)
+register("snuba.search.pipelined-chunks", type=Bool, default=False)
 register("snuba.track-outcomes-sample-rate", default=0.0)
 
 # The percentage of tagkeys that we want to cache. Set to 1.0 in order to cache everything, <=0.0 to stop caching
@@ -302,3 +306,11 @@ register("store.load-shed-group-creation-projects", type=Sequence, default=[])
 
 # Killswitch for dropping events in ingest consumer or really anywhere
 register("store.load-shed-pipeline-projects", type=Sequence, default=[])
+
+# Save the error events of an ingest consumer batch that need no processing
+# with one save_events task, rather than a save_event task for every event.
+register("store.save-event-batches", default=False)
+
+# Build digests from records loaded in chunks of this size, keeping only the
+# top groups of every rule. Digests are built in memory when set to 0.
+register("digests.streaming-chunk-size", default=0)
@@ -5,7 +5,7 @@ from parsimonious.exceptions import ParseError  # noqa
 from sentry.utils.safe import get_path
 from sentry.utils.glob import glob_match
 
-__all__ = ("parse_rules", "dump_schema", "load_schema")
+__all__ = ("parse_rules", "dump_schema", "load_schema", "compile_rules")
 
 VERSION = 1
 
@@ -216,6 +216,133 @@ def _iter_frames(data):
             continue
 
 
+def _normalize_path(value):
+    # Conservative version of the normalization glob_match applies with
+    # path_normalize, only used to look up candidate patterns.
+    return value.lower().replace("\\", "/").lstrip("./")
+
+
+def _normalize_url(value):
+    return value.lower()
+
+
+def _normalize_tag(value):
+    return value
+
+
+class PatternIndex:
+    """
+    Indexes glob patterns by their literal prefix, the part before the first
+    wildcard. A pattern can only match values starting with its prefix, so
+    only patterns with a prefix of a value need to be tested against it.
+    """
+
+    def __init__(self, normalize):
+        self.normalize = normalize
+        self.rules = {}
+        self.prefixes = {}
+        self.max_prefix_length = 0
+
+    def add(self, pattern, rule_index):
+        if pattern not in self.rules:
+            prefix = self.normalize(re.split(r"[*?\[\\]", pattern, 1)[0])
+            self.prefixes.setdefault(prefix, []).append(pattern)
+            self.max_prefix_length = max(self.max_prefix_length, len(prefix))
+        self.rules.setdefault(pattern, []).append(rule_index)
+
+    def match(self, values, test):
+        """
+        Returns the indexes of all rules with a pattern for which ``test``
+        passes with any of ``values``.
+        """
+        matched = set()
+        for value in values:
+            normalized = self.normalize(value)
+            for i in range(min(len(normalized), self.max_prefix_length) + 1):
+                for pattern in self.prefixes.get(normalized[:i]) or ():
+                    if pattern not in matched and test(value, pattern):
+                        matched.add(pattern)
+
+        return {rule_index for pattern in matched for rule_index in self.rules[pattern]}
+
+
+def _test_frame_value(value, pattern):
+    return glob_match(value, pattern, ignorecase=True, path_normalize=True)
+
+
+def _test_url(value, pattern):
+    return glob_match(value, pattern, ignorecase=True)
+
+
+def _test_tag(value, pattern):
+    return glob_match(value, pattern)
+
+
+class CompiledRules:
+    """
+    A list of rules prepared for matching many events. In contrast to
+    testing every rule, the paths, modules, url and tags of an event are
+    extracted once and only tested against patterns that can match them.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.paths = PatternIndex(_normalize_path)
+        self.modules = PatternIndex(_normalize_path)
+        self.urls = PatternIndex(_normalize_url)
+        self.tags = {}
+
+        for index, rule in enumerate(rules):
+            type, pattern = rule.matcher
+            if type == "path":
+                self.paths.add(pattern, index)
+            elif type == "module":
+                self.modules.add(pattern, index)
+            elif type == "url":
+                self.urls.add(pattern, index)
+            elif type.startswith("tags."):
+                self.tags.setdefault(type[5:], PatternIndex(_normalize_tag)).add(pattern, index)
+
+    def match(self, data):
+        """Returns the rules matching ``data``, in order."""
+        matched = set()
+
+        if self.paths.rules or self.modules.rules:
+            paths = set()
+            modules = set()
+            for frame in _iter_frames(data):
+                path = frame.get("filename") or frame.get("abs_path")
+                if path:
+                    paths.add(path)
+                module = frame.get("module")
+                if module:
+                    modules.add(module)
+
+            matched |= self.paths.match(paths, _test_frame_value)
+            matched |= self.modules.match(modules, _test_frame_value)
+
+        if self.urls.rules:
+            try:
+                url = data["request"]["url"]
+            except (KeyError, TypeError):
+                url = None
+            if url:
+                matched |= self.urls.match([url], _test_url)
+
+        if self.tags:
+            for k, v in get_path(data, "tags", filter=True) or ():
+                index = self.tags.get(k)
+                if index is not None:
+                    matched |= index.match([v if v is not None else ""], _test_tag)
+
+        return [self.rules[index] for index in sorted(matched)]
+
+
+def compile_rules(rules):
+    """Convert a Rule tree into a matcher for many events"""
+    return CompiledRules(rules)
+
+
 def parse_rules(data):
     """Convert a raw text input into a Rule tree"""
     tree = ownership_grammar.parse(data)
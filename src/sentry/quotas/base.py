@@ -204,6 +204,7 @@ class Quota(Service):
         "get_organization_quota",
         "get_project_quota",
         "is_rate_limited",
+        "is_rate_limited_batch",
         "validate",
         "refund",
         "get_event_retention",
@@ -260,6 +261,24 @@ class Quota(Service):
         """
         return NotRateLimited()
 
+    def is_rate_limited_batch(self, items, timestamp=None):
+        """
+        Checks a batch of items against the quotas in effect for them, in the
+        same way as ``is_rate_limited``, and records consumption of the quota
+        of every item that is not rate limited.
+
+        Items are ``(project, key, quantity, category)`` tuples, where
+        ``key``, ``quantity`` and ``category`` may be ``None`` and default to
+        no key, ``1`` and ``DataCategory.ERROR``. Items are checked in order,
+        so earlier items consume the quota before later ones.
+
+        Returns a ``RateLimit`` for every item.
+
+        :param items:     The items to check.
+        :param timestamp: The time to check the items at, defaults to now.
+        """
+        return [self.is_rate_limited(project, key=key) for project, key, _, _ in items]
+
     def refund(self, project, key=None, timestamp=None, category=None, quantity=None):
         """
         Signals event rejection after ``quotas.is_rate_limited`` has been called
@@ -1,5 +1,6 @@
 import functools
 
+from collections import OrderedDict
 from time import time
 
 from sentry.constants import DataCategory
@@ -13,6 +14,7 @@ from sentry.utils.compat import map
 from sentry.utils.compat import zip
 
 is_rate_limited = load_script("quotas/is_rate_limited.lua")
+is_rate_limited_batch = load_script("quotas/is_rate_limited_batch.lua")
 
 
 class RedisQuota(Quota):
@@ -257,3 +259,104 @@ class RedisQuota(Quota):
                 worst_case = (delay, quota.reason_code)
 
         return RateLimited(retry_after=worst_case[0], reason_code=worst_case[1])
+
+    def is_rate_limited_batch(self, items, timestamp=None):
+        if timestamp is None:
+            timestamp = time()
+
+        items = list(items)
+        results = [NotRateLimited() for _ in items]
+
+        # Items are grouped by the Redis client their quotas are stored on.
+        # Each group is checked with a single script call, in which every
+        # quota key is passed once no matter how many items count against it.
+        batches = OrderedDict()
+        quotas_by_key = {}
+        router = None if self.is_redis_cluster else self.cluster.get_router()
+
+        for index, (project, key, quantity, category) in enumerate(items):
+            if quantity is None:
+                quantity = 1
+
+            if category is None:
+                category = DataCategory.ERROR
+
+            quotas_key = (project.id, key.id if key else None)
+            quotas = quotas_by_key.get(quotas_key)
+            if quotas is None:
+                quotas = quotas_by_key[quotas_key] = self.get_quotas(project, key=key)
+
+            quotas = [q for q in quotas if not q.categories or category in q.categories]
+            if not quotas:
+                continue
+
+            zero_quota = next((q for q in quotas if q.limit == 0), None)
+            if zero_quota is not None:
+                # See ``is_rate_limited``, no keys are incremented.
+                results[index] = RateLimited(retry_after=None, reason_code=zero_quota.reason_code)
+                continue
+
+            routing_key = str(project.organization_id)
+            if self.is_redis_cluster:
+                # Quota keys share a hash slot per organization only.
+                batch_key = routing_key
+            else:
+                batch_key = router.get_host_for_key(routing_key)
+
+            batch = batches.get(batch_key)
+            if batch is None:
+                batch = batches[batch_key] = {
+                    "routing_key": routing_key,
+                    "keys": OrderedDict(),
+                    "args": [],
+                    "items": [],
+                }
+
+            checks = []
+            for quota in quotas:
+                assert quota.should_track
+
+                shift = project.organization_id % quota.window
+                redis_key = self.__get_redis_key(quota, timestamp, shift, project.organization_id)
+                if redis_key not in batch["keys"]:
+                    batch["keys"][redis_key] = len(batch["keys"]) + 1
+                    expiry = self.get_next_period_start(quota.window, shift, timestamp) + self.grace
+
+                    # limit=None is represented as limit=-1 in lua
+                    lua_quota = quota.limit if quota.limit is not None else -1
+                    batch["args"].extend((lua_quota, int(expiry)))
+
+                checks.append((batch["keys"][redis_key], quota, shift))
+
+            batch["items"].append((index, quantity, checks))
+
+        for batch in batches.values():
+            keys = []
+            for redis_key in batch["keys"]:
+                keys.extend((redis_key, self.get_refunded_quota_key(redis_key)))
+
+            args = list(batch["args"])
+            for _, quantity, checks in batch["items"]:
+                args.extend((quantity, len(checks)))
+                args.extend(key_index for key_index, _, _ in checks)
+
+            client = self.__get_redis_client(batch["routing_key"])
+            rejections = is_rate_limited_batch(client, keys, args)
+
+            for (index, _, checks), rejected in zip(batch["items"], rejections):
+                if not rejected:
+                    continue
+
+                rejected = set(rejected)
+                worst_case = (0, None)
+                for key_index, quota, shift in checks:
+                    if key_index not in rejected:
+                        continue
+
+                    delay = self.get_next_period_start(quota.window, shift, timestamp) - timestamp
+                    if delay > worst_case[0]:
+                        worst_case = (delay, quota.reason_code)
+
+                results[index] = RateLimited(retry_after=worst_case[0], reason_code=worst_case[1])
+
+        return results
@@ -1,10 +1,63 @@
+from collections import namedtuple
+from math import ceil
+from time import time
+
 from sentry.utils.services import Service
 
 
+class RateLimit(namedtuple("RateLimit", ["is_limited", "limit", "remaining", "reset_time"])):
+    """
+    The outcome of checking a rate limit. ``remaining`` is the number of
+    requests still allowed and ``reset_time`` the Unix timestamp at which the
+    limit resets, or at which a limited request may be retried.
+    """
+
+    __slots__ = ()
+
+    def get_headers(self, timestamp=None):
+        if timestamp is None:
+            timestamp = time()
+
+        headers = {
+            "X-Sentry-Rate-Limit-Limit": str(self.limit),
+            "X-Sentry-Rate-Limit-Remaining": str(self.remaining),
+            "X-Sentry-Rate-Limit-Reset": str(int(ceil(self.reset_time))),
+        }
+        if self.is_limited:
+            headers["Retry-After"] = str(max(1, int(ceil(self.reset_time - timestamp))))
+        return headers
+
+
 class RateLimiter(Service):
-    __all__ = ("is_limited", "validate")
+    __all__ = ("is_limited", "check_limit", "check_limits", "validate")
 
     window = 60
 
     def is_limited(self, key, limit, project=None, window=None):
         return False
+
+    def check_limit(self, key, limit, project=None, window=None):
+        return self.check_limits([(key, limit, window)], project=project)[0]
+
+    def check_limits(self, requests, project=None):
+        """
+        Check a batch of ``(key, limit, window)`` rate limits for a single
+        request, i.e. a user, organization and endpoint limit. A ``window`` of
+        ``None`` uses the default window of the backend.
+
+        Returns a ``RateLimit`` for every item of ``requests``. Backends that
+        do not batch checks only need to implement ``is_limited``, which is
+        called for every item here.
+        """
+        timestamp = time()
+
+        results = []
+        for key, limit, window in requests:
+            if window is None:
+                window = self.window
+
+            if self.is_limited(key, limit, project=project, window=window):
+                results.append(RateLimit(True, limit, 0, timestamp + window))
+            else:
+                results.append(RateLimit(False, limit, limit, timestamp))
+        return results
@@ -1,12 +1,20 @@
+from collections import defaultdict
 from time import time
 
 from sentry.exceptions import InvalidConfiguration
-from sentry.ratelimits.base import RateLimiter
+from sentry.ratelimits.base import RateLimit, RateLimiter
 from sentry.utils.hashlib import md5_text
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
+
+gcra = load_script("ratelimits/gcra.lua")
 
 
 class RedisRateLimiter(RateLimiter):
+    """
+    Fixed window rate limiter, counting requests in windows aligned to
+    multiples of the window duration.
+    """
+
     window = 60
 
     def __init__(self, **options):
@@ -20,19 +28,88 @@ class RedisRateLimiter(RateLimiter):
             raise InvalidConfiguration(str(e))
 
     def is_limited(self, key, limit, project=None, window=None):
-        if window is None:
-            window = self.window
+        return self._check_limits([(key, limit, window)], project)[0].is_limited
 
-        key_hex = md5_text(key).hexdigest()
-        bucket = int(time() / window)
+    def check_limits(self, requests, project=None):
+        # Honor an ``is_limited`` replaced by a subclass or a mock, which the
+        # batched checks would otherwise bypass.
+        if getattr(self.is_limited, "__func__", None) is not RedisRateLimiter.is_limited:
+            return super().check_limits(requests, project=project)
+        return self._check_limits(requests, project)
 
-        if project:
-            key = f"rl:{key_hex}:{project.id}:{bucket}"
-        else:
-            key = f"rl:{key_hex}:{bucket}"
+    def _check_limits(self, requests, project=None):
+        timestamp = time()
 
+        results = []
         with self.cluster.map() as client:
-            result = client.incr(key)
-            client.expire(key, window)
+            for key, limit, window in requests:
+                if window is None:
+                    window = self.window
+
+                key_hex = md5_text(key).hexdigest()
+                bucket = int(timestamp / window)
+
+                if project:
+                    key = f"rl:{key_hex}:{project.id}:{bucket}"
+                else:
+                    key = f"rl:{key_hex}:{bucket}"
+
+                results.append((limit, (bucket + 1) * window, client.incr(key)))
+                client.expire(key, window)
+
+        return [
+            RateLimit(count.value > limit, limit, max(0, limit - count.value), reset_time)
+            for limit, reset_time, count in results
+        ]
+
+
+class RedisGCRARateLimiter(RedisRateLimiter):
+    """
+    Rate limiter based on the generic cell rate algorithm (GCRA), which
+    admits bursts of up to ``limit`` requests and spaces out further requests
+    evenly over the window. In contrast to ``RedisRateLimiter`` this never
+    admits more than ``limit`` requests in any window, stores a single value
+    per key and checks all limits of a request with one script call per host.
+
+    Limits checked together are all-or-nothing: a rejected request does not
+    count against any of them, as long as their keys share a host.
+
+    >>> SENTRY_RATELIMITER = 'sentry.ratelimits.redis.RedisGCRARateLimiter'
+    """
+
+    def make_key(self, key, project=None):
+        key_hex = md5_text(key).hexdigest()
+        if project:
+            return f"rl:gcra:{key_hex}:{project.id}"
+        return f"rl:gcra:{key_hex}"
+
+    def _check_limits(self, requests, project=None):
+        timestamp = time()
+        now = int(timestamp * 1000)
+
+        router = self.cluster.get_router()
+        requests_by_host = defaultdict(list)
+        for index, (key, limit, window) in enumerate(requests):
+            key = self.make_key(key, project)
+            requests_by_host[router.get_host_for_key(key)].append(
+                (index, key, limit, window if window is not None else self.window)
+            )
+
+        results = [None] * len(requests)
+        for host_id, host_requests in requests_by_host.items():
+            keys = []
+            args = [now]
+            for _, key, limit, window in host_requests:
+                keys.append(key)
+                args.extend((limit, window * 1000))
+
+            client = self.cluster.get_local_client(host_id)
+            for (index, _, limit, _), (rejected, remaining, reset, retry) in zip(
+                host_requests, gcra(client, keys, args)
+            ):
+                # The reset time of a rejected request is the time it can be
+                # retried at, rather than when the full limit is available.
+                reset_time = (retry if rejected else reset) / 1000.0
+                results[index] = RateLimit(bool(rejected), limit, remaining, reset_time)
 
-        return result.value > limit
+        return results
@@ -0,0 +1,52 @@
+from django.db.models.signals import post_delete, post_save
+
+from sentry.models import Group, GroupAssignee, GroupBookmark, GroupInbox, GroupOwner
+from sentry.search.snuba.candidates import invalidate_candidates
+from sentry.signals import (
+    inbox_in,
+    inbox_out,
+    issue_assigned,
+    issue_ignored,
+    issue_mark_reviewed,
+    issue_resolved,
+    issue_unignored,
+    issue_unresolved,
+)
+
+
+def invalidate_instance_candidates(instance, **kwargs):
+    if instance.project_id is not None:
+        invalidate_candidates(instance.project_id)
+
+
+def invalidate_project_candidates(project, **kwargs):
+    invalidate_candidates(project.id)
+
+
+# Models which are filtered on by the common issue stream views
+for model in (Group, GroupAssignee, GroupBookmark, GroupInbox, GroupOwner):
+    post_save.connect(
+        invalidate_instance_candidates,
+        sender=model,
+        weak=False,
+        dispatch_uid=f"sentry.search.invalidate_candidates.post_save.{model.__name__}",
+    )
+    post_delete.connect(
+        invalidate_instance_candidates,
+        sender=model,
+        weak=False,
+        dispatch_uid=f"sentry.search.invalidate_candidates.post_delete.{model.__name__}",
+    )
+
+# Groups are updated in bulk without sending model signals
+for signal in (
+    inbox_in,
+    inbox_out,
+    issue_assigned,
+    issue_ignored,
+    issue_mark_reviewed,
+    issue_resolved,
+    issue_unignored,
+    issue_unresolved,
+):
+    signal.connect(invalidate_project_candidates, weak=False)
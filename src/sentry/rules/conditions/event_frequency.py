@@ -50,6 +50,8 @@ class BaseEventFrequencyCondition(EventCondition):
 
     def __init__(self, *args, **kwargs):
         self.tsdb = kwargs.pop("tsdb", tsdb)
+        # Rates shared between the conditions evaluated for the same event.
+        self.rate_cache = kwargs.pop("rate_cache", None)
 
         super().__init__(*args, **kwargs)
 
@@ -83,6 +85,15 @@ class BaseEventFrequencyCondition(EventCondition):
         raise NotImplementedError  # subclass must implement
 
     def get_rate(self, event, interval, environment_id):
+        if self.rate_cache is None:
+            return self._get_rate(event, interval, environment_id)
+
+        key = (self.__class__, event.group_id, interval, environment_id)
+        if key not in self.rate_cache:
+            self.rate_cache[key] = self._get_rate(event, interval, environment_id)
+        return self.rate_cache[key]
+
+    def _get_rate(self, event, interval, environment_id):
         _, duration = intervals[interval]
         end = timezone.now()
         return self.query(event, end - duration, end, environment_id=environment_id)
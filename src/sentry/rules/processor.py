@@ -9,6 +9,7 @@ from random import randrange
 from sentry import analytics
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, rules
+from sentry.rules.conditions.event_frequency import BaseEventFrequencyCondition
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
@@ -29,6 +30,7 @@ class RuleProcessor:
         self.has_reappeared = has_reappeared
 
         self.grouped_futures = {}
+        self.rate_cache = {}
 
     def get_rules(self):
         """
@@ -38,8 +40,11 @@ class RuleProcessor:
         """
         return Rule.get_for_project(self.project.id)
 
+    def get_rule_status_cache_key(self, rule):
+        return "grouprulestatus:1:%s" % hash_values([self.group.id, rule.id])
+
     def get_rule_status(self, rule):
-        key = "grouprulestatus:1:%s" % hash_values([self.group.id, rule.id])
+        key = self.get_rule_status_cache_key(rule)
         rule_status = cache.get(key)
         if rule_status is None:
             rule_status, _ = GroupRuleStatus.objects.get_or_create(
@@ -48,13 +53,48 @@ class RuleProcessor:
             cache.set(key, rule_status, 300)
         return rule_status
 
+    def bulk_get_rule_status(self, rules):
+        """
+        Get the `GroupRuleStatus` of every rule for this group with a single
+        cache roundtrip and query, only creating the missing ones.
+
+        :return: a dict mapping rule ids to `GroupRuleStatus`es
+        """
+        keys = {rule.id: self.get_rule_status_cache_key(rule) for rule in rules}
+        cached = cache.get_many(list(keys.values()))
+        statuses = {rule_id: cached[key] for rule_id, key in keys.items() if key in cached}
+
+        missing = [rule for rule in rules if rule.id not in statuses]
+        if not missing:
+            return statuses
+
+        for status in GroupRuleStatus.objects.filter(
+            group=self.group, rule__in=[rule.id for rule in missing]
+        ):
+            statuses[status.rule_id] = status
+
+        for rule in missing:
+            if rule.id not in statuses:
+                statuses[rule.id], _ = GroupRuleStatus.objects.get_or_create(
+                    rule=rule, group=self.group, defaults={"project": self.project}
+                )
+
+        cache.set_many({keys[rule.id]: statuses[rule.id] for rule in missing}, 300)
+        return statuses
+
     def condition_matches(self, condition, state, rule):
         condition_cls = rules.get(condition["id"])
         if condition_cls is None:
             self.logger.warn("Unregistered condition %r", condition["id"])
             return
 
-        condition_inst = condition_cls(self.project, data=condition, rule=rule)
+        if issubclass(condition_cls, BaseEventFrequencyCondition):
+            # Frequency conditions of different rules share their queries.
+            condition_inst = condition_cls(
+                self.project, data=condition, rule=rule, rate_cache=self.rate_cache
+            )
+        else:
+            condition_inst = condition_cls(self.project, data=condition, rule=rule)
         return safe_execute(condition_inst.passes, self.event, state, _with_transaction=False)
 
     def get_rule_type(self, condition):
@@ -82,11 +122,13 @@ class RuleProcessor:
             return lambda bool_iter: not any(bool_iter)
         return None
 
-    def apply_rule(self, rule):
+    def apply_rule(self, rule, status=None):
         """
         If all conditions and filters pass, execute every action.
 
         :param rule: `Rule` object
+        :param status: the rule's `GroupRuleStatus` for this group, fetched
+            if not given
         :return: void
         """
         condition_match = rule.data.get("action_match") or Rule.DEFAULT_CONDITION_MATCH
@@ -100,7 +142,8 @@ class RuleProcessor:
         ):
             return
 
-        status = self.get_rule_status(rule)
+        if status is None:
+            status = self.get_rule_status(rule)
 
         now = timezone.now()
         freq_offset = now - timedelta(minutes=frequency)
@@ -194,6 +237,15 @@ class RuleProcessor:
             return {}.values()
 
         self.grouped_futures.clear()
-        for rule in self.get_rules():
-            self.apply_rule(rule)
+        self.rate_cache.clear()
+
+        rules = self.get_rules()
+        if any(rule.environment_id is not None for rule in rules):
+            environment_id = self.event.get_environment().id
+            rules = [rule for rule in rules if rule.environment_id in (None, environment_id)]
+
+        # Load the status of all rules up front, rather than one by one.
+        statuses = self.bulk_get_rule_status(rules)
+        for rule in rules:
+            self.apply_rule(rule, statuses[rule.id])
         return self.grouped_futures.values()
@@ -471,6 +471,12 @@ def batching_kafka_options(group):
     default=None,
     help="(Deprecated) Ingest consumers no longer use multiple processing threads.",
 )
+@click.option(
+    "--processes",
+    type=int,
+    default=1,
+    help="Number of worker processes to fan out the messages of a batch to. Offsets are committed once all messages of a batch are processed.",
+)
 @configuration
 def ingest_consumer(consumer_types, all_consumer_types, **options):
     """
@@ -310,6 +310,10 @@ def initialize_app(config, skip_service_validation=False):
 
     configure_structlog()
 
+    from sentry.utils import json
+
+    json.set_backend(getattr(settings, "SENTRY_JSON_BACKEND", "simplejson"))
+
     # Commonly setups don't correctly configure themselves for production envs
     # so lets try to provide a bit more guidance
     if settings.CELERY_ALWAYS_EAGER and not settings.DEBUG:
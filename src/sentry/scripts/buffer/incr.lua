@@ -0,0 +1,38 @@
+-- Applies a single buffered increment atomically.
+--
+-- KEYS[1]: buffer hash key
+-- KEYS[2]: pending set the buffer hash key is registered in
+--
+-- ARGV[1]: model path
+-- ARGV[2]: encoded filters
+-- ARGV[3]: expiry of the buffer hash, in seconds
+-- ARGV[4]: timestamp used as the pending set score
+-- ARGV[5]: "1" if the increment is signal only, "0" otherwise
+-- ARGV[6]: number of counter columns (N)
+-- ARGV[7 .. 6 + 2N]: counter column/amount pairs
+-- ARGV[7 + 2N ..]: extra column/encoded value pairs
+
+local key = KEYS[1]
+local pending_key = KEYS[2]
+
+redis.call('HSETNX', key, 'm', ARGV[1])
+redis.call('HSETNX', key, 'f', ARGV[2])
+
+local column_count = tonumber(ARGV[6])
+local i = 7
+for _ = 1, column_count do
+    redis.call('HINCRBY', key, 'i+' .. ARGV[i], ARGV[i + 1])
+    i = i + 2
+end
+
+while i < #ARGV do
+    redis.call('HSET', key, 'e+' .. ARGV[i], ARGV[i + 1])
+    i = i + 2
+end
+
+if ARGV[5] == '1' then
+    redis.call('HSET', key, 's', '1')
+end
+
+redis.call('EXPIRE', key, tonumber(ARGV[3]))
+redis.call('ZADD', pending_key, ARGV[4], key)
@@ -266,7 +266,7 @@ local function add_record_to_timeline(configuration, timeline_id, record_id, val
     return ready
 end
 
-local function digest_timeline(configuration, timeline_id, timeline_capacity)
+local function digest_timeline(configuration, timeline_id, timeline_capacity, include_values)
     -- Check to ensure that the timeline is in the correct state.
     if redis.call('ZSCORE', configuration:get_schedule_ready_key(), timeline_id) == false then
         error('err(invalid_state): timeline is not in the ready state, cannot be digested')
@@ -299,11 +299,16 @@ local function digest_timeline(configuration, timeline_id, timeline_capacity)
     local i = 0
     for key, score in zrange_scored_iterator(records) do
         i = i + 1
-        results[i] = {
-            key,
-            redis.call('GET', configuration:get_timeline_record_key(timeline_id, key)),
-            score
-        }
+        if include_values then
+            results[i] = {
+                key,
+                redis.call('GET', configuration:get_timeline_record_key(timeline_id, key)),
+                score
+            }
+        else
+            -- The caller fetches the record values itself (in chunks.)
+            results[i] = {key, score}
+        end
     end
 
     return results
@@ -432,12 +437,15 @@ local commands = {
         return delete_timeline(configuration, timeline_id)
     end,
     DIGEST_OPEN = function (cursor, arguments)
-        local cursor, configuration, timeline_id, timeline_capacity = multiple_argument_parser(
+        local cursor, configuration, timeline_id, timeline_capacity, include_values = multiple_argument_parser(
             configuration_argument_parser,
             argument_parser(),
-            argument_parser(tonumber)
+            argument_parser(tonumber),
+            argument_parser(function (value)
+                return value ~= 'KEYS_ONLY'
+            end)
         )(cursor, arguments)
-        return digest_timeline(configuration, timeline_id, timeline_capacity)
+        return digest_timeline(configuration, timeline_id, timeline_capacity, include_values)
     end,
     DIGEST_CLOSE = function (cursor, arguments)
         local cursor, configuration, timeline_id, delay_minimum, record_ids = multiple_argument_parser(
@@ -0,0 +1,69 @@
+-- Check a batch of items against a collection of quota counters, in the same
+-- way as ``is_rate_limited.lua`` does for a single item. Values provided as
+-- ``KEYS`` specify the keys of the counters to check and the keys of counters
+-- to subtract. The first values provided as ``ARGV`` specify the maximum value
+-- (quota limit) and expiration time for each key, followed by the items: the
+-- quantity of the item, the number of quotas it counts against and the
+-- (1-based) indexes of these quotas.
+--
+-- For example, to check two items with a quantity of 1 and 5 against a quota
+-- ``foo`` with a limit of 10 items (which has a corresponding refund counter
+-- "subtract_from_foo"), where the second item is also checked against a quota
+-- ``bar`` with a limit of 20 items and both quotas expire at the Unix
+-- timestamp ``100``, the ``KEYS`` and ``ARGV`` values would be as follows:
+--
+--   KEYS = {"foo", "subtract_from_foo", "bar", "subtract_from_bar"}
+--   ARGV = {10, 100, 20, 100, 1, 1, 1, 5, 2, 1, 2}
+--
+-- Items are checked in order. An item is accepted if none of its quotas would
+-- be exceeded by adding its quantity to the quantity of all previously
+-- accepted items, in which case its quantity is counted against all of its
+-- quotas. The counters are incremented once per quota at the end. The result
+-- is a Lua table/array (Redis multi bulk reply) with one entry per item,
+-- listing the indexes of the quotas that *rejected* the item (empty if the
+-- item was accepted.)
+assert(#KEYS % 2 == 0, "there must be an even number of keys")
+assert(#ARGV >= #KEYS, "incorrect number of keys and arguments provided")
+
+local usage = {}
+local consumed = {}
+for i=1, #KEYS / 2 do
+    usage[i] = (redis.call('GET', KEYS[i * 2 - 1]) or 0) - (redis.call('GET', KEYS[i * 2]) or 0)
+    consumed[i] = 0
+end
+
+local results = {}
+local position = #KEYS + 1
+while position <= #ARGV do
+    local quantity = tonumber(ARGV[position])
+    local count = tonumber(ARGV[position + 1])
+
+    local rejections = {}
+    for j=1, count do
+        local index = tonumber(ARGV[position + 1 + j])
+        local limit = tonumber(ARGV[index * 2 - 1])
+        -- limit=-1 means "no limit"
+        if limit >= 0 and usage[index] + consumed[index] + quantity > limit then
+            table.insert(rejections, index)
+        end
+    end
+
+    if #rejections == 0 then
+        for j=1, count do
+            local index = tonumber(ARGV[position + 1 + j])
+            consumed[index] = consumed[index] + quantity
+        end
+    end
+
+    table.insert(results, rejections)
+    position = position + 2 + count
+end
+
+for i=1, #KEYS / 2 do
+    if consumed[i] > 0 then
+        redis.call('INCRBY', KEYS[i * 2 - 1], consumed[i])
+        redis.call('EXPIREAT', KEYS[i * 2 - 1], ARGV[i * 2])
+    end
+end
+
+return results
@@ -0,0 +1,76 @@
+-- Check a collection of rate limits using the generic cell rate algorithm
+-- (GCRA.) Values provided as ``KEYS`` specify the keys storing the
+-- theoretical arrival time (TAT) of each limit. The first value of ``ARGV`` is
+-- the current time in milliseconds, followed by the limit (number of requests)
+-- and window (in milliseconds) for each key.
+--
+-- For example, to check a limit ``foo`` of 10 requests per minute and a limit
+-- ``bar`` of 100 requests per hour at the Unix timestamp ``100`` the ``KEYS``
+-- and ``ARGV`` values would be as follows:
+--
+--   KEYS = {"foo", "bar"}
+--   ARGV = {100000, 10, 60000, 100, 3600000}
+--
+-- A limit of ``n`` requests per window allows bursts of up to ``n`` requests,
+-- after which requests are admitted evenly spaced over the window. Unlike fixed
+-- windows, this never allows more than ``n`` requests in any window.
+--
+-- If all checks pass (the request is accepted), the TAT of every key is
+-- advanced. If any check fails (the request is rejected), no key is modified.
+-- The result is a Lua table/array (Redis multi bulk reply) with one entry per
+-- key, each entry being a table of whether the request was *rejected* by that
+-- limit (1 or 0), the remaining number of requests, the time (in milliseconds)
+-- at which the full limit is available again and the time (in milliseconds)
+-- after which a rejected request may be retried.
+assert(#KEYS * 2 + 1 == #ARGV, "incorrect number of keys and arguments provided")
+
+local now = tonumber(ARGV[1])
+local checks = {}
+local failed = false
+for i=1, #KEYS do
+    local limit = tonumber(ARGV[i * 2])
+    local window = tonumber(ARGV[i * 2 + 1])
+    local tat = math.max(tonumber(redis.call('GET', KEYS[i]) or now), now)
+    local check = {limit=limit, window=window, tat=tat}
+
+    if limit <= 0 then
+        check.rejected = true
+        check.retry = now + window
+    else
+        check.interval = window / limit
+        check.allow_at = tat + check.interval - window
+        check.rejected = check.allow_at > now
+        check.retry = check.allow_at
+    end
+
+    if check.rejected then
+        failed = true
+    end
+    checks[i] = check
+end
+
+local results = {}
+for i=1, #KEYS do
+    local check = checks[i]
+    local tat = check.tat
+    if not failed then
+        tat = tat + check.interval
+        redis.call('SET', KEYS[i], tostring(tat), 'PX', math.ceil(tat - now))
+    end
+
+    local remaining = 0
+    if check.limit > 0 then
+        -- Requests that fit between the TAT and the end of the window.
+        remaining = math.floor((now + check.window - tat) / check.interval + 1e-6)
+        remaining = math.max(0, math.min(check.limit, remaining))
+    end
+
+    results[i] = {
+        check.rejected and 1 or 0,
+        remaining,
+        math.ceil(math.max(tat, now)),
+        math.ceil(check.retry),
+    }
+end
+
+return results
@@ -0,0 +1,100 @@
+"""
+Short-lived cache of the candidate group ids of issue searches, i.e. the
+groups matching the Postgres filters of a search, which are passed down to
+Snuba. The candidates of common stream views (unresolved issues, issues
+assigned to someone or for review) change slowly and are shared between
+pages of a search as well as between users.
+
+Candidates are stored as zlib compressed deltas of their sorted ids, which
+keeps even the maximum number of candidates small. Entries are keyed by
+generations of their projects, which receivers bump whenever the status,
+assignment or inbox of a group in the project changes. Any other change is
+only picked up once entries expire.
+"""
+import zlib
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from uuid import uuid4
+
+from sentry import options
+from sentry.utils import metrics
+from sentry.utils.cache import cache
+from sentry.utils.hashlib import md5_text
+
+GENERATION_CACHE_DURATION = 24 * 60 * 60
+
+
+def encode_group_ids(group_ids):
+    group_ids = sorted(group_ids)
+    deltas = array("q", [b - a for a, b in zip([0] + group_ids, group_ids)])
+    return zlib.compress(deltas.tobytes())
+
+
+def decode_group_ids(data):
+    deltas = array("q")
+    deltas.frombytes(zlib.decompress(data))
+    return list(accumulate(deltas))
+
+
+def get_generation_cache_key(project_id):
+    return f"search:candidates-generation:{project_id}"
+
+
+def get_generations(project_ids):
+    keys = {get_generation_cache_key(project_id): project_id for project_id in project_ids}
+    generations = {keys[key]: value for key, value in cache.get_many(list(keys)).items()}
+
+    # Start a new generation for projects without one, so that entries keyed by
+    # an evicted generation can never be read again.
+    missing = {
+        get_generation_cache_key(project_id): uuid4().hex
+        for project_id in project_ids
+        if project_id not in generations
+    }
+    if missing:
+        cache.set_many(missing, GENERATION_CACHE_DURATION)
+        generations.update((keys[key], value) for key, value in missing.items())
+
+    return [generations[project_id] for project_id in project_ids]
+
+
+def invalidate_candidates(project_id):
+    if not options.get("snuba.search.candidate-cache-ttl"):
+        return
+    cache.set(get_generation_cache_key(project_id), uuid4().hex, GENERATION_CACHE_DURATION)
+
+
+def get_cache_key(project_ids, group_queryset, limit, ttl):
+    sql, params = group_queryset.query.sql_with_params()
+    # Searches filter by dates relative to now, at least by the retention
+    # window. Truncate them to the duration of entries so repeated searches
+    # share entries.
+    params = [
+        int(param.timestamp()) // ttl if isinstance(param, datetime) else param
+        for param in params
+    ]
+    digest = md5_text(repr((sql, params, get_generations(project_ids), limit))).hexdigest()
+    return f"search:candidates:{digest}"
+
+
+def get_candidate_group_ids(projects, group_queryset, limit):
+    """
+    Returns the ids of up to ``limit`` groups of ``group_queryset``, which
+    are read from the cache when ``snuba.search.candidate-cache-ttl`` is set.
+    """
+    ttl = options.get("snuba.search.candidate-cache-ttl")
+    if not ttl:
+        return list(group_queryset.values_list("id", flat=True)[:limit])
+
+    project_ids = sorted(project.id for project in projects)
+    cache_key = get_cache_key(project_ids, group_queryset, limit, ttl)
+    data = cache.get(cache_key)
+    if data is not None:
+        metrics.incr("snuba.search.candidate_cache", tags={"result": "hit"})
+        return decode_group_ids(data)
+
+    metrics.incr("snuba.search.candidate_cache", tags={"result": "miss"})
+    group_ids = list(group_queryset.values_list("id", flat=True)[:limit])
+    cache.set(cache_key, encode_group_ids(group_ids), ttl)
+    return group_ids
@@ -3,9 +3,11 @@ from abc import ABCMeta, abstractmethod, abstractproperty
 import logging
 import time
 import sentry_sdk
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from hashlib import md5
 
+from django.db import close_old_connections
 from django.utils import timezone
 
 from sentry import options
@@ -17,8 +19,27 @@ from sentry.api.event_search import (
 from sentry.api.paginator import DateTimePaginator, SequencePaginator, Paginator
 from sentry.constants import ALLOWED_FUTURE_DELTA
 from sentry.models import Group
+from sentry.search.snuba.candidates import get_candidate_group_ids
 from sentry.utils import json, metrics, snuba
 
+_search_thread_pool = ThreadPoolExecutor(max_workers=10)
+
+
+def _call_in_thread(hub, function, *args, **kwargs):
+    with hub:
+        try:
+            return function(*args, **kwargs)
+        finally:
+            # Threads of the pool outlive requests, so their connections
+            # expire like the ones of request threads do.
+            close_old_connections()
+
+
+def submit_in_thread(function, *args, **kwargs):
+    return _search_thread_pool.submit(
+        _call_in_thread, sentry_sdk.Hub(sentry_sdk.Hub.current), function, *args, **kwargs
+    )
+
 
 def get_search_filter(search_filters, name, operator):
     """
@@ -386,7 +407,7 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         max_candidates = options.get("snuba.search.max-pre-snuba-candidates")
 
         with sentry_sdk.start_span(op="snuba_group_query") as span:
-            group_ids = list(group_queryset.values_list("id", flat=True)[: max_candidates + 1])
+            group_ids = get_candidate_group_ids(projects, group_queryset, max_candidates + 1)
             span.set_data("Max Candidates", max_candidates)
             span.set_data("Result Size", len(group_ids))
         metrics.timing("snuba.search.num_candidates", len(group_ids))
@@ -416,7 +437,8 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
         chunk_limit = limit
         offset = 0
         num_chunks = 0
-        hits = self.calculate_hits(
+        pipelined = options.get("snuba.search.pipelined-chunks")
+        hits_args = (
             group_ids,
             too_many_candidates,
             sort_field,
@@ -433,8 +455,27 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             start,
             end,
         )
-        if count_hits and hits == 0:
-            return self.empty_result
+        if pipelined:
+            # Count hits while the first chunk is fetched
+            hits_future = submit_in_thread(self.calculate_hits, *hits_args)
+            hits = None
+        else:
+            hits_future = None
+            hits = self.calculate_hits(*hits_args)
+            if count_hits and hits == 0:
+                return self.empty_result
+
+        snuba_search_kwargs = dict(
+            start=start,
+            end=end,
+            project_ids=[p.id for p in projects],
+            environment_ids=environments and [environment.id for environment in environments],
+            sort_field=sort_field,
+            cursor=cursor,
+            group_ids=group_ids,
+            search_filters=search_filters,
+        )
+        next_chunk_future = None
 
         paginator_results = self.empty_result
         result_groups = []
@@ -459,26 +500,37 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             chunk_limit = max(chunk_limit, len(group_ids))
 
             # {group_id: group_score, ...}
-            snuba_groups, total = self.snuba_search(
-                start=start,
-                end=end,
-                project_ids=[p.id for p in projects],
-                environment_ids=environments and [environment.id for environment in environments],
-                sort_field=sort_field,
-                cursor=cursor,
-                group_ids=group_ids,
-                limit=chunk_limit,
-                offset=offset,
-                search_filters=search_filters,
-            )
+            if next_chunk_future is not None:
+                snuba_groups, total = next_chunk_future.result()
+                next_chunk_future = None
+            else:
+                snuba_groups, total = self.snuba_search(
+                    limit=chunk_limit, offset=offset, **snuba_search_kwargs
+                )
             metrics.timing("snuba.search.num_snuba_results", len(snuba_groups))
             count = len(snuba_groups)
             more_results = count >= limit and (offset + limit) < total
             offset += len(snuba_groups)
 
+            if hits_future is not None:
+                hits = hits_future.result()
+                hits_future = None
+                if count_hits and hits == 0:
+                    return self.empty_result
+
             if not snuba_groups:
                 break
 
+            if pipelined and not group_ids and more_results:
+                # Fetch the next chunk while this one is post-filtered, in case
+                # it does not yield enough results
+                next_chunk_future = submit_in_thread(
+                    self.snuba_search,
+                    limit=min(int(chunk_limit * chunk_growth), max_chunk_size),
+                    offset=offset,
+                    **snuba_search_kwargs,
+                )
+
             if group_ids:
                 # pre-filtered candidates were passed down to Snuba, so we're
                 # finished with filtering and these are the only results. Note
@@ -521,6 +573,10 @@ class PostgresSnubaQueryExecutor(AbstractQueryExecutor):
             if group_ids or len(paginator_results.results) >= limit or not more_results:
                 break
 
+        if next_chunk_future is not None:
+            # The prefetched chunk wasn't needed after all
+            next_chunk_future.cancel()
+
         # HACK: We're using the SequencePaginator to mask the complexities of going
         # back and forth between two databases. This causes a problem with pagination
         # because we're 'lying' to the SequencePaginator (it thinks it has the entire
@@ -1,9 +1,11 @@
 import re
 
 from sentry.stacktraces.platform import get_behavior_family_for_platform
-from sentry.utils.safe import setdefault_path
+from sentry.utils.safe import compile_set_path
 
 
+_setdefault_orig_in_app = compile_set_path("data", "orig_in_app", overwrite=False)
+
 _windecl_hash = re.compile(r"^@?(.*?)@[0-9]+$")
 _rust_hash = re.compile(r"::h[a-z0-9]{16}$")
 _cpp_trailer_re = re.compile(r"(\bconst\b|&)$")
@@ -256,5 +258,5 @@ def set_in_app(frame, value):
         return
 
     orig_in_app = int(orig_in_app) if orig_in_app is not None else -1
-    setdefault_path(frame, "data", "orig_in_app", value=orig_in_app)
+    _setdefault_orig_in_app(frame, orig_in_app)
     frame["in_app"] = value
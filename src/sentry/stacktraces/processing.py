@@ -9,12 +9,17 @@ import sentry_sdk
 from sentry.models import Project, Release
 from sentry.utils.cache import cache
 from sentry.utils.hashlib import hash_values
-from sentry.utils.safe import get_path, safe_execute
+from sentry.utils.safe import compile_path, get_path, safe_execute
 from sentry.stacktraces.functions import set_in_app, trim_function_name
 
 
 logger = logging.getLogger(__name__)
 
+_get_frames = compile_path("frames", filter=True, default=())
+_get_exceptions = compile_path("exception", "values", filter=True, default=())
+_get_threads = compile_path("threads", "values", filter=True, default=())
+_get_orig_in_app = compile_path("data", "orig_in_app")
+
 StacktraceInfo = namedtuple(
     "StacktraceInfo", ["stacktrace", "container", "platforms", "is_exception"]
 )
@@ -178,12 +183,12 @@ def find_stacktraces_in_data(data, include_raw=False, with_exceptions=False):
     rv = []
 
     def _report_stack(stacktrace, container, is_exception=False):
-        if not is_exception and (not stacktrace or not get_path(stacktrace, "frames", filter=True)):
+        if not is_exception and (not stacktrace or not _get_frames(stacktrace)):
             return
 
         platforms = {
             frame.get("platform") or data.get("platform")
-            for frame in get_path(stacktrace, "frames", filter=True, default=())
+            for frame in _get_frames(stacktrace)
         }
         rv.append(
             StacktraceInfo(
@@ -194,12 +199,12 @@ def find_stacktraces_in_data(data, include_raw=False, with_exceptions=False):
             )
         )
 
-    for exc in get_path(data, "exception", "values", filter=True, default=()):
+    for exc in _get_exceptions(data):
         _report_stack(exc.get("stacktrace"), exc, is_exception=with_exceptions)
 
     _report_stack(data.get("stacktrace"), None)
 
-    for thread in get_path(data, "threads", "values", filter=True, default=()):
+    for thread in _get_threads(data):
         _report_stack(thread.get("stacktrace"), thread)
 
     if include_raw:
@@ -242,7 +247,7 @@ def normalize_stacktraces_for_grouping(data, grouping_config=None):
     stacktraces = []
 
     for stacktrace_info in find_stacktraces_in_data(data, include_raw=True):
-        frames = get_path(stacktrace_info.stacktrace, "frames", filter=True, default=())
+        frames = _get_frames(stacktrace_info.stacktrace)
         if frames:
             stacktraces.append(frames)
 
@@ -260,7 +265,7 @@ def normalize_stacktraces_for_grouping(data, grouping_config=None):
             # Restore the original in_app value before the first grouping
             # enhancers have been run. This allows to re-apply grouping
             # enhancers on the original frame data.
-            orig_in_app = get_path(frame, "data", "orig_in_app")
+            orig_in_app = _get_orig_in_app(frame)
             if orig_in_app is not None:
                 frame["in_app"] = None if orig_in_app == -1 else bool(orig_in_app)
 
@@ -335,7 +340,7 @@ def get_processable_frames(stacktrace_info, processors):
     """Returns thin wrappers around the frames in a stacktrace associated
     with the processor for it.
     """
-    frames = get_path(stacktrace_info.stacktrace, "frames", filter=True, default=())
+    frames = _get_frames(stacktrace_info.stacktrace)
     frame_count = len(frames)
     rv = []
     for idx, frame in enumerate(frames):
@@ -355,7 +360,7 @@ def process_single_stacktrace(processing_task, stacktrace_info, processable_fram
     processed_frames = []
     all_errors = []
 
-    bare_frames = get_path(stacktrace_info.stacktrace, "frames", filter=True, default=())
+    bare_frames = _get_frames(stacktrace_info.stacktrace)
     frame_count = len(bare_frames)
     processable_frames = {frame.idx: frame for frame in processable_frames}
 
@@ -174,6 +174,7 @@ def assemble_artifacts(org_id, version, checksum, chunks, **kwargs):
     import tempfile
     from sentry.utils.zip import safe_extract_zip
     from sentry.models import File, Organization, Release, ReleaseFile
+    from sentry.models.releasefile import update_artifact_index
 
     scratchpad = None
     delete_bundle = False
@@ -277,6 +278,13 @@ def assemble_artifacts(org_id, version, checksum, chunks, **kwargs):
                 release_file.update(file=file)
                 old_file.delete()
 
+        # Processing events can only fall back to looking up release files
+        # one by one, so failing to index them must not fail the upload.
+        try:
+            update_artifact_index(release, dist)
+        except Exception:
+            logger.error("failed to update artifact index", exc_info=True)
+
     except AssembleArtifactsError as e:
         set_assemble_status(
             AssembleTask.ARTIFACTS, org_id, checksum, ChunkFileState.ERROR, detail=str(e)
@@ -1,9 +1,10 @@
 import logging
 import time
 
+from sentry import options
 from sentry.digests import get_option_key
 from sentry.digests.backends.base import InvalidState
-from sentry.digests.notifications import build_digest, split_key
+from sentry.digests.notifications import build_digest, build_streaming_digest, split_key
 from sentry.models import Project, ProjectOption
 from sentry.tasks.base import instrumented_task
 from sentry.utils import snuba
@@ -48,10 +49,18 @@ def deliver_digest(key, schedule_timestamp=None):
         project, get_option_key("mail", "minimum_delay")
     )
 
+    chunk_size = options.get("digests.streaming-chunk-size")
+
     with snuba.options_override({"consistent": True}):
         try:
-            with digests.digest(key, minimum_delay=minimum_delay) as records:
-                digest = build_digest(project, records)
+            if chunk_size:
+                with digests.digest(
+                    key, minimum_delay=minimum_delay, chunk_size=chunk_size
+                ) as records:
+                    digest = build_streaming_digest(project, records, chunk_size=chunk_size)
+            else:
+                with digests.digest(key, minimum_delay=minimum_delay) as records:
+                    digest = build_digest(project, records)
         except InvalidState as error:
             logger.info("Skipped digest delivery: %s", error, exc_info=True)
             return
@@ -0,0 +1,20 @@
+from sentry.tasks.base import instrumented_task
+
+
+@instrumented_task(name="sentry.tasks.ownership.compile_ownership_rules", queue="ownership")
+def compile_ownership_rules(project_id, **kwargs):
+    """
+    Compile the combined ownership rules and CODEOWNERS of a project into the
+    cache. This task is invoked whenever either of them has been saved, so
+    that processing events never has to compile large schemas itself, not
+    even after deploys.
+    """
+    from sentry.models import ProjectCodeOwners, ProjectOwnership
+
+    ownership = ProjectOwnership.get_ownership_cached(project_id)
+    if not ownership:
+        ownership = ProjectOwnership(project_id=project_id)
+    codeowners = ProjectCodeOwners.get_codeowners_cached(project_id)
+
+    if ProjectOwnership.has_schema(ownership, codeowners):
+        ProjectOwnership.get_compiled_rules_cached(project_id, ownership, codeowners)
@@ -102,7 +102,16 @@ def submit_save_event(project, from_reprocessing, cache_key, event_id, start_tim
     )
 
 
-def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, project):
+def _do_preprocess_event(
+    cache_key,
+    data,
+    start_time,
+    event_id,
+    process_task,
+    project,
+    organization_prefetched=False,
+    save_batch=None,
+):
     from sentry.lang.native.processing import should_process_with_symbolicator
 
     if cache_key and data is None:
@@ -125,10 +134,12 @@ def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, pr
 
     from_reprocessing = process_task is process_event_from_reprocessing
 
-    with metrics.timer("tasks.store.preprocess_event.organization.get_from_cache"):
-        project._organization_cache = Organization.objects.get_from_cache(
-            id=project.organization_id
-        )
+    # The ingest consumer passes projects with their organization prefetched.
+    if not organization_prefetched:
+        with metrics.timer("tasks.store.preprocess_event.organization.get_from_cache"):
+            project._organization_cache = Organization.objects.get_from_cache(
+                id=project.organization_id
+            )
 
     if should_process_with_symbolicator(data):
         reprocessing2.backup_unprocessed_event(project=project, data=original_data)
@@ -148,6 +159,18 @@ def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, pr
         )
         return
 
+    # Error events collected by the ingest consumer are saved together.
+    if save_batch is not None and cache_key and data.get("type") != "transaction":
+        save_batch.append(
+            {
+                "cache_key": cache_key,
+                "event_id": event_id,
+                "start_time": start_time,
+                "project_id": project.id,
+            }
+        )
+        return
+
     submit_save_event(project, from_reprocessing, cache_key, event_id, start_time, original_data)
 
 
@@ -158,7 +181,14 @@ def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, pr
     soft_time_limit=60,
 )
 def preprocess_event(
-    cache_key=None, data=None, start_time=None, event_id=None, project=None, **kwargs
+    cache_key=None,
+    data=None,
+    start_time=None,
+    event_id=None,
+    project=None,
+    organization_prefetched=False,
+    save_batch=None,
+    **kwargs,
 ):
     return _do_preprocess_event(
         cache_key=cache_key,
@@ -167,6 +197,8 @@ def preprocess_event(
         event_id=event_id,
         process_task=process_event,
         project=project,
+        organization_prefetched=organization_prefetched,
+        save_batch=save_batch,
     )
 
 
@@ -771,6 +803,81 @@ def _do_save_event(
             time_synthetic_monitoring_event(data, project_id, start_time)
 
 
+def _do_save_events(jobs):
+    """
+    Saves a batch of error events collected by the ingest consumer. Every job
+    holds the ``cache_key``, ``event_id``, ``start_time`` and ``project_id``
+    that would be passed to ``save_event``.
+    """
+
+    from sentry.event_manager import save_error_events
+
+    save_jobs = []
+    for job in jobs:
+        cache_key = job["cache_key"]
+        project_id = job["project_id"]
+
+        with metrics.timer("tasks.store.do_save_event.get_cache"):
+            data = event_processing_store.get(cache_key)
+
+        if data is None or reprocessing.event_supports_reprocessing(data):
+            with metrics.timer("tasks.store.do_save_event.delete_raw_event"):
+                delete_raw_event(project_id, job["event_id"], allow_hint_clear=True)
+
+        if not data:
+            metrics.incr(
+                "events.failed", tags={"reason": "cache", "stage": "post"}, skip_internal=False
+            )
+            continue
+
+        data = CanonicalKeyDict(data)
+        save_jobs.append(
+            {
+                "data": data,
+                "project_id": project_id,
+                "start_time": job["start_time"],
+                "cache_key": cache_key,
+            }
+        )
+
+    if not save_jobs:
+        return
+
+    projects = {
+        p.id: p
+        for p in Project.objects.get_many_from_cache({job["project_id"] for job in save_jobs})
+    }
+
+    try:
+        with metrics.timer("tasks.store.do_save_events.save_error_events"):
+            save_error_events(save_jobs, projects)
+    finally:
+        for job in save_jobs:
+            data = job["data"]
+            if job.get("event") is not None:
+                # Put the updated event back into the cache so that
+                # post_process has the most recent data.
+                data = dict(job["event"].data.data.items())
+                with metrics.timer("tasks.store.do_save_event.write_processing_cache"):
+                    event_processing_store.store(data)
+            elif job.get("hash_discarded") is not None:
+                with metrics.timer("tasks.store.do_save_event.delete_cache"):
+                    event_processing_store.delete_by_key(job["cache_key"])
+
+            reprocessing2.mark_event_reprocessed(data)
+            with metrics.timer("tasks.store.do_save_event.delete_attachment_cache"):
+                attachment_cache.delete(job["cache_key"])
+
+            if job["start_time"]:
+                metrics.timing(
+                    "events.time-to-process",
+                    time() - job["start_time"],
+                    instance=data["platform"],
+                )
+
+            time_synthetic_monitoring_event(data, job["project_id"], job["start_time"])
+
+
 def time_synthetic_monitoring_event(data, project_id, start_time):
     """
     For special events produced by the recurring synthetic monitoring
@@ -829,3 +936,13 @@ def save_event(
     cache_key=None, data=None, start_time=None, event_id=None, project_id=None, **kwargs
 ):
     _do_save_event(cache_key, data, start_time, event_id, project_id, **kwargs)
+
+
+@instrumented_task(
+    name="sentry.tasks.store.save_events",
+    queue="events.save_event",
+    time_limit=65,
+    soft_time_limit=60,
+)
+def save_events(jobs=None, **kwargs):
+    _do_save_events(jobs or ())
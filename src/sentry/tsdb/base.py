@@ -6,7 +6,10 @@ from django.conf import settings
 from django.utils import timezone
 from enum import Enum
 
+from sentry.utils import metrics
+from sentry.utils.cache import cache
 from sentry.utils.dates import to_datetime, to_timestamp
+from sentry.utils.hashlib import md5_text
 from sentry.utils.services import Service
 from sentry.utils.compat import map
 
@@ -158,7 +161,15 @@ class BaseTSDB(Service):
         ]
     )
 
-    def __init__(self, rollups=None, legacy_rollups=None, **options):
+    def __init__(
+        self,
+        rollups=None,
+        legacy_rollups=None,
+        range_cache_ttl=ONE_HOUR,
+        range_cache_grace=ONE_MINUTE,
+        range_cache_chunk_size=24,
+        **options,
+    ):
         if rollups is None:
             rollups = settings.SENTRY_TSDB_ROLLUPS
 
@@ -173,6 +184,13 @@ class BaseTSDB(Service):
 
         self.__legacy_rollups = legacy_rollups
 
+        # Closed buckets read through ``get_range(..., use_cache=True)`` are
+        # cached in chunks of up to ``range_cache_chunk_size`` buckets, once
+        # the whole chunk is more than ``range_cache_grace`` seconds old.
+        self.range_cache_ttl = range_cache_ttl
+        self.range_cache_grace = range_cache_grace
+        self.range_cache_chunk_size = range_cache_chunk_size
+
     def validate_arguments(self, models, environment_ids):
         if any(e is not None for e in environment_ids):
             unsupported_models = set(models) - self.models_with_environment_support
@@ -354,6 +372,9 @@ class BaseTSDB(Service):
 
         Returns a mapping of key => [(timestamp, count), ...].
 
+        When ``use_cache`` is set, closed buckets are read through the range
+        cache (see ``get_cached_range``.)
+
         >>> now = timezone.now()
         >>> get_range([TSDBModel.group], [1, 2, 3],
         >>>           start=now - timedelta(days=1),
@@ -361,6 +382,105 @@ class BaseTSDB(Service):
         """
         raise NotImplementedError
 
+    def get_range_cache_chunk(self, rollup):
+        """
+        Return the duration (in seconds) of the chunks the range cache stores
+        for a rollup, i.e. a day for hourly rollups and a single bucket for
+        daily rollups.
+        """
+        return rollup * max(1, min(self.range_cache_chunk_size, ONE_DAY // rollup))
+
+    def get_range_cache_key(self, model, key, environment_ids, rollup, chunk):
+        return "tsdb:range:{}:{}:{}:{}:{}:{}".format(
+            type(self).__name__,
+            model.value,
+            ",".join(map(str, sorted(environment_ids))) if environment_ids else "",
+            rollup,
+            chunk,
+            md5_text(key).hexdigest(),
+        )
+
+    def get_cached_range(self, fetch, model, keys, start, end, rollup=None, environment_ids=None):
+        """
+        Read-through cache for ``get_range``. ``fetch`` is called with the
+        same arguments as ``get_range`` and must return its uncached result.
+
+        Buckets are immutable once their rollup interval has passed, so
+        closed buckets are cached in rollup aligned chunks and only the
+        chunks missing from the cache and the open tail are fetched, using a
+        single call to ``fetch``. Counters changed after a chunk has been
+        cached (through late events, ``merge`` or ``delete``) are not visible
+        until the chunk expires after ``range_cache_ttl`` seconds.
+        """
+        rollup, series = self.get_optimal_rollup_series(start, end, rollup)
+        keys = list(keys)
+        chunk_duration = self.get_range_cache_chunk(rollup)
+        chunks = sorted({epoch - epoch % chunk_duration for epoch in series})
+
+        closed_before = to_timestamp(timezone.now()) - self.range_cache_grace
+        closed_chunks = [chunk for chunk in chunks if chunk + chunk_duration <= closed_before]
+
+        cache_keys = {
+            (key, chunk): self.get_range_cache_key(model, key, environment_ids, rollup, chunk)
+            for key in keys
+            for chunk in closed_chunks
+        }
+        cached = cache.get_many(list(cache_keys.values())) if cache_keys else {}
+        missing = [item for item, cache_key in cache_keys.items() if cache_key not in cached]
+
+        tags = {"backend": type(self).__name__, "model": model.name}
+        metrics.incr("tsdb.range_cache", amount=len(cached), tags=dict(tags, result="hit"))
+        metrics.incr("tsdb.range_cache", amount=len(missing), tags=dict(tags, result="miss"))
+
+        # The earliest missing chunk is fetched as a whole so it can be
+        # cached, everything up to the open tail is fetched along with it.
+        fetch_start = min([chunk for _, chunk in missing], default=None)
+        if len(closed_chunks) < len(chunks):
+            open_start = max(series[0], chunks[len(closed_chunks)])
+            fetch_start = open_start if fetch_start is None else min(fetch_start, open_start)
+
+        fetched = {}
+        if fetch_start is not None:
+            fetched = fetch(
+                model,
+                keys,
+                to_datetime(fetch_start),
+                to_datetime(series[-1]),
+                rollup=rollup,
+                environment_ids=environment_ids,
+            )
+
+        missing = set(missing)
+        results = {}
+        to_cache = {}
+        for key in keys:
+            if fetch_start is not None and key not in fetched:
+                continue
+
+            points = {}
+            for chunk in closed_chunks:
+                for timestamp, count in cached.get(cache_keys[(key, chunk)], ()):
+                    points[int(timestamp)] = (timestamp, count)
+
+            fetched_chunks = {}
+            for timestamp, count in fetched.get(key, ()):
+                points[int(timestamp)] = (timestamp, count)
+                chunk = int(timestamp) - int(timestamp) % chunk_duration
+                if (key, chunk) in missing:
+                    fetched_chunks.setdefault(chunk, []).append((timestamp, count))
+
+            for chunk, chunk_points in fetched_chunks.items():
+                to_cache[cache_keys[(key, chunk)]] = chunk_points
+
+            results[key] = [
+                points[epoch] for epoch in sorted(points) if series[0] <= epoch <= series[-1]
+            ]
+
+        if to_cache:
+            cache.set_many(to_cache, self.range_cache_ttl)
+
+        return results
+
     def get_sums(self, model, keys, start, end, rollup=None, environment_id=None, use_cache=False):
         range_set = self.get_range(
             model,
@@ -164,6 +164,17 @@ class RedisTSDB(BaseTSDB):
 
         Returns a 2-tuple that contains the hash key and the hash field.
         """
+        vnode, hash_field = self.make_counter_field(key, environment_id)
+        return (
+            self.make_counter_hash_key(model, self.normalize_to_rollup(timestamp, rollup), vnode),
+            hash_field,
+        )
+
+    def make_counter_field(self, key, environment_id):
+        """
+        Returns a 2-tuple of the vnode and the hash field of a counter, which
+        don't depend on the timestamp.
+        """
         model_key = self.get_model_key(key)
 
         if isinstance(model_key, int):
@@ -171,14 +182,11 @@ class RedisTSDB(BaseTSDB):
         else:
             vnode = crc32(force_bytes(model_key)) % self.vnodes
 
-        return (
-            "{prefix}{model}:{epoch}:{vnode}".format(
-                prefix=self.prefix,
-                model=model.value,
-                epoch=self.normalize_to_rollup(timestamp, rollup),
-                vnode=vnode,
-            ),
-            self.add_environment_parameter(model_key, environment_id),
+        return vnode, self.add_environment_parameter(model_key, environment_id)
+
+    def make_counter_hash_key(self, model, epoch, vnode):
+        return "{prefix}{model}:{epoch}:{vnode}".format(
+            prefix=self.prefix, model=model.value, epoch=epoch, vnode=vnode
         )
 
     def get_model_key(self, key):
@@ -278,28 +286,41 @@ class RedisTSDB(BaseTSDB):
 
         self.validate_arguments([model], [environment_id])
 
+        if use_cache:
+            return self.get_cached_range(
+                self.get_range, model, keys, start, end, rollup, environment_ids
+            )
+
         rollup, series = self.get_optimal_rollup_series(start, end, rollup)
         series = map(to_datetime, series)
+        epochs = [self.normalize_to_rollup(timestamp, rollup) for timestamp in series]
+        keys = list(keys)
+
+        # The counters of all keys that share a hash are fetched with a single
+        # HMGET, along with the positions their values are stored at.
+        requests = defaultdict(lambda: ([], []))
+        for key_index, key in enumerate(keys):
+            vnode, hash_field = self.make_counter_field(key, environment_id)
+            for epoch_index, epoch in enumerate(epochs):
+                fields, positions = requests[self.make_counter_hash_key(model, epoch, vnode)]
+                fields.append(hash_field)
+                positions.append((key_index, epoch_index))
 
-        results = []
         cluster, _ = self.get_cluster(environment_id)
         with cluster.map() as client:
-            for key in keys:
-                for timestamp in series:
-                    hash_key, hash_field = self.make_counter_key(
-                        model, rollup, timestamp, key, environment_id
-                    )
-                    results.append(
-                        (to_timestamp(timestamp), key, client.hget(hash_key, hash_field))
-                    )
+            results = [
+                (positions, client.hmget(hash_key, fields))
+                for hash_key, (fields, positions) in requests.items()
+            ]
 
-        results_by_key = defaultdict(dict)
-        for epoch, key, count in results:
-            results_by_key[key][epoch] = int(count.value or 0)
+        counts = [[0] * len(epochs) for _ in keys]
+        for positions, result in results:
+            for (key_index, epoch_index), count in zip(positions, result.value):
+                if count is not None:
+                    counts[key_index][epoch_index] = int(count)
 
-        for key, points in results_by_key.items():
-            results_by_key[key] = sorted(points.items())
-        return dict(results_by_key)
+        timestamps = [to_timestamp(timestamp) for timestamp in series]
+        return {key: zip(timestamps, key_counts) for key, key_counts in zip(keys, counts)}
 
     def merge(self, model, destination, sources, timestamp=None, environment_ids=None):
         environment_ids = (set(environment_ids) if environment_ids is not None else set()).union(
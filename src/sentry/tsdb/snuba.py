@@ -1,5 +1,6 @@
 import collections
 from copy import deepcopy
+import functools
 import itertools
 
 
@@ -385,6 +386,32 @@ class SnubaTSDB(BaseTSDB):
         environment_ids=None,
         conditions=None,
         use_cache=False,
+    ):
+        if use_cache and conditions is None and not isinstance(keys, dict):
+            return self.get_cached_range(
+                functools.partial(self._get_range, use_cache=True),
+                model,
+                keys,
+                start,
+                end,
+                rollup,
+                environment_ids,
+            )
+
+        return self._get_range(
+            model, keys, start, end, rollup, environment_ids, conditions, use_cache
+        )
+
+    def _get_range(
+        self,
+        model,
+        keys,
+        start,
+        end,
+        rollup=None,
+        environment_ids=None,
+        conditions=None,
+        use_cache=False,
     ):
         # 10s is the only rollup under an hour that we support
         if rollup and rollup == 10 and model in self.lower_rollup_query_settings:
@@ -1,7 +1,12 @@
 import functools
+import os
+import threading
+from collections import OrderedDict
 
 from django.core.cache import cache
 
+from sentry.utils import metrics
+
 default_cache = cache
 
 
@@ -74,3 +79,66 @@ class cached_for_request(memoize):
 
 def cache_key_for_event(data):
     return "e:{1}:{0}".format(data["project"], data["event_id"])
+
+
+class LRUCache:
+    """
+    A thread safe LRU cache which is local to the process. It is bounded by
+    ``max_size``, the total size of the cached values, which is 1 per value
+    unless given otherwise. Lookups are counted as hits and misses of
+    ``metric``, if given.
+
+    Worker processes are forked with whatever the parent has cached, but as
+    the lock might have been held by another thread while forking, a child
+    starts with an empty cache instead.
+    """
+
+    def __init__(self, max_size, metric=None, tags=None):
+        self.max_size = max_size
+        self.metric = metric
+        self.tags = tags or {}
+        self.clear()
+
+    def clear(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self._size = 0
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        self._check_pid()
+        with self._lock:
+            rv = self._items.get(key)
+            if rv is not None:
+                self._items.move_to_end(key)
+        if self.metric is not None:
+            metrics.incr(
+                self.metric, tags={**self.tags, "result": "hit" if rv is not None else "miss"}
+            )
+        return rv[0] if rv is not None else None
+
+    def set(self, key, value, size=1):
+        if size > self.max_size:
+            return
+
+        self._check_pid()
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._items[key] = (value, size)
+            self._size += size
+            while self._size > self.max_size:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._size -= evicted_size
@@ -17,6 +17,11 @@ from django.utils.functional import Promise
 from django.utils.html import mark_safe
 from django.utils.timezone import is_aware
 
+try:
+    import rapidjson
+except ImportError:
+    rapidjson = None
+
 
 def better_default_encoder(o):
     if isinstance(o, uuid.UUID):
@@ -84,7 +89,55 @@ _default_escaped_encoder = JSONEncoderForHTML(
 )
 
 
+def _rapidjson_default(o):
+    # Tuples are not encoded natively, as simplejson encodes namedtuples as
+    # objects.
+    if isinstance(o, tuple):
+        if hasattr(o, "_asdict"):
+            return o._asdict()
+        return list(o)
+    return better_default_encoder(o)
+
+
+def _rapidjson_dumps(value):
+    # Values rapidjson cannot encode like simplejson (NaN, non-string keys)
+    # raise and are encoded by simplejson instead.
+    return rapidjson.dumps(
+        value,
+        default=_rapidjson_default,
+        number_mode=rapidjson.NM_DECIMAL,
+        allow_nan=False,
+        iterable_mode=rapidjson.IM_ONLY_LISTS,
+    )
+
+
+def _rapidjson_loads(value):
+    return rapidjson.loads(value)
+
+
+_BACKENDS = {"simplejson": (None, None), "rapidjson": (_rapidjson_dumps, _rapidjson_loads)}
+_fast_dumps = _fast_loads = None
+
+
+def set_backend(name):
+    """
+    Selects the library used by ``dumps`` and ``loads``. All backends produce
+    the same output as ``simplejson``, which remains the fallback for any
+    value a faster backend does not support.
+    """
+    global _fast_dumps, _fast_loads
+
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    if name == "rapidjson" and rapidjson is None:
+        raise ValueError(f"JSON backend {name} is not installed")
+    _fast_dumps, _fast_loads = _BACKENDS[name]
+
+
 def dump(value, fp, **kwargs):
+    if _fast_dumps is not None:
+        fp.write(dumps(value))
+        return
     for chunk in _default_encoder.iterencode(value):
         fp.write(chunk)
 
@@ -93,6 +146,11 @@ def dumps(value, escape=False, **kwargs):
     # Legacy use. Do not use. Use dumps_htmlsafe
     if escape:
         return _default_escaped_encoder.encode(value)
+    if _fast_dumps is not None:
+        try:
+            return _fast_dumps(value)
+        except (TypeError, ValueError, OverflowError):
+            pass
     return _default_encoder.encode(value)
 
 
@@ -101,6 +159,13 @@ def load(fp, **kwargs):
 
 
 def loads(value: str, **kwargs) -> Any:
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(value)
+        except (TypeError, ValueError):
+            # Let simplejson raise its own JSONDecodeError, or decode what
+            # the fast backend rejects (e.g. lone surrogates).
+            pass
     return _default_decoder.decode(value)
 
 
@@ -200,3 +200,82 @@ def setdefault_path(data, *path, **kwargs):
     """
     kwargs["overwrite"] = False
     return set_path(data, *path, **kwargs)
+
+
+def _is_not_none(value):
+    return value is not None
+
+
+def compile_path(*path, **kwargs):
+    """
+    Returns a function that resolves ``path`` from the data passed to it like
+    ``get_path``, accepting the same ``default`` and ``filter`` arguments.
+    The arguments are processed once rather than on every call, and plain
+    dicts are traversed without the more expensive ``Mapping`` checks, which
+    makes this preferable for paths read for every event or frame::
+
+        get_exceptions = compile_path("exception", "values", filter=True)
+        exceptions = get_exceptions(data)
+    """
+    default = kwargs.pop("default", None)
+    f = kwargs.pop("filter", None)
+    for k in kwargs:
+        raise TypeError("compile_path() got an undefined keyword argument '%s'" % k)
+
+    if f is True:
+        f = _is_not_none
+
+    def get_compiled_path(data):
+        for p in path:
+            if type(data) is dict:
+                data = data.get(p)
+                if data is None:
+                    return default
+            elif isinstance(data, collections.Mapping) and p in data:
+                data = data[p]
+            elif (
+                isinstance(data, (list, tuple))
+                and isinstance(p, int)
+                and -len(data) <= p < len(data)
+            ):
+                data = data[p]
+            else:
+                return default
+
+        if f and data and isinstance(data, (list, tuple)):
+            data = filter(f, data)
+
+        return data if data is not None else default
+
+    return get_compiled_path
+
+
+def compile_set_path(*path, **kwargs):
+    """
+    Returns a function ``(data, value)`` that sets ``value`` at ``path`` like
+    ``set_path``, accepting the same ``overwrite`` argument.
+    """
+    overwrite = kwargs.pop("overwrite", True)
+    for k in kwargs:
+        raise TypeError("compile_set_path() got an undefined keyword argument '%s'" % k)
+
+    parents, key = path[:-1], path[-1]
+
+    def set_compiled_path(data, value):
+        for p in parents:
+            if not isinstance(data, collections.Mapping):
+                return False
+            if data.get(p) is None:
+                data[p] = {}
+            data = data[p]
+
+        if not isinstance(data, collections.Mapping):
+            return False
+
+        if overwrite or data.get(key) is None:
+            data[key] = value
+            return True
+
+        return False
+
+    return set_compiled_path
@@ -72,3 +72,57 @@ class BufferTest(TestCase):
         self.buf.process(Group, columns, filters, {"last_seen": the_date}, signal_only=True)
         group.refresh_from_db()
         assert group.times_seen == prev_times_seen
+
+    def test_process_batch_updates_in_bulk(self):
+        project = self.create_project()
+        groups = [Group.objects.create(project=project) for _ in range(3)]
+        the_date = timezone.now() + timedelta(days=5)
+        batch = [
+            (Group, {"times_seen": 2}, {"id": group.id}, {"last_seen": the_date}, None)
+            for group in groups
+        ]
+        batch.append(
+            (Group, {"times_seen": 1}, {"message": "foo bar", "project_id": project.id}, None, None)
+        )
+
+        with mock.patch("sentry.buffer.base.buffer_incr_complete") as signal, mock.patch(
+            "sentry.buffer.base.metrics"
+        ) as metrics:
+            self.buf.process_batch(batch)
+
+        # The groups were updated with a single statement
+        metrics.timing.assert_called_once_with(
+            "buffer.process-batch.bulk-size", 3, tags={"model": "Group"}
+        )
+
+        for group in groups:
+            group_ = Group.objects.get(id=group.id)
+            assert group_.times_seen == group.times_seen + 2
+            assert group_.last_seen == the_date
+            assert group_.score != group.score
+        assert Group.objects.get(message="foo bar").times_seen == 2
+        assert len(signal.send_robust.mock_calls) == 4
+
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_batch_skips_signal_only(self, process):
+        group = Group.objects.create(project=Project(id=1))
+        self.buf.process_batch(
+            [
+                (Group, {"times_seen": 1}, {"id": group.id}, None, True),
+                (Group, {"times_seen": 1}, {"id": group.id}, None, None),
+            ]
+        )
+        assert process.mock_calls == [
+            mock.call(self.buf, Group, {"times_seen": 1}, {"id": group.id}, None, True),
+            mock.call(self.buf, Group, {"times_seen": 1}, {"id": group.id}, None),
+        ]
+
+    @mock.patch("sentry.buffer.base.Buffer.process", side_effect=[Exception, None])
+    def test_process_batch_isolates_failures(self, process):
+        self.buf.process_batch(
+            [
+                (Group, {"times_seen": 1}, {"id": 1}, None, True),
+                (Group, {"times_seen": 1}, {"id": 2}, None, True),
+            ]
+        )
+        assert len(process.mock_calls) == 2
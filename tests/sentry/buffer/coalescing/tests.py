@@ -0,0 +1,82 @@
+from django.core.signals import request_finished
+
+from sentry.utils.compat import mock
+
+from sentry.buffer.coalescing import CoalescingBuffer
+from sentry.models import Group
+from sentry.testutils import TestCase
+
+
+class CoalescingBufferTest(TestCase):
+    def setUp(self):
+        self.buf = CoalescingBuffer(backend={"path": "sentry.buffer.base.Buffer"})
+        self.buf.backend = mock.Mock()
+
+    def test_incr_coalesces_until_flush(self):
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1}, extra={"message": "foo"})
+        self.buf.incr(Group, {"times_seen": 2}, {"id": 1}, extra={"message": "bar"})
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 2})
+        assert not self.buf.backend.incr.called
+
+        self.buf.flush()
+        assert self.buf.backend.incr.mock_calls == [
+            mock.call(Group, {"times_seen": 3}, {"id": 1}, {"message": "bar"}, None),
+            mock.call(Group, {"times_seen": 1}, {"id": 2}, None, None),
+        ]
+
+        self.buf.backend.incr.reset_mock()
+        self.buf.flush()
+        assert not self.buf.backend.incr.called
+
+    def test_incr_keeps_signal_only(self):
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1}, signal_only=True)
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        self.buf.flush()
+        self.buf.backend.incr.assert_called_once_with(
+            Group, {"times_seen": 3}, {"id": 1}, None, True
+        )
+
+    def test_incr_flushes_on_max_keys(self):
+        self.buf.max_keys = 2
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        assert not self.buf.backend.incr.called
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 2})
+        assert len(self.buf.backend.incr.mock_calls) == 2
+
+    @mock.patch("sentry.buffer.coalescing.time")
+    def test_incr_flushes_on_max_age(self, time):
+        self.buf.max_age = 5
+        time.return_value = 100
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        time.return_value = 104
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        assert not self.buf.backend.incr.called
+        time.return_value = 105
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        self.buf.backend.incr.assert_called_once_with(
+            Group, {"times_seen": 3}, {"id": 1}, None, None
+        )
+
+    def test_flushes_at_end_of_request(self):
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        assert not self.buf.backend.incr.called
+        request_finished.send(sender=None)
+        self.buf.backend.incr.assert_called_once_with(
+            Group, {"times_seen": 1}, {"id": 1}, None, None
+        )
+
+    def test_incr_passes_through_unhashable_filters(self):
+        self.buf.incr(Group, {"times_seen": 1}, {"id": [1]})
+        self.buf.backend.incr.assert_called_once_with(
+            Group, {"times_seen": 1}, {"id": [1]}, None, None
+        )
+
+    @mock.patch("sentry.buffer.coalescing.os.getpid")
+    def test_forked_process_drops_parent_increments(self, getpid):
+        getpid.return_value = 1
+        self.buf._reset()
+        self.buf.incr(Group, {"times_seen": 1}, {"id": 1})
+        getpid.return_value = 2
+        self.buf.flush()
+        assert not self.buf.backend.incr.called
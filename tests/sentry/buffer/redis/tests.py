@@ -5,7 +5,7 @@ from sentry.utils.compat import mock
 
 from django.utils import timezone
 from django.utils.encoding import force_text
-from sentry.buffer.redis import RedisBuffer
+from sentry.buffer.redis import MSGPACK_V1_HEADER, RedisBuffer
 from sentry.models import Group, Project
 from sentry.testutils import TestCase
 
@@ -45,6 +45,42 @@ class RedisBufferTest(TestCase):
         client = self.buf.cluster.get_routing_client()
         assert client.zrange("b:p", 0, -1) == []
 
+    @mock.patch("sentry.buffer.redis.process_incr")
+    def test_process_pending_chunked(self, process_incr):
+        self.buf.incr_batch_size = 2
+        self.buf.pending_chunk_size = 2
+        with self.buf.cluster.map() as client:
+            client.zadd("b:p", {"foo": 1, "bar": 2, "baz": 3})
+        client = self.buf.cluster.get_routing_client()
+        # The pending lock is not needed to drain in chunks.
+        client.set("l:b:p", "1")
+        self.buf.process_pending()
+        assert process_incr.apply_async.mock_calls == [
+            mock.call(kwargs={"batch_keys": ["foo", "bar"]}),
+            mock.call(kwargs={"batch_keys": ["baz"]}),
+        ]
+        assert client.zrange("b:p", 0, -1) == []
+
+    @mock.patch("sentry.buffer.redis.process_incr")
+    def test_process_pending_chunked_large_backlog(self, process_incr):
+        backlog = 100000
+        self.buf.incr_batch_size = 1000
+        self.buf.pending_chunk_size = 5000
+        client = self.buf.cluster.get_routing_client()
+        for start in range(0, backlog, 10000):
+            client.zadd("b:p", {f"b:k:{i}": i for i in range(start, start + 10000)})
+
+        self.buf.process_pending()
+
+        keys = [
+            key
+            for call in process_incr.apply_async.mock_calls
+            for key in call[2]["kwargs"]["batch_keys"]
+        ]
+        assert len(process_incr.apply_async.mock_calls) == backlog // 1000
+        assert len(keys) == len(set(keys)) == backlog
+        assert client.zcard("b:p") == 0
+
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.base.Buffer.process")
     def test_process_does_bubble_up_json(self, process):
@@ -121,6 +157,87 @@ class RedisBufferTest(TestCase):
         pending = client.zrange("b:p", 0, -1)
         assert pending == [b"foo"]
 
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    def test_incr_script_saves_to_redis(self):
+        now = datetime(2017, 5, 3, 6, 6, 6, tzinfo=timezone.utc)
+        client = self.buf.cluster.get_routing_client()
+        self.buf.incr_script = True
+        model = mock.Mock()
+        model.__name__ = "Mock"
+        columns = {"times_seen": 1}
+        filters = {"pk": 1, "datetime": now}
+        self.buf.incr(model, columns, filters, extra={"foo": "bar", "datetime": now})
+        result = client.hgetall("foo")
+        # Force keys to strings
+        result = {force_text(k): v for k, v in result.items()}
+
+        assert result["f"].startswith(MSGPACK_V1_HEADER)
+        assert self.buf._decode_value(result.pop("f")) == {"pk": 1, "datetime": now}
+        assert self.buf._decode_value(result.pop("e+datetime")) == now
+        assert self.buf._decode_value(result.pop("e+foo")) == "bar"
+        assert result == {"i+times_seen": b"1", "m": b"mock.mock.Mock"}
+
+        pending = client.zrange("b:p", 0, -1)
+        assert pending == [b"foo"]
+        self.buf.incr(
+            model, columns, filters, extra={"foo": "baz", "datetime": now}, signal_only=True
+        )
+        result = client.hgetall("foo")
+        # Force keys to strings
+        result = {force_text(k): v for k, v in result.items()}
+        assert self.buf._decode_value(result.pop("f")) == {"pk": 1, "datetime": now}
+        assert self.buf._decode_value(result.pop("e+datetime")) == now
+        assert self.buf._decode_value(result.pop("e+foo")) == "baz"
+        assert result == {"i+times_seen": b"2", "m": b"mock.mock.Mock", "s": b"1"}
+
+        pending = client.zrange("b:p", 0, -1)
+        assert pending == [b"foo"]
+        assert client.ttl("foo") > 0
+
+    @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
+    @mock.patch("sentry.buffer.base.Buffer.process")
+    def test_process_does_bubble_up_msgpack(self, process):
+        now = datetime(2017, 5, 3, 6, 6, 6, 123, tzinfo=timezone.utc)
+        self.buf.incr_script = True
+        self.buf.incr(Group, {"times_seen": 2}, {"pk": 1}, extra={"foo": "bar", "datetime": now})
+        self.buf.process("foo")
+        process.assert_called_once_with(
+            Group, {"times_seen": 2}, {"pk": 1}, {"foo": "bar", "datetime": now}, None
+        )
+
+    def test_encode_value_falls_back_to_pickle(self):
+        naive = datetime(2017, 5, 3, 6, 6, 6)
+        for value in (naive, ("a", 1), {"nested": ("a", 1)}):
+            payload = self.buf._encode_value(value)
+            assert not payload.startswith(MSGPACK_V1_HEADER)
+            assert pickle.loads(payload) == value
+            assert self.buf._decode_value(payload) == value
+
+    @mock.patch("sentry.buffer.base.Buffer.process_batch")
+    def test_process_bulk(self, process_batch):
+        self.buf.bulk_process = True
+        client = self.buf.cluster.get_routing_client()
+        client.hmset(
+            "foo",
+            {"f": '{"pk": ["i","1"]}', "i+times_seen": "1", "m": "sentry.models.Group"},
+        )
+        client.hmset(
+            "bar",
+            {"f": '{"pk": ["i","2"]}', "i+times_seen": "2", "m": "sentry.models.Group"},
+        )
+        client.zadd("b:p", {"foo": 1, "bar": 2})
+        client.set("l:baz", "1")
+        self.buf.process(batch_keys=["foo", "bar", "baz"])
+        process_batch.assert_called_once_with(
+            [
+                (Group, {"times_seen": 1}, {"pk": 1}, {}, None),
+                (Group, {"times_seen": 2}, {"pk": 2}, {}, None),
+            ]
+        )
+        assert client.zrange("b:p", 0, -1) == []
+        assert not client.exists("foo", "bar", "l:foo", "l:bar")
+        assert client.exists("l:baz")
+
     @mock.patch("sentry.buffer.redis.RedisBuffer._make_key", mock.Mock(return_value="foo"))
     @mock.patch("sentry.buffer.redis.process_incr")
     @mock.patch("sentry.buffer.redis.process_pending")
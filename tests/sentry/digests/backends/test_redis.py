@@ -150,3 +150,20 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_chunked_digest(self):
+        backend = RedisBackend()
+
+        n = 10
+        t = time.time()
+        for i in range(n):
+            backend.add("timeline", Record(f"record:{i}", f"{i}", t + i))
+        backend._get_connection("timeline").delete("d:t:timeline:r:record:3")
+
+        with backend.digest("timeline", 0, chunk_size=3) as records:
+            assert [record.key for record in records] == [
+                f"record:{i}" for i in reversed(range(n)) if i != 3
+            ]
+
+        # All records (including the missing one) were removed.
+        assert len(backend._get_connection("timeline").keys("d:t:timeline:r:*")) == 0
@@ -5,6 +5,8 @@ from functools import reduce
 from sentry.digests import Record
 from sentry.digests.notifications import (
     Notification,
+    build_digest,
+    build_streaming_digest,
     event_to_record,
     rewrite_record,
     group_records,
@@ -14,7 +16,7 @@ from sentry.digests.notifications import (
     unsplit_key,
 )
 from sentry.mail.adapter import ActionTargetType
-from sentry.models import Rule
+from sentry.models import GroupStatus, Rule
 from sentry.testutils import TestCase
 
 
@@ -79,6 +81,44 @@ class GroupRecordsTestCase(TestCase):
         }
 
 
+class BuildStreamingDigestTestCase(TestCase):
+    @fixture
+    def rule(self):
+        return self.project.rule_set.all()[0]
+
+    def test_success(self):
+        events = [
+            self.store_event(data={"fingerprint": [fingerprint]}, project_id=self.project.id)
+            for fingerprint in ["group-1", "group-2", "group-1", "group-1"]
+        ]
+        # Records are digested in reverse chronological order.
+        records = [event_to_record(event, [self.rule]) for event in reversed(events)]
+        group_1, group_2 = events[0].group, events[1].group
+
+        digest = build_streaming_digest(self.project, records, chunk_size=3)
+        assert list(digest) == [self.rule]
+        assert list(digest[self.rule]) == list(build_digest(self.project, records)[self.rule])
+        assert [record.key for record in digest[self.rule][group_1]] == [
+            events[3].event_id,
+            events[0].event_id,
+        ]
+        assert [record.key for record in digest[self.rule][group_2]] == [events[1].event_id]
+        assert digest[self.rule][group_1][0].value.rules == [self.rule]
+
+        digest = build_streaming_digest(self.project, records, chunk_size=3, max_groups=1)
+        assert list(digest[self.rule]) == [group_1]
+
+    def test_resolved_group(self):
+        event = self.store_event(data={"fingerprint": ["group-1"]}, project_id=self.project.id)
+        event.group.update(status=GroupStatus.RESOLVED)
+
+        digest = build_streaming_digest(self.project, [event_to_record(event, [self.rule])])
+        assert digest == OrderedDict()
+
+    def test_empty(self):
+        assert build_streaming_digest(self.project, []) is None
+
+
 class SortRecordsTestCase(TestCase):
     def test_success(self):
         Rule.objects.create(
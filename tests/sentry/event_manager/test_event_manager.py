@@ -17,6 +17,7 @@ from sentry.event_manager import (
     EventManager,
     EventUser,
     has_pending_commit_resolution,
+    save_error_events,
 )
 from sentry.grouping.utils import hash_from_values
 from sentry.models import (
@@ -132,6 +133,73 @@ class EventManagerTest(TestCase):
         assert group.data.get("type") == "default"
         assert group.data.get("metadata") == {"title": "foo bar"}
 
+    def test_save_error_events(self):
+        timestamp = time() - 300
+        jobs = []
+        for i, (fingerprint, environment) in enumerate(
+            [("a", "production"), ("a", "production"), ("a", "staging"), ("b", "production")]
+        ):
+            manager = EventManager(
+                make_event(
+                    message=f"foo {i}",
+                    fingerprint=[fingerprint],
+                    environment=environment,
+                    release="1.0",
+                    timestamp=timestamp + i,
+                )
+            )
+            manager.normalize()
+            jobs.append(
+                {"data": manager.get_data(), "project_id": self.project.id, "start_time": time()}
+            )
+
+        with self.tasks():
+            with mock.patch("sentry.event_manager.eventstream.insert") as eventstream_insert:
+                save_error_events(jobs, {self.project.id: self.project})
+
+        assert eventstream_insert.call_count == 4
+        events = [job["event"] for job in jobs]
+        assert events[0].group_id == events[1].group_id == events[2].group_id
+        assert events[0].group_id != events[3].group_id
+        assert [job["is_new"] for job in jobs] == [True, False, False, True]
+        assert [job["is_new_group_environment"] for job in jobs] == [True, False, True, True]
+        assert Group.objects.get(id=events[0].group_id).times_seen == 3
+        assert Release.objects.filter(version="1.0").count() == 1
+        for event in events:
+            assert nodestore.get(event.data.id) is not None
+
+    def test_save_error_events_discarded(self):
+        manager = EventManager(make_event(message="foo", fingerprint=["a" * 32]))
+        with self.tasks():
+            event = manager.save(self.project.id)
+
+        group = Group.objects.get(id=event.group_id)
+        tombstone = GroupTombstone.objects.create(
+            project_id=group.project_id,
+            level=group.level,
+            message=group.message,
+            culprit=group.culprit,
+            data=group.data,
+            previous_group_id=group.id,
+        )
+        GroupHash.objects.filter(group=group).update(group=None, group_tombstone_id=tombstone.id)
+
+        jobs = []
+        for fingerprint in ("a" * 32, "b" * 32):
+            manager = EventManager(make_event(message="foo", fingerprint=[fingerprint]))
+            manager.normalize()
+            jobs.append(
+                {"data": manager.get_data(), "project_id": self.project.id, "start_time": time()}
+            )
+
+        with self.tasks():
+            save_error_events(jobs, {self.project.id: self.project})
+
+        discarded, kept = jobs
+        assert isinstance(discarded["hash_discarded"], HashDiscarded)
+        assert "hash_discarded" not in kept
+        assert kept["event"].group_id is not None
+
     def test_updates_group_with_fingerprint(self):
         ts = time() - 200
         manager = EventManager(
@@ -200,3 +200,55 @@ def test_package_matching():
     assert not bool(
         bundled_rule.get_matching_frame_actions({"package": "/usr/lib/linux-gate.so"}, "native")
     )
+
+
+def _apply_rules_one_by_one(enhancement, frames, platform):
+    for rule in enhancement.iter_rules():
+        for idx, frame in enumerate(frames):
+            for action in rule.get_matching_frame_actions(frame, platform) or ():
+                action.apply_modifications_to_frame(frames, idx)
+
+
+def test_compiled_rules_match_rule_by_rule_application():
+    enhancement = Enhancements.from_config_string(
+        """
+        function:main                      ^-app
+        function:handler                   +app
+        app:no function:handler            -app
+        app:yes module:myapp.*             v+app
+        !app:yes family:native             -group
+        family:native package:/usr/lib/**  -app
+        """,
+        bases=["common:2019-03-23"],
+    )
+
+    def make_frames():
+        return [
+            {"function": "start", "package": "/usr/lib/libc.so"},
+            {"function": "handler", "module": "myapp.views"},
+            {"function": "main", "package": "/usr/lib/libapp.so"},
+            {"function": "handler", "module": "other"},
+            {"function": "handler", "module": "myapp.views"},
+            {"function": "std::panicking::begin_panic"},
+        ]
+
+    for platform in ("native", "python"):
+        expected = make_frames()
+        _apply_rules_one_by_one(enhancement, expected, platform)
+
+        # Twice, so that the second run uses cached frame matches.
+        for _ in range(2):
+            frames = make_frames()
+            enhancement.apply_modifications_to_frame(frames, platform)
+            assert frames == expected
+
+
+def test_loads_is_cached():
+    dumped = Enhancements.from_config_string("function:foo -app", bases=["common:v1"]).dumps()
+    loaded = Enhancements.loads(dumped)
+    assert Enhancements.loads(dumped) is loaded
+    assert Enhancements.loads(dumped.encode("ascii")) is loaded
+
+    with pytest.raises(ValueError):
+        Enhancements.loads("invalid")
+
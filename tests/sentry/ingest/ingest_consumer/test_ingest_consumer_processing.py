@@ -1,9 +1,11 @@
 import uuid
 import pytest
 import time
+from concurrent.futures.process import BrokenProcessPool
 
 from sentry.utils import json
 from sentry.ingest.ingest_consumer import (
+    IngestConsumerWorker,
     process_event,
     process_attachment_chunk,
     process_individual_attachment,
@@ -56,6 +58,8 @@ def test_deduplication_works(default_project, task_runner, preprocess_event):
         "event_id": event_id,
         "project": default_project,
         "start_time": start_time,
+        "organization_prefetched": True,
+        "save_batch": None,
     }
 
 
@@ -311,3 +315,56 @@ def test_individual_attachments_missing_chunks(default_project, factories, monke
     attachments = list(EventAttachment.objects.filter(project_id=project_id, event_id=event_id))
 
     assert not attachments
+
+
+def test_process_messages_in_pool(monkeypatch):
+    calls = []
+
+    def process(message, projects):
+        calls.append((message["event_id"], message["index"]))
+
+    class Pool:
+        def map(self, func, iterable):
+            tasks = list(iterable)
+            assert len(tasks) == 2
+            return list(map(func, tasks))
+
+    worker = IngestConsumerWorker(processes=2)
+    monkeypatch.setattr(worker, "_get_pool", Pool)
+    monkeypatch.setattr("sentry.buffer.flush", lambda: None)
+
+    messages = [
+        (process, {"project_id": 1, "event_id": event_id, "index": index})
+        for index, event_id in enumerate("abacba")
+    ]
+    worker._process_messages(messages, projects={})
+
+    assert sorted(calls) == [("a", 0), ("a", 2), ("a", 5), ("b", 1), ("b", 4), ("c", 3)]
+    for event_id in "abc":
+        indexes = [index for key, index in calls if key == event_id]
+        assert indexes == sorted(indexes)
+
+
+def test_process_messages_broken_pool(monkeypatch):
+    class Pool:
+        def map(self, func, iterable):
+            raise BrokenProcessPool()
+
+        def shutdown(self, wait=True):
+            pools.remove(self)
+
+    pools = []
+
+    def get_pool():
+        pools.append(Pool())
+        return pools[-1]
+
+    worker = IngestConsumerWorker(processes=2)
+    monkeypatch.setattr(worker, "_get_pool", get_pool)
+
+    messages = [(None, {"project_id": 1, "event_id": event_id}) for event_id in "ab"]
+    with pytest.raises(BrokenProcessPool):
+        worker._process_messages(messages, projects={})
+
+    # The broken pool is shut down instead of being reused
+    assert pools == []
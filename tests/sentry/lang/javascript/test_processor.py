@@ -1,3 +1,4 @@
+import base64
 import errno
 import pytest
 import re
@@ -16,6 +17,7 @@ from sentry.lang.javascript.processor import (
     get_release_file_cache_key,
     get_release_file_cache_key_meta,
     JavaScriptStacktraceProcessor,
+    LazyArtifactIndex,
     discover_sourcemap,
     fetch_sourcemap,
     fetch_file,
@@ -30,6 +32,7 @@ from sentry.lang.javascript.processor import (
 )
 from sentry.lang.javascript.errormapping import rewrite_exception, REACT_MAPPING_URL
 from sentry.models import File, Release, ReleaseFile, EventError
+from sentry.models.releasefile import update_artifact_index
 from sentry.testutils import TestCase
 from sentry.utils.strings import truncatechars
 
@@ -102,6 +105,7 @@ class FetchReleaseFileTest(TestCase):
             binary_body,
             200,
             "utf-8",
+            file.checksum,
         )
 
         # looking again should hit the cache - make sure it's come through the
@@ -109,6 +113,40 @@ class FetchReleaseFileTest(TestCase):
         new_result = fetch_release_file("file.min.js", release)
         assert result == new_result
 
+    def test_artifact_index(self):
+        project = self.project
+        release = Release.objects.create(organization_id=project.organization_id, version="abc")
+        release.add_project(project)
+
+        for name in ("app.js", "vendor.js"):
+            file = File.objects.create(name=name, type="release.file", headers={})
+            file.putfile(BytesIO(name.encode("utf-8")))
+            ReleaseFile.objects.create(
+                name=f"~/{name}",
+                release=release,
+                organization_id=project.organization_id,
+                file=file,
+            )
+        update_artifact_index(release, None)
+
+        urls = ["http://example.com/app.js", "http://example.com/vendor.js"]
+        artifact_index = LazyArtifactIndex(release, None, urls)
+        with patch("sentry.lang.javascript.processor.get_release_file_from_database") as db:
+            result = fetch_release_file(urls[0], release, artifact_index=artifact_index)
+            assert result.body == b"app.js"
+
+            # The files of all urls were loaded together
+            with self.assertNumQueries(0):
+                releasefile = artifact_index.get_release_file(urls[1])
+            assert releasefile.name == "~/vendor.js"
+            assert not db.called
+
+        # The index is not read for files in the release file cache
+        with patch("sentry.lang.javascript.processor.read_artifact_index") as read_artifact_index:
+            artifact_index = LazyArtifactIndex(release, None, urls)
+            assert fetch_release_file(urls[0], release, artifact_index=artifact_index)
+            assert not read_artifact_index.called
+
     def test_distribution(self):
         project = self.project
         release = Release.objects.create(organization_id=project.organization_id, version="abc")
@@ -148,7 +186,12 @@ class FetchReleaseFileTest(TestCase):
 
         assert isinstance(foo_result.body, bytes)
         assert foo_result == http.UrlResult(
-            "file.min.js", {"content-type": "application/json; charset=utf-8"}, b"foo", 200, "utf-8"
+            "file.min.js",
+            {"content-type": "application/json; charset=utf-8"},
+            b"foo",
+            200,
+            "utf-8",
+            foo_file.checksum,
         )
 
         # test that cache pays attention to dist value as well as name
@@ -157,7 +200,12 @@ class FetchReleaseFileTest(TestCase):
         # result is cached, but that's not what we should find
         assert bar_result != foo_result
         assert bar_result == http.UrlResult(
-            "file.min.js", {"content-type": "application/json; charset=utf-8"}, b"bar", 200, "utf-8"
+            "file.min.js",
+            {"content-type": "application/json; charset=utf-8"},
+            b"bar",
+            200,
+            "utf-8",
+            bar_file.checksum,
         )
 
     def test_tilde(self):
@@ -190,6 +238,7 @@ class FetchReleaseFileTest(TestCase):
             binary_body,
             200,
             "utf-8",
+            file.checksum,
         )
 
     def test_caching(self):
@@ -222,6 +271,7 @@ class FetchReleaseFileTest(TestCase):
             binary_body,
             200,
             "utf-8",
+            file.checksum,
         )
 
         # test with cache hit, coming from the FS
@@ -302,6 +352,7 @@ class FetchReleaseFileTest(TestCase):
             binary_body,
             200,
             "utf-8",
+            file.checksum,
         )
 
         assert mock_compress_file.mock_calls == []
@@ -322,6 +373,7 @@ class FetchReleaseFileTest(TestCase):
             binary_body,
             200,
             "utf-8",
+            file.checksum,
         )
 
         assert mock_compress_file.mock_calls == [call(ANY)]
@@ -341,6 +393,7 @@ class FetchReleaseFileTest(TestCase):
             binary_body,
             200,
             "utf-8",
+            file.checksum,
         )
 
         assert mock_compress_file.mock_calls == [call(ANY)]
@@ -393,6 +446,7 @@ class FetchReleaseFileTest(TestCase):
                 content,
                 200,
                 "utf-8",
+                file.checksum,
             )
 
         assert bad_file.chunks.call_count == 1
@@ -755,6 +809,28 @@ class FetchSourcemapTest(TestCase):
         with pytest.raises(UnparseableSourcemap):
             fetch_sourcemap("data:application/json;base64,xxx")
 
+    def test_parsed_view_is_cached(self):
+        smap_view = fetch_sourcemap(base64_sourcemap)
+        assert fetch_sourcemap(base64_sourcemap) is smap_view
+        assert fetch_sourcemap(base64_sourcemap.rstrip("=")) is smap_view
+
+    def test_release_file_view_is_cached_by_checksum(self):
+        project = self.project
+        release = Release.objects.create(organization_id=project.organization_id, version="abc")
+        release.add_project(project)
+
+        file = File.objects.create(name="app.js.map", type="release.file", headers={})
+        file.putfile(BytesIO(base64.b64decode(base64_sourcemap[29:])))
+        ReleaseFile.objects.create(
+            name="~/app.js.map", release=release, organization_id=project.organization_id, file=file
+        )
+
+        url = "http://example.com/app.js.map"
+        with patch("sentry.lang.javascript.processor.hashlib") as hashlib:
+            smap_view = fetch_sourcemap(url, release=release)
+            assert fetch_sourcemap(url, release=release) is smap_view
+        assert not hashlib.sha1.called
+
     @responses.activate
     def test_garbage_json(self):
         responses.add(
@@ -1,12 +1,16 @@
 import copy
+import uuid
 
 import pytest
 
 from sentry.lang.native.symbolicator import (
+    Symbolicator,
     get_sources_for_project,
     redact_internal_sources,
 )
 from sentry.testutils.helpers import Feature
+from sentry.testutils.helpers.options import override_options
+from sentry.utils.compat import mock
 from sentry.utils.compat import map
 
 
@@ -240,3 +244,75 @@ class TestInternalSourcesRedaction:
         redacted = redact_internal_sources(response)
         expected = [{"source": "sentry:project", "download": {"status": "notfound"}}]
         assert redacted["modules"][0]["candidates"] == expected
+
+
+@pytest.mark.django_db
+def test_frame_cache(default_project):
+    requests = []
+
+    def symbolicate_stacktraces(stacktraces, modules, signal=None):
+        requests.append([frame["instruction_addr"] for frame in stacktraces[0]["frames"]])
+        image_addr = int(modules[0]["image_addr"], 16)
+        return {
+            "status": "completed",
+            "modules": [dict(module, debug_status="found") for module in modules],
+            "stacktraces": [
+                {
+                    "frames": [
+                        {
+                            "original_index": idx,
+                            "status": "symbolicated",
+                            # Frames are cached by the request frames, not
+                            # the trust or address mode symbolicator reports.
+                            "trust": "scan",
+                            "instruction_addr": frame["instruction_addr"],
+                            "function": "func_%x" % (int(frame["instruction_addr"], 16) - image_addr),
+                        }
+                        for idx, frame in enumerate(stacktrace["frames"])
+                    ]
+                }
+                for stacktrace in stacktraces
+            ],
+        }
+
+    def process(image_addr, addrs):
+        modules = [
+            {
+                "type": "macho",
+                "debug_id": "502fc0a5-1ec1-3e47-9998-684fa139dca7",
+                "image_addr": image_addr,
+                "image_size": 4096,
+            }
+        ]
+        stacktraces = [{"registers": {}, "frames": [{"instruction_addr": a} for a in addrs]}]
+        symbolicator = Symbolicator(project=default_project, event_id=uuid.uuid4().hex)
+        with mock.patch.object(
+            symbolicator.sess, "symbolicate_stacktraces", side_effect=symbolicate_stacktraces
+        ):
+            response = symbolicator.process_payload(stacktraces=stacktraces, modules=modules)
+
+        assert response["modules"][0]["debug_status"] == "found"
+        return [
+            (f["original_index"], f["instruction_addr"], f["function"])
+            for f in response["stacktraces"][0]["frames"]
+        ]
+
+    with override_options({"symbolicator.frame-cache-ttl": 3600}):
+        assert process("0x1000", ["0x1010", "0x1020"]) == [
+            (0, "0x1010", "func_10"),
+            (1, "0x1020", "func_20"),
+        ]
+        assert requests == [["0x1010", "0x1020"]]
+
+        # Cached frames are rebased onto the image address of the event.
+        assert process("0x5000", ["0x5030", "0x5020"]) == [
+            (0, "0x5030", "func_30"),
+            (1, "0x5020", "func_20"),
+        ]
+        assert requests[1:] == [["0x5030"]]
+
+        assert process("0x9000", ["0x9010", "0x9020"]) == [
+            (0, "0x9010", "func_10"),
+            (1, "0x9020", "func_20"),
+        ]
+        assert len(requests) == 2
@@ -1,4 +1,5 @@
 from sentry.models import ProjectOption
+from sentry.utils.cache import cache
 from sentry.testutils import TestCase
 
 
@@ -28,3 +29,18 @@ class ProjectOptionManagerTest(TestCase):
         ProjectOption.objects.create(project=self.project, key="foo", value="bar")
         result = ProjectOption.objects.get_value_bulk([self.project], "foo")
         assert result == {self.project: "bar"}
+
+    def test_get_all_values_bulk(self):
+        ProjectOption.objects.create(project=self.project, key="foo", value="bar")
+        project2 = self.create_project()
+
+        ProjectOption.objects.clear_local_cache()
+        cache.delete_many([ProjectOption.objects._make_key(p.id) for p in (self.project, project2)])
+
+        with self.assertNumQueries(1):
+            result = ProjectOption.objects.get_all_values_bulk([self.project, project2.id])
+        assert result[self.project.id]["foo"] == "bar"
+        assert "foo" not in result[project2.id]
+
+        with self.assertNumQueries(0):
+            assert ProjectOption.objects.get_value(self.project, "foo") == "bar"
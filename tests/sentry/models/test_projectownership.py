@@ -1,8 +1,14 @@
 from sentry.testutils import TestCase
 from sentry.models import ActorTuple, ProjectOwnership, User, Team
-from sentry.models.projectownership import resolve_actors
+from sentry.models.projectownership import (
+    _compiled_rules,
+    get_compiled_rules_data,
+    resolve_actors,
+    set_compiled_rules_data,
+)
 from sentry.ownership.grammar import Rule, Owner, Matcher, dump_schema
 from sentry.utils.cache import cache
+from sentry.utils.compat.mock import patch
 
 
 class ProjectOwnershipTestCase(TestCase):
@@ -244,6 +250,51 @@ class ProjectOwnershipTestCase(TestCase):
             [self.user, self.team],
         )
 
+    def test_get_owners_precompiled_rules(self):
+        self.code_mapping = self.create_code_mapping(project=self.project)
+
+        rule_a = Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)])
+        rule_b = Rule(Matcher("path", "src/*"), [Owner("user", self.user.email)])
+        data = {"stacktrace": {"frames": [{"filename": "src/foo.py"}]}}
+
+        with self.tasks(), self.capture_on_commit_callbacks(execute=True):
+            ProjectOwnership.objects.create(
+                project_id=self.project.id, schema=dump_schema([rule_a]), fallthrough=True
+            )
+            codeowners = self.create_codeowners(
+                self.project, self.code_mapping, raw="src/* user", schema=dump_schema([])
+            )
+
+        # Rules were compiled in the background, even though they are not in
+        # memory of this process.
+        _compiled_rules.clear()
+        with patch("sentry.models.projectownership.compile_rules") as compile_rules:
+            self.assert_ownership_equals(
+                ProjectOwnership.get_owners(self.project.id, data),
+                ([ActorTuple(self.team.id, Team)], [rule_a]),
+            )
+            assert not compile_rules.called
+
+        with self.tasks(), self.capture_on_commit_callbacks(execute=True):
+            codeowners.schema = dump_schema([rule_b])
+            codeowners.save()
+
+        self.assert_ownership_equals(
+            ProjectOwnership.get_owners(self.project.id, data),
+            ([ActorTuple(self.user.id, User), ActorTuple(self.team.id, Team)], [rule_b, rule_a]),
+        )
+
+    def test_compiled_rules_data_chunks(self):
+        z_data = b"0123456789"
+        with patch("sentry.models.projectownership.CACHE_MAX_VALUE_SIZE", 4):
+            set_compiled_rules_data("compiled-rules", z_data)
+        assert cache.get("compiled-rules") == 3
+        assert get_compiled_rules_data("compiled-rules") == z_data
+
+        # Rules are compiled again if any chunk was evicted
+        cache.delete("compiled-rules:1")
+        assert get_compiled_rules_data("compiled-rules") is None
+
 
 class ResolveActorsTestCase(TestCase):
     def test_no_actors(self):
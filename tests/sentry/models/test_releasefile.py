@@ -3,7 +3,12 @@ from io import BytesIO
 import os
 
 from sentry import options
-from sentry.models import ReleaseFile
+from sentry.models import File, Release, ReleaseFile
+from sentry.models.releasefile import (
+    delete_artifact_index,
+    read_artifact_index,
+    update_artifact_index,
+)
 from sentry.testutils import TestCase
 
 
@@ -82,3 +87,75 @@ class ReleaseFileCacheTest(TestCase):
             assert e.errno == errno.ENOENT
         else:
             assert False, "file should not exist"
+
+
+class ReleaseArtifactIndexTest(TestCase):
+    def setUp(self):
+        self.release = self.create_release()
+        self.dist = self.release.add_dist("foo")
+
+    def create_artifact(self, name, content, dist=None):
+        file = self.create_file(name=name.rsplit("/", 1)[-1])
+        file.putfile(BytesIO(content))
+        return self.create_release_file(file=file, name=name, dist=dist)
+
+    def test_resolve_and_fetch(self):
+        app = self.create_artifact("~/app.js", b"app")
+        exact = self.create_artifact("http://example.com/app.js?v=1", b"exact")
+        self.create_artifact("~/app.js", b"dist", dist=self.dist)
+
+        update_artifact_index(self.release, None)
+        index = read_artifact_index(self.release, None)
+
+        assert set(index.files) == {"~/app.js", "http://example.com/app.js?v=1"}
+        assert index.files["~/app.js"] == {
+            "id": app.id,
+            "ident": app.ident,
+            "file_id": app.file_id,
+            "sha1": app.file.checksum,
+            "size": 3,
+        }
+        assert index.resolve("http://example.com/app.js?v=1") == (
+            "http://example.com/app.js?v=1",
+            index.files["http://example.com/app.js?v=1"],
+        )
+        assert index.resolve("http://example.com/missing.js") == (None, None)
+
+        # Parsed indexes are kept in the process
+        with self.assertNumQueries(0):
+            assert read_artifact_index(self.release, None).files is index.files
+
+        index.prefetch(["http://example.com/app.js", "http://example.com/app.js?v=1"])
+        with self.assertNumQueries(0):
+            releasefile = index.get_release_file("http://example.com/app.js?v=1")
+        assert releasefile.id == exact.id
+        assert releasefile.ident == exact.ident
+        with ReleaseFile.cache.getfile(releasefile) as fp:
+            assert fp.read() == b"exact"
+
+        assert read_artifact_index(self.release, self.dist) is None
+
+    def test_update_replaces_index(self):
+        self.create_artifact("~/app.js", b"app", dist=self.dist)
+        update_artifact_index(self.release, self.dist)
+        old_file_id = self.release.data["artifact_indexes"][str(self.dist.id)]
+
+        self.create_artifact("~/vendor.js", b"vendor", dist=self.dist)
+        update_artifact_index(self.release, self.dist)
+
+        release = Release.objects.get(id=self.release.id)
+        assert release.data["artifact_indexes"][str(self.dist.id)] != old_file_id
+        assert not File.objects.filter(id=old_file_id).exists()
+        assert set(read_artifact_index(release, self.dist).files) == {"~/app.js", "~/vendor.js"}
+
+    def test_delete(self):
+        self.create_artifact("~/app.js", b"app")
+        update_artifact_index(self.release, None)
+        file_id = self.release.data["artifact_indexes"][""]
+
+        delete_artifact_index(self.release, None)
+
+        release = Release.objects.get(id=self.release.id)
+        assert release.data["artifact_indexes"] == {}
+        assert read_artifact_index(release, None) is None
+        assert not File.objects.filter(id=file_id).exists()
@@ -1,10 +1,12 @@
 from datetime import timedelta
+import base64
 import pickle
 
 import pytest
+import zstandard
 
 from django.utils import timezone
-from sentry.nodestore.base import json_dumps
+from sentry.nodestore.base import json_dumps, ZstdCodec
 from sentry.nodestore.django.models import Node
 from sentry.nodestore.django.backend import DjangoNodeStorage
 from sentry.utils.compat import mock
@@ -132,3 +134,86 @@ class TestDjangoNodeStorage:
             self.ns.get("node_4")
             self.ns.get("node_4")
             assert mock_get.call_count == 2
+
+
+def make_event(i, platform):
+    return {
+        "event_id": "%032x" % i,
+        "platform": platform,
+        "message": f"TypeError: undefined is not a function ({i})",
+        "exception": {
+            "values": [
+                {
+                    "type": "TypeError",
+                    "stacktrace": {
+                        "frames": [
+                            {"filename": "app.js", "function": f"fn{j}", "lineno": i + j}
+                            for j in range(10)
+                        ]
+                    },
+                }
+            ]
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestDjangoNodeStorageZstd:
+    def setup_method(self):
+        self.ns = DjangoNodeStorage(codec={"path": "sentry.nodestore.base.ZstdCodec"})
+
+    def test_set(self):
+        self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
+        data = base64.b64decode(Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33").data)
+        assert data[:1] == ZstdCodec.header
+        assert zstandard.ZstdDecompressor().decompress(data[1:]) == b'{"foo":"bar"}'
+
+        self.ns._delete_cache_item("d2502ebbd7df41ceba8d3275595cac33")
+        assert self.ns.get("d2502ebbd7df41ceba8d3275595cac33") == {"foo": "bar"}
+
+    def test_set_subkeys(self):
+        self.ns.set_subkeys("d2502ebbd7df41ceba8d3275595cac33", {None: {"foo": "a"}, "1": "b"})
+        assert self.ns.get("d2502ebbd7df41ceba8d3275595cac33", subkey="1") == "b"
+
+    def test_get_legacy(self):
+        Node.objects.create(id="d2502ebbd7df41ceba8d3275595cac33", data=compress(b'{"foo": "bar"}'))
+        Node.objects.create(
+            id="5394aa025b8e401ca6bc3ddee3130edc", data=compress(pickle.dumps({"foo": "baz"}))
+        )
+        assert self.ns.get_multi(
+            ["d2502ebbd7df41ceba8d3275595cac33", "5394aa025b8e401ca6bc3ddee3130edc"]
+        ) == {
+            "d2502ebbd7df41ceba8d3275595cac33": {"foo": "bar"},
+            "5394aa025b8e401ca6bc3ddee3130edc": {"foo": "baz"},
+        }
+
+    def test_get_without_codec(self):
+        self.ns.set("d2502ebbd7df41ceba8d3275595cac33", {"foo": "bar"})
+        ns = DjangoNodeStorage()
+        assert ns.get("d2502ebbd7df41ceba8d3275595cac33") == {"foo": "bar"}
+
+        # The codec decoding the value is only created once
+        assert ns._get_codec(ZstdCodec.header) is ns._get_codec(ZstdCodec.header)
+
+    def test_dictionaries(self):
+        samples = [json_dumps(make_event(i, "javascript")).encode("utf8") for i in range(200)]
+        dictionary = zstandard.train_dictionary(4096, samples)
+        codec = ZstdCodec(dictionaries={"javascript": dictionary})
+
+        event = make_event(1000, "javascript")
+        self.ns.codec = codec
+        self.ns.set("d2502ebbd7df41ceba8d3275595cac33", event)
+        self.ns.set("5394aa025b8e401ca6bc3ddee3130edc", make_event(1001, "python"))
+        self.ns._delete_cache_items(
+            ["d2502ebbd7df41ceba8d3275595cac33", "5394aa025b8e401ca6bc3ddee3130edc"]
+        )
+
+        data = base64.b64decode(Node.objects.get(id="d2502ebbd7df41ceba8d3275595cac33").data)
+        assert zstandard.get_frame_parameters(data[1:]).dict_id == dictionary.dict_id()
+        assert self.ns.get("d2502ebbd7df41ceba8d3275595cac33") == event
+
+        # Nodes compressed with a dictionary can't be read without it.
+        self.ns.codec = ZstdCodec()
+        with pytest.raises(ValueError):
+            self.ns.get("d2502ebbd7df41ceba8d3275595cac33")
+        assert self.ns.get("5394aa025b8e401ca6bc3ddee3130edc")["platform"] == "python"
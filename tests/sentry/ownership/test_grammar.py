@@ -5,6 +5,7 @@ from sentry.ownership.grammar import (
     Matcher,
     Owner,
     parse_rules,
+    compile_rules,
     dump_schema,
     load_schema,
     parse_code_owners,
@@ -185,6 +186,54 @@ def test_matcher_test_tags_without_tag_data(data):
     assert not Matcher("tags.bar", "barval").test(data)
 
 
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"request": {"url": "http://example.com/foo.js"}},
+        {"request": {"url": None}},
+        {"tags": [["foo", "bar"], ["foo", "bar baz"], ["bar", None]]},
+        {"tags": [None]},
+        {
+            "exception": {
+                "values": [
+                    {"stacktrace": {"frames": [{"filename": "foo/file.py"}, None]}},
+                    {"stacktrace": {"frames": [{"abs_path": "/usr/local/src/other/app.py"}]}},
+                ]
+            }
+        },
+        {
+            "stacktrace": {
+                "frames": [
+                    {"filename": "SRC\\Sentry\\models.py", "module": "foo.bar"},
+                    {"filename": "./src/sentry/app.js", "module": "foo bar"},
+                ]
+            }
+        },
+    ],
+)
+def test_compiled_rules(data):
+    rules = parse_rules(fixture_data) + [
+        Rule(Matcher(type, pattern), [])
+        for type, pattern in [
+            ("url", "*.js"),
+            ("url", "http://*.com/foo.js"),
+            ("url", ""),
+            ("path", "*.py"),
+            ("path", "foo/*.py"),
+            ("path", "/usr/local/src/*/app.py"),
+            ("path", "src/sentry/*"),
+            ("path", "*.jsx"),
+            ("module", "foo*"),
+            ("module", "com.android"),
+            ("tags.bar", "*"),
+            ("tags.foo", "ba?"),
+        ]
+    ]
+
+    assert compile_rules(rules).match(data) == [rule for rule in rules if rule.test(data)]
+
+
 def test_parse_code_owners():
     assert parse_code_owners(codeowners_fixture_data) == (
         ["@getsentry/frontend", "@getsentry/docs", "@getsentry/ecosystem"],
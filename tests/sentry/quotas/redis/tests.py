@@ -5,7 +5,7 @@ from exam import fixture, patcher
 
 from sentry.constants import DataCategory
 from sentry.quotas.base import QuotaConfig, QuotaScope
-from sentry.quotas.redis import is_rate_limited, RedisQuota
+from sentry.quotas.redis import is_rate_limited, is_rate_limited_batch, RedisQuota
 from sentry.testutils import TestCase
 from sentry.utils.redis import clusters
 from sentry.utils.compat import map
@@ -79,6 +79,31 @@ def test_is_rate_limited_script():
     assert map(bool, is_rate_limited(client, ("orange", "apple"), (1, now + 60))) == [False]
 
 
+def test_is_rate_limited_batch_script():
+    now = int(time.time())
+
+    cluster = clusters.get("default")
+    client = cluster.get_local_client(next(iter(cluster.hosts)))
+
+    keys = ("batch-foo", "r:batch-foo", "batch-bar", "r:batch-bar")
+    # Two items of quantity 1 and 2 against "foo" (limit 3), the second one
+    # also against "bar" (limit 1), then another item of quantity 1 against
+    # "foo", which exceeds it.
+    args = (3, now + 60, 1, now + 120, 1, 1, 1, 2, 2, 1, 2, 1, 1, 1)
+    assert is_rate_limited_batch(client, keys, args) == [[], [2], []]
+    assert client.get("batch-foo") == b"2"
+    assert 59 <= client.ttl("batch-foo") <= 60
+    assert client.get("batch-bar") is None
+
+    assert is_rate_limited_batch(client, keys, args) == [[], [1, 2], [1]]
+    assert client.get("batch-foo") == b"3"
+
+    # Refunds are taken into account.
+    client.set("r:batch-foo", 2)
+    assert is_rate_limited_batch(client, keys, (3, now + 60, 1, now + 120, 2, 1, 1)) == [[]]
+    assert client.get("batch-foo") == b"5"
+
+
 class RedisQuotaTest(TestCase):
     quota = fixture(RedisQuota)
 
@@ -319,3 +344,35 @@ class RedisQuotaTest(TestCase):
         # count for these quotas and None for the others.
         # The ``- 1`` is because we refunded once.
         assert usage == [n - 1 if q.id else None for q in quotas] + [0, 0]
+
+    def test_is_rate_limited_batch(self):
+        timestamp = time.time()
+
+        self.get_project_quota.return_value = (5, 60)
+        self.get_organization_quota.return_value = (7, 60)
+        other_project = self.create_project(organization=self.organization)
+
+        items = [(self.project, None, 1, None)] * 4 + [
+            (self.project, None, 2, None),
+            (other_project, None, 3, DataCategory.ERROR),
+            (other_project, None, 1, DataCategory.DEFAULT),
+            # Not counted against the error quotas.
+            (other_project, None, 1, DataCategory.TRANSACTION),
+        ]
+        results = self.quota.is_rate_limited_batch(items, timestamp=timestamp)
+
+        assert [r.is_limited for r in results] == [False] * 4 + [True, False, True, False]
+        assert results[4].reason_code == "project_quota"
+        assert results[6].reason_code == "org_quota"
+        assert 0 < results[6].retry_after <= 60
+
+        quotas = self.quota.get_quotas(self.project)
+        assert self.quota.get_usage(self.organization.id, quotas, timestamp=timestamp) == [4, 7]
+
+    def test_is_rate_limited_batch_zero_quota(self):
+        self.get_organization_quota.return_value = (100, 60)
+
+        (result,) = self.quota.is_rate_limited_batch([(self.project, None, 1, None)])
+        assert result.is_limited
+        assert result.reason_code == "project_quota"
+        assert result.retry_after is None
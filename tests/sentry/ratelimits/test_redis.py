@@ -1,4 +1,6 @@
-from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.utils.compat import mock
+
+from sentry.ratelimits.redis import RedisGCRARateLimiter, RedisRateLimiter
 from sentry.testutils import TestCase
 
 
@@ -13,3 +15,70 @@ class RedisRateLimiterTest(TestCase):
     def test_simple_key(self):
         assert not self.backend.is_limited("foo", 1)
         assert self.backend.is_limited("foo", 1)
+
+    @mock.patch("sentry.ratelimits.redis.time", return_value=125.0)
+    def test_check_limits(self, time):
+        first, second = self.backend.check_limits([("foo", 2, 60), ("bar", 1, None)])
+        assert first == (False, 2, 1, 180)
+        assert second == (False, 1, 0, 180)
+
+        first, second = self.backend.check_limits([("foo", 2, 60), ("bar", 1, None)])
+        assert first == (False, 2, 0, 180)
+        assert second == (True, 1, 0, 180)
+        assert second.get_headers(timestamp=125.0) == {
+            "X-Sentry-Rate-Limit-Limit": "1",
+            "X-Sentry-Rate-Limit-Remaining": "0",
+            "X-Sentry-Rate-Limit-Reset": "180",
+            "Retry-After": "55",
+        }
+
+    def test_check_limit_uses_replaced_is_limited(self):
+        with mock.patch.object(self.backend, "is_limited", return_value=True) as is_limited:
+            assert self.backend.check_limit("foo", 1, window=10).is_limited
+        is_limited.assert_called_once_with("foo", 1, project=None, window=10)
+
+
+class RedisGCRARateLimiterTest(TestCase):
+    def setUp(self):
+        self.backend = RedisGCRARateLimiter()
+
+    def test_project_key(self):
+        assert not self.backend.is_limited("foo", 1, self.project)
+        assert self.backend.is_limited("foo", 1, self.project)
+        assert not self.backend.is_limited("foo", 1)
+
+    @mock.patch("sentry.ratelimits.redis.time")
+    def test_burst(self, time):
+        time.return_value = 1000.0
+        for remaining in reversed(range(10)):
+            assert self.backend.check_limit("foo", 10, window=60) == (
+                False,
+                10,
+                remaining,
+                1000.0 + 60 - remaining * 6,
+            )
+
+        # No more requests are admitted until the first one "leaks" out.
+        assert self.backend.check_limit("foo", 10, window=60) == (True, 10, 0, 1006.0)
+        time.return_value = 1005.0
+        assert self.backend.is_limited("foo", 10, window=60)
+        time.return_value = 1006.0
+        assert not self.backend.is_limited("foo", 10, window=60)
+        assert self.backend.is_limited("foo", 10, window=60)
+
+        # The full limit is available again after a whole window.
+        time.return_value = 1066.0
+        assert self.backend.check_limit("foo", 10, window=60).remaining == 9
+
+    @mock.patch("sentry.ratelimits.redis.time", return_value=1000.0)
+    def test_check_limits_all_or_nothing(self, time):
+        requests = [("user", 10, 60), ("org", 1, 60)]
+        assert [r.is_limited for r in self.backend.check_limits(requests)] == [False, False]
+
+        user, org = self.backend.check_limits(requests)
+        assert (user.is_limited, org.is_limited) == (False, True)
+        # The rejected request is not counted against the other limit.
+        assert user.remaining == 9
+
+    def test_zero_limit(self):
+        assert self.backend.is_limited("foo", 0)
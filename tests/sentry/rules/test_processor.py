@@ -57,6 +57,32 @@ class RuleProcessorTest(TestCase):
         results = list(rp.apply())
         assert len(results) == 1
 
+    @patch("sentry.tsdb.get_sums")
+    def test_shared_frequency_queries(self, get_sums):
+        get_sums.side_effect = lambda keys, **kwargs: {key: 0 for key in keys}
+        condition = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "interval": "1h",
+            "value": 10,
+        }
+        for value in (10, 20):
+            Rule.objects.create(
+                project=self.event.project,
+                data={"conditions": [dict(condition, value=value)], "actions": [EMAIL_ACTION_DATA]},
+            )
+
+        rp = RuleProcessor(
+            self.event,
+            is_new=True,
+            is_regression=True,
+            is_new_group_environment=True,
+            has_reappeared=True,
+        )
+        results = list(rp.apply())
+        assert len(results) == 1
+        assert get_sums.call_count == 1
+        assert GroupRuleStatus.objects.filter(group=self.event.group).count() == 3
+
     def test_ignored_issue(self):
         self.event.group.status = GroupStatus.IGNORED
         self.event.group.save()
@@ -16,6 +16,7 @@ from sentry.tasks.assemble import (
 )
 from sentry.models import FileBlob, FileBlobOwner, ReleaseFile
 from sentry.models.debugfile import ProjectDebugFile
+from sentry.models.releasefile import read_artifact_index
 
 
 class BaseAssembleTest(TestCase):
@@ -207,6 +208,11 @@ class AssembleArtifactsTest(BaseAssembleTest):
         assert release_file
         assert release_file.file.headers == {"Sourcemap": "index.js.map"}
 
+        self.release.refresh_from_db()
+        index = read_artifact_index(self.release, None)
+        assert index.files["~/index.js"]["id"] == release_file.id
+        assert index.files["~/index.js"]["file_id"] == release_file.file_id
+
     def test_artifacts_invalid_org(self):
         bundle_file = self.create_artifact_bundle(org="invalid")
         blob1 = FileBlob.from_file(ContentFile(bundle_file))
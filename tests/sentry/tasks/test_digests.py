@@ -9,6 +9,7 @@ from sentry.models.rule import Rule
 from sentry.tasks.digests import deliver_digest
 from sentry.testutils import TestCase
 from sentry.testutils.helpers.datetime import iso_format, before_now
+from sentry.testutils.helpers.options import override_options
 
 
 class DeliverDigestTest(TestCase):
@@ -45,3 +46,8 @@ class DeliverDigestTest(TestCase):
     @patch.object(sentry, "digests")
     def test_member_key(self, digests):
         self.run_test(f"mail:p:{self.project.id}:Member:{self.user.id}", digests)
+
+    @patch.object(sentry, "digests")
+    def test_streaming(self, digests):
+        with override_options({"digests.streaming-chunk-size": 1}):
+            self.run_test(f"mail:p:{self.project.id}", digests)
@@ -7,11 +7,14 @@ from time import time
 
 from sentry import quotas
 from sentry.event_manager import EventManager, HashDiscarded
+from sentry.eventstore.processing import event_processing_store
+from sentry.models import Group
 from sentry.plugins.base.v2 import Plugin2
 from sentry.tasks.store import (
     preprocess_event,
     process_event,
     save_event,
+    save_events,
     symbolicate_event,
     time_synthetic_monitoring_event,
 )
@@ -190,6 +193,52 @@ def test_move_to_save_event(
     assert mock_save_event.delay.call_count == 1
 
 
+@pytest.mark.django_db
+def test_move_to_save_batch(default_project, mock_save_event, register_plugin):
+    register_plugin(globals(), BasicPreprocessorPlugin)
+    data = {
+        "project": default_project.id,
+        "platform": "NOTMATTLANG",
+        "logentry": {"formatted": "test"},
+        "event_id": EVENT_ID,
+    }
+
+    save_batch = []
+    preprocess_event(
+        cache_key="e:1", data=data, start_time=1, event_id=EVENT_ID, save_batch=save_batch
+    )
+
+    assert mock_save_event.delay.call_count == 0
+    assert save_batch == [
+        {"cache_key": "e:1", "event_id": EVENT_ID, "start_time": 1, "project_id": default_project.id}
+    ]
+
+
+@pytest.mark.django_db
+def test_save_events(default_project):
+    jobs = []
+    for message in ("foo", "bar"):
+        manager = EventManager({"message": message}, project=default_project)
+        manager.normalize()
+        data = dict(manager.get_data())
+        data["project"] = default_project.id
+        jobs.append(
+            {
+                "cache_key": event_processing_store.store(data),
+                "event_id": data["event_id"],
+                "start_time": time(),
+                "project_id": default_project.id,
+            }
+        )
+
+    save_events(jobs=jobs)
+
+    assert Group.objects.filter(project=default_project).count() == 2
+    for job in jobs:
+        # The saved events are put back for post processing
+        assert "metadata" in event_processing_store.get(job["cache_key"])
+
+
 @pytest.mark.django_db
 def test_process_event_mutate_and_save(
     default_project, mock_event_processing_store, mock_save_event, register_plugin
@@ -71,6 +71,58 @@ class RedisTSDBTest(TestCase):
         result = self.db.get_model_key("我爱啤酒")
         assert result == "26f980fbe1e8a9d3a0123d2049f95f28"
 
+    def test_get_range_many_keys(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
+        dts = [now + timedelta(hours=i) for i in range(4)]
+
+        def timestamp(d):
+            t = int(to_timestamp(d))
+            return t - (t % 3600)
+
+        # More keys than vnodes, so that hashes are shared between keys.
+        keys = list(range(100)) + [f"key-{i}" for i in range(100)]
+        expected = {}
+        for i, key in enumerate(keys):
+            expected[key] = []
+            for j, dt in enumerate(dts):
+                count = (i + j) % 3
+                if count:
+                    self.db.incr(TSDBModel.group, key, dt, count=count)
+                expected[key].append((timestamp(dt), count))
+
+        results = self.db.get_range(TSDBModel.group, keys, dts[0], dts[-1])
+        assert results == expected
+
+        results = self.db.get_range(TSDBModel.group, keys, dts[0], dts[-1], environment_ids=[1])
+        assert results == {key: [(timestamp(dt), 0) for dt in dts] for key in keys}
+
+    def test_get_range_use_cache(self):
+        now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        start = now - timedelta(minutes=100)
+        for i in range(101):
+            self.db.incr(TSDBModel.group, 1, start + timedelta(minutes=i), count=i % 5)
+            self.db.incr(TSDBModel.group, 2, start + timedelta(minutes=i))
+
+        def get_range(use_cache):
+            return self.db.get_range(
+                TSDBModel.group, [1, 2], start, now, rollup=ONE_MINUTE, use_cache=use_cache
+            )
+
+        expected = get_range(use_cache=False)
+        assert len(expected[1]) == 101
+        assert get_range(use_cache=True) == expected
+
+        # Closed buckets are served from the cache ...
+        self.db.incr(TSDBModel.group, 1, start, count=10)
+        assert get_range(use_cache=True) == expected
+        assert get_range(use_cache=False)[1][0][1] == expected[1][0][1] + 10
+
+        # ... while the open tail is always read live.
+        self.db.incr(TSDBModel.group, 2, now, count=10)
+        results = get_range(use_cache=True)
+        assert results[1] == expected[1]
+        assert results[2] == expected[2][:-1] + [(expected[2][-1][0], expected[2][-1][1] + 10)]
+
     def test_simple(self):
         now = datetime.utcnow().replace(tzinfo=pytz.UTC) - timedelta(hours=4)
         dts = [now + timedelta(hours=i) for i in range(4)]
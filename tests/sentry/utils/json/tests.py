@@ -1,5 +1,9 @@
 import datetime
+import decimal
 import uuid
+from collections import namedtuple
+
+import pytest
 
 from django.utils.translation import ugettext_lazy as _
 from enum import Enum
@@ -48,3 +52,29 @@ class JSONTest(TestCase):
 
     def test_translation(self):
         self.assertEquals(json.dumps(_("word")), '"word"')
+
+    def test_decimal(self):
+        self.assertEquals(json.dumps(decimal.Decimal("1.50")), "1.50")
+
+    def test_namedtuple(self):
+        point = namedtuple("Point", ["x", "y"])
+        self.assertEquals(json.dumps([point(1, 2), (3, 4)]), '[{"x":1,"y":2},[3,4]]')
+
+    def test_non_string_keys(self):
+        self.assertEquals(json.dumps({1: "a"}), '{"1":"a"}')
+
+    def test_float_round_trip(self):
+        values = [0.1, 2.5, -1.5e-7, 1e16, 1.7976931348623157e308, 123456789.123456789]
+        assert json.loads(json.dumps(values)) == values
+
+    def test_loads(self):
+        assert json.loads('{"a":[1,2.5,"\\u00e9",null]}') == {"a": [1, 2.5, "\u00e9", None]}
+        with pytest.raises(json.JSONDecodeError):
+            json.loads("{")
+
+
+@pytest.mark.skipif(json.rapidjson is None, reason="python-rapidjson is not installed")
+class RapidJSONTest(JSONTest):
+    def setUp(self):
+        json.set_backend("rapidjson")
+        self.addCleanup(json.set_backend, "simplejson")
@@ -0,0 +1,39 @@
+from sentry.utils.cache import LRUCache
+from sentry.utils.compat import mock
+
+
+def test_lru_cache():
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # "b" is the least recently used key
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+    # A forked child does not use what the parent has cached.
+    with mock.patch("os.getpid", return_value=cache._pid + 1):
+        assert cache.get("a") is None
+
+
+def test_lru_cache_size():
+    cache = LRUCache(10)
+    cache.set("a", "value-a", size=4)
+    cache.set("b", "value-b", size=4)
+    assert cache.get("a") == "value-a"
+    assert cache.size == 8
+
+    # "b" is the least recently used value
+    cache.set("c", "value-c", size=4)
+    assert cache.get("b") is None
+    assert cache.get("a") == "value-a"
+    assert cache.get("c") == "value-c"
+    assert cache.size == 8
+
+    # values larger than the whole cache are not kept
+    cache.set("d", "value-d", size=11)
+    assert cache.get("d") is None
+    assert len(cache) == 2
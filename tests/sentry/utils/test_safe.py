@@ -6,7 +6,16 @@ import unittest
 from sentry.utils.compat.mock import patch, Mock
 from sentry.testutils import TestCase
 from sentry.utils.canonical import CanonicalKeyDict
-from sentry.utils.safe import safe_execute, trim, trim_dict, get_path, set_path, setdefault_path
+from sentry.utils.safe import (
+    safe_execute,
+    trim,
+    trim_dict,
+    get_path,
+    set_path,
+    setdefault_path,
+    compile_path,
+    compile_set_path,
+)
 
 a_very_long_string = "a" * 1024
 
@@ -194,3 +203,47 @@ class SetPathTest(unittest.TestCase):
 
         with pytest.raises(TypeError):
             set_path({}, "foo", value=1, unknown=True)
+
+
+class CompilePathTest(unittest.TestCase):
+    def test_matches_get_path(self):
+        values = [
+            None,
+            42,
+            "foo",
+            [1, 2],
+            {},
+            {"a": None},
+            {"a": 2},
+            {"a": {"b": []}},
+            {"a": [False, 1, None]},
+            {"a": (False, 1, None)},
+            {"items": [2]},
+            CanonicalKeyDict({"a": {"b": 2}}),
+            OrderedDict([("a", [{"b": 3}])]),
+        ]
+        paths = [("a",), ("a", "b"), ("a", 0, "b"), ("a", -1), (1,), (-1,), ("1",), ("items", 0)]
+        options = [{}, {"default": 1}, {"filter": True}, {"filter": lambda x: x}]
+
+        for data in values:
+            for path in paths:
+                for kwargs in options:
+                    assert compile_path(*path, **kwargs)(data) == get_path(data, *path, **kwargs)
+
+    def test_set(self):
+        data = {}
+        assert compile_set_path("a", "b")(data, 42)
+        assert data == {"a": {"b": 42}}
+
+        assert not compile_set_path("a", "b", overwrite=False)(data, 1)
+        assert data == {"a": {"b": 42}}
+
+        assert not compile_set_path("a", "b", "c")(data, 1)
+        assert not compile_set_path("foo")(None, 1)
+
+    def test_kwargs(self):
+        with pytest.raises(TypeError):
+            compile_path("foo", unknown=True)
+
+        with pytest.raises(TypeError):
+            compile_set_path("foo", unknown=True)
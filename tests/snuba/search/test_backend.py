@@ -21,7 +21,7 @@ from sentry.models import (
 )
 from sentry.models.groupinbox import add_group_to_inbox, GroupInboxReason
 from sentry.search.snuba.backend import EventsDatasetSnubaSearchBackend
-from sentry.testutils import SnubaTestCase, TestCase, xfail_if_not_postgres
+from sentry.testutils import SnubaTestCase, TestCase, TransactionTestCase, xfail_if_not_postgres
 from sentry.testutils.helpers.datetime import before_now, iso_format
 from sentry.utils.compat import mock
 from sentry.utils.snuba import Dataset, SENTRY_SNUBA_MAP, SnubaError
@@ -1086,6 +1086,21 @@ class EventsSnubaSearchTest(TestCase, SnubaTestCase):
         finally:
             options.set("snuba.search.max-pre-snuba-candidates", prev_max_pre)
 
+    def test_candidate_cache(self):
+        with self.options({"snuba.search.candidate-cache-ttl": 60}):
+            results = self.make_query(search_filter_query="is:unresolved", sort_by="freq")
+            assert set(results) == {self.group1}
+
+            # Bulk updates without signals are only picked up once candidates expire
+            Group.objects.filter(id=self.group2.id).update(status=GroupStatus.UNRESOLVED)
+            results = self.make_query(search_filter_query="is:unresolved", sort_by="freq")
+            assert set(results) == {self.group1}
+
+            self.group2.status = GroupStatus.UNRESOLVED
+            self.group2.save()
+            results = self.make_query(search_filter_query="is:unresolved", sort_by="freq")
+            assert set(results) == {self.group1, self.group2}
+
     def test_optimizer_enabled(self):
         prev_optimizer_enabled = options.get("snuba.search.pre-snuba-candidates-optimizer")
         options.set("snuba.search.pre-snuba-candidates-optimizer", True)
@@ -1659,3 +1674,55 @@ class EventsSnubaSearchTest(TestCase, SnubaTestCase):
                 test_query(f"!{key}:{val}")
 
             test_query(f"{key}:{val}")
+
+
+class PipelinedChunksSnubaSearchTest(TransactionTestCase, SnubaTestCase):
+    # Prefetched chunks and hits are queried in other threads, which only see
+    # committed data.
+
+    def make_query(self, query, cursor=None):
+        search_filters = convert_query_values(
+            parse_search_query(query), [self.project], self.user, None
+        )
+        return EventsDatasetSnubaSearchBackend().query(
+            [self.project],
+            search_filters=search_filters,
+            sort_by="freq",
+            limit=2,
+            cursor=cursor,
+            count_hits=True,
+        )
+
+    def test_pipelined_chunks(self):
+        for i in range(12):
+            event = self.store_event(
+                data={
+                    "fingerprint": [f"put-me-in-group{i}"],
+                    "timestamp": iso_format(before_now(minutes=i + 1)),
+                    "message": f"group {i} event",
+                },
+                project_id=self.project.id,
+            )
+            group = event.group
+            group.status = GroupStatus.UNRESOLVED if i % 4 == 0 else GroupStatus.RESOLVED
+            group.save()
+
+        with self.options(
+            {
+                # Too small to pass all django candidates down to snuba, so
+                # that results are post-filtered in chunks
+                "snuba.search.max-pre-snuba-candidates": 1,
+                "snuba.search.chunk-growth-rate": 1,
+            }
+        ):
+            expected = self.make_query("is:unresolved")
+            expected_next = self.make_query("is:unresolved", cursor=expected.next)
+
+            with self.options({"snuba.search.pipelined-chunks": True}):
+                results = self.make_query("is:unresolved")
+                results_next = self.make_query("is:unresolved", cursor=results.next)
+
+        assert len(expected.results) == 2
+        assert results.results == expected.results
+        assert results.hits == expected.hits
+        assert results_next.results == expected_next.results